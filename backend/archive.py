@@ -0,0 +1,249 @@
+"""Hot/cold tiering for the append-only submission collections.
+
+Donations and contact messages are rarely read once they are a few months old,
+but they are kept forever. ``Archiver`` moves documents older than ``after``
+into ``<collection>_archive`` in a compact layout:
+
+- short field names, with the submission ``id`` as ``_id``, so the archive
+  needs no extra ObjectId or unique index;
+- no ``status`` when it is still the model default, and no null fields.
+
+Moves go oldest first, ``batch_size`` documents at a time, and are paced to at
+most ``rate`` documents per second so a backlog does not compete with request
+traffic. Each batch is inserted into the archive before it is deleted from the
+hot collection. A pass cut short in between leaves documents in both tiers: the
+next pass skips the ones already archived, and reads drop the duplicate.
+
+``merged_page`` and ``merged_stream`` serve the list and export endpoints when
+they are asked to include archived documents, merging both tiers in list order.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from pagination import SORT_ORDER, cursor_filter, decode_cursor, encode_cursor
+from stats import TOTALS_ID
+
+logger = logging.getLogger(__name__)
+
+# Collection -> stored field -> archived field
+ARCHIVE_FIELDS: Dict[str, Dict[str, str]] = {
+    "donations": {
+        "id": "_id", "created_at": "t", "name": "n", "email": "e", "phone": "p",
+        "amount": "a", "amount_paise": "ap", "message": "m", "status": "st",
+    },
+    "contacts": {
+        "id": "_id", "created_at": "t", "name": "n", "email": "e",
+        "subject": "sb", "message": "m", "status": "st",
+    },
+}
+
+# Model defaults left out of archived documents and restored on read
+ARCHIVE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "donations": {"status": "pending"},
+    "contacts": {"status": "unread"},
+}
+
+ARCHIVE_SORT = [("t", DESCENDING), ("_id", DESCENDING)]
+
+# counters document holding the lease that gives one worker each pass
+LEASE_ID = "archiver"
+
+
+def archive_name(collection: str) -> str:
+    return f"{collection}_archive"
+
+
+def compact(collection: str, document: Dict[str, Any]) -> Dict[str, Any]:
+    fields = ARCHIVE_FIELDS[collection]
+    defaults = ARCHIVE_DEFAULTS[collection]
+    archived = {}
+    for name, value in document.items():
+        if name == "_id" or value is None or defaults.get(name, ...) == value:
+            continue
+        # Fields outside the schema (legacy documents) keep their names
+        archived[fields.get(name, name)] = value
+    return archived
+
+
+def expand(collection: str, archived: Dict[str, Any]) -> Dict[str, Any]:
+    fields = ARCHIVE_FIELDS[collection]
+    names = {short: name for name, short in fields.items()}
+    document = {name: ARCHIVE_DEFAULTS[collection].get(name) for name in fields}
+    for short, value in archived.items():
+        document[names.get(short, short)] = value
+    return document
+
+
+def _sort_key(document: Dict[str, Any]) -> Tuple[datetime, str]:
+    return document["created_at"], document["id"]
+
+
+def archive_filter(cursor: Optional[str] = None, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Dict[str, Any]:
+    """The archive counterpart of ``cursor_filter`` plus a created_at range"""
+    query: Dict[str, Any] = {}
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lt"] = end
+    if bounds:
+        query["t"] = bounds
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        query["$or"] = [{"t": {"$lt": created_at}}, {"t": created_at, "_id": {"$lt": doc_id}}]
+    return query
+
+
+def _merge(hot: List[Dict[str, Any]], cold: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    merged: List[Dict[str, Any]] = []
+    for doc in heapq.merge(hot, cold, key=_sort_key, reverse=True):
+        # A document caught between insert and delete is in both tiers
+        if merged and merged[-1]["id"] == doc["id"]:
+            continue
+        merged.append(doc)
+    return merged
+
+
+async def merged_page(db, collection: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                      projection: Optional[Dict[str, Any]] = None):
+    """``pagination.fetch_page`` over the hot collection and its archive together"""
+    hot = db[collection].find(cursor_filter(cursor), projection).sort(SORT_ORDER)
+    cold = db[archive_name(collection)].find(archive_filter(cursor)).sort(ARCHIVE_SORT)
+    # Either tier may supply the whole page, so each is read as far as the page could reach
+    wanted = skip + limit + 1 if limit > 0 else 0
+    if wanted:
+        hot, cold = hot.limit(wanted), cold.limit(wanted)
+    hot_docs, cold_docs = await asyncio.gather(hot.to_list(length=None), cold.to_list(length=None))
+    docs = _merge(hot_docs, [expand(collection, doc) for doc in cold_docs])[skip:]
+    if limit <= 0 or len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1]["created_at"], docs[-1]["id"])
+
+
+async def merged_stream(db, collection: str, fields: List[str], start: Optional[datetime],
+                        end: Optional[datetime], batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+    """Both tiers of ``collection`` in list order, fetched in batches"""
+    projection = {f: 1 for f in fields} | {"_id": 0}
+    bounds = {k: v for k, v in (("$gte", start), ("$lt", end)) if v is not None}
+    hot = db[collection].find({"created_at": bounds} if bounds else {}, projection).sort(SORT_ORDER)
+    cold = db[archive_name(collection)].find(archive_filter(None, start, end)).sort(ARCHIVE_SORT)
+    hot, cold = hot.batch_size(batch_size), cold.batch_size(batch_size)
+
+    async def pull(cursor, decode=None):
+        try:
+            doc = await cursor.next()
+        except StopAsyncIteration:
+            return None
+        return decode(collection, doc) if decode else doc
+
+    a, b = await asyncio.gather(pull(hot), pull(cold, expand))
+    while a is not None or b is not None:
+        if b is None or (a is not None and _sort_key(a) > _sort_key(b)):
+            yield a
+            a = await pull(hot)
+        elif a is None or _sort_key(b) > _sort_key(a):
+            yield b
+            b = await pull(cold, expand)
+        else:
+            yield a
+            a, b = await asyncio.gather(pull(hot), pull(cold, expand))
+
+
+class Archiver:
+    def __init__(self, collections: List[str], after: timedelta, batch_size: int = 500,
+                 rate: float = 1000.0, interval: float = 3600.0):
+        self.collections = collections
+        self.after = after
+        self.batch_size = batch_size
+        # Documents moved per second, at most
+        self.rate = rate
+        self.interval = interval
+        self.archived: Dict[str, int] = {name: 0 for name in collections}
+        self.passes = 0
+        self.last_pass: Optional[datetime] = None
+
+    async def ensure_indexes(self, db) -> None:
+        for name in ARCHIVE_FIELDS:
+            try:
+                await db[archive_name(name)].create_indexes([IndexModel(ARCHIVE_SORT, name="t_desc_id_desc")])
+            except PyMongoError as e:
+                logger.error("Failed to ensure archive index on %s: %s", name, e)
+
+    async def _acquire(self, db) -> bool:
+        """Take the pass lease unless another worker ran a pass within the interval"""
+        now = datetime.utcnow()
+        try:
+            await db.counters.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"until": {"$lte": now}}, {"until": {"$exists": False}}]},
+                {"$set": {"until": now + timedelta(seconds=self.interval)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # The lease document exists and has not expired, so the upsert collided with it
+            return False
+
+    async def move_batch(self, db, collection: str, cutoff: datetime) -> int:
+        docs = await db[collection].find({"created_at": {"$lt": cutoff}}).sort(
+            [("created_at", ASCENDING), ("id", ASCENDING)]
+        ).limit(self.batch_size).to_list(length=None)
+        if not docs:
+            return 0
+        try:
+            await db[archive_name(collection)].insert_many([compact(collection, d) for d in docs], ordered=False)
+        except BulkWriteError as e:
+            # Duplicates were archived by an interrupted pass; anything else keeps the batch hot
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        await db[collection].delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+        # Pages change when documents leave the hot tier, so list ETags must too
+        await db.counters.update_one(
+            {"_id": TOTALS_ID}, {"$inc": {f"versions.{collection}": len(docs)}}, upsert=True
+        )
+        return len(docs)
+
+    async def run(self, db) -> Dict[str, int]:
+        """Archive everything older than ``after``, pacing batches to ``rate``"""
+        cutoff = datetime.utcnow() - self.after
+        moved = {}
+        for collection in self.collections:
+            moved[collection] = 0
+            while True:
+                started = time.monotonic()
+                count = await self.move_batch(db, collection, cutoff)
+                moved[collection] += count
+                self.archived[collection] += count
+                if count < self.batch_size:
+                    break
+                await asyncio.sleep(max(0.0, count / self.rate - (time.monotonic() - started)))
+        self.passes += 1
+        self.last_pass = datetime.utcnow()
+        logger.info("Archived documents older than %s: %s", cutoff.isoformat(), moved)
+        return moved
+
+    async def run_forever(self, db) -> None:
+        while True:
+            try:
+                if await self._acquire(db):
+                    await self.run(db)
+            except PyMongoError as e:
+                # Batches are idempotent, so the next pass picks up where this one stopped
+                logger.error("Archive pass failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "after_days": self.after.total_seconds() / 86400,
+            "passes": self.passes,
+            "last_pass": self.last_pass.isoformat() if self.last_pass else None,
+            "archived": dict(self.archived),
+        }
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Hot/cold archive benchmark
+Seeds a scratch donations collection spread over --days, archives everything
+older than --after-days at --rate documents/s, and reports document and index
+sizes per tier, the achieved move rate, and list latency for the hot tier alone
+against both tiers merged (first page and a page deep in the archive)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import bson
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from archive import ARCHIVE_SORT, Archiver, archive_name  # noqa: E402
+from indexes import INDEXES  # noqa: E402
+from pagination import encode_cursor  # noqa: E402
+from storage import MongoStorage  # noqa: E402
+
+
+async def seed(db, total: int, days: int, batch: int = 10_000):
+    """``total`` donation-shaped documents spread evenly over the last ``days`` days"""
+    await db.donations.drop()
+    await db[archive_name("donations")].drop()
+    step = timedelta(days=days) / total
+    start = datetime.utcnow() - timedelta(days=days)
+    for offset in range(0, total, batch):
+        docs = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": "Bench Donor",
+                "email": "bench@example.com",
+                "phone": "9876543210",
+                "amount": "500",
+                "amount_paise": 50000,
+                "message": None,
+                "created_at": start + step * i,
+                "status": "pending",
+            }
+            for i in range(offset, min(offset + batch, total))
+        ]
+        await db.donations.insert_many(docs, ordered=False)
+    await db.donations.create_indexes(INDEXES["donations"][:1])
+
+
+async def sizes(db, name: str):
+    """(documents, average BSON bytes, index bytes); index size needs a real server"""
+    sample = await db[name].find({}).limit(1000).to_list(length=None)
+    average = statistics.mean(len(bson.encode(doc)) for doc in sample) if sample else 0
+    try:
+        index_size = (await db.command("collStats", name))["totalIndexSize"]
+    except Exception:
+        index_size = None
+    return await db[name].count_documents({}), average, index_size
+
+
+async def time_call(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=730, help="age of the oldest document")
+    parser.add_argument("--after-days", type=float, default=180)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=20_000, help="documents moved per second, at most")
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--stand-in", action="store_true", help="in-memory Mongo stand-in instead of MONGO_URL")
+    args = parser.parse_args()
+
+    if args.stand_in:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+        db = client["bench"]
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db = client[f"{os.environ['DB_NAME']}_bench"]
+    storage = MongoStorage(db)
+
+    print(f"Seeding {args.documents} documents over {args.days} days...")
+    await seed(db, args.documents, args.days)
+    before = await sizes(db, "donations")
+
+    archiver = Archiver(["donations"], timedelta(days=args.after_days), batch_size=args.batch_size, rate=args.rate)
+    await archiver.ensure_indexes(db)
+    started = time.perf_counter()
+    moved = (await archiver.run(db))["donations"]
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'tier':<22}{'documents':>10}{'avg bytes':>11}{'index bytes':>13}")
+    rows = [("before (all hot)", *before), ("hot", *await sizes(db, "donations")),
+            ("archive", *await sizes(db, archive_name("donations")))]
+    for label, count, average, index_size in rows:
+        print(f"{label:<22}{count:>10}{average:>11.1f}{index_size if index_size is not None else '-':>13}")
+    print(f"\nmoved {moved} in {elapsed:.2f}s = {moved / elapsed:.0f} docs/s (limit {args.rate:.0f})")
+
+    # Cursor halfway through the archive
+    anchor = await db[archive_name("donations")].find().sort(ARCHIVE_SORT).skip(moved // 2).limit(1).to_list(1)
+    deep = encode_cursor(anchor[0]["t"], anchor[0]["_id"]) if anchor else None
+    results = {
+        "hot, first page": lambda: storage.list_page("donations", limit=args.limit),
+        "merged, first page": lambda: storage.list_page("donations", limit=args.limit, include_archived=True),
+        "merged, archive page": lambda: storage.list_page(
+            "donations", limit=args.limit, cursor=deep, include_archived=True
+        ),
+    }
+    print(f"\n{'list':<24}{'median ms':>10}")
+    for label, fn in results.items():
+        print(f"{label:<24}{await time_call(fn, args.repeat):>10.2f}")
+
+    if not args.stand_in:
+        await db.donations.drop()
+        await db[archive_name("donations")].drop()
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
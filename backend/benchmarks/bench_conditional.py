@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Dashboard polling benchmark: plain list responses vs ETag/304 vs cached compressed pages
+Polls GET /api/donations the way an admin dashboard does and reports requests/s,
+bytes on the wire per response and storage queries per response for each mode
+(in-memory Mongo stand-in by default, --sqlite for the embedded backend)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from storage import MongoStorage, SQLiteStorage  # noqa: E402
+
+
+async def seed(storage, count: int):
+    now = datetime.utcnow()
+    await storage.insert_many("donations", [
+        {
+            "id": str(uuid.uuid4()), "name": f"Donor {i}", "email": f"donor{i}@example.com",
+            "phone": f"9{i:09d}", "created_at": now - timedelta(seconds=i), "status": "pending",
+            "amount": "500", "amount_paise": 50000, "message": "Jai Hind",
+        }
+        for i in range(count)
+    ])
+
+
+async def poll(client: httpx.AsyncClient, limit: int, duration: float, revalidate: bool):
+    """(requests, requests/s, wire bytes per response)"""
+    etag, count, wire = None, 0, 0
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        headers = {"Accept-Encoding": "br, gzip"}
+        if revalidate and etag:
+            headers["If-None-Match"] = etag
+        async with client.stream("GET", "/api/donations", params={"limit": limit}, headers=headers) as response:
+            async for chunk in response.aiter_raw():
+                wire += len(chunk)
+            etag = response.headers.get("etag")
+        count += 1
+    return count, count / (time.perf_counter() - started), wire / count
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--sqlite", action="store_true")
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    if args.sqlite:
+        server.client, server.db = None, None
+        server.storage = SQLiteStorage(os.path.join(scratch.name, "bench.sqlite3"))
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        server.client = AsyncMongoMockClient()
+        server.db = server.client["bench"]
+        server.storage = MongoStorage(server.db)
+    await server.storage.ensure_schema()
+    await seed(server.storage, args.limit * 2)
+
+    queries = 0
+    list_page = server.storage.list_page
+
+    async def counted(*a, **k):
+        nonlocal queries
+        queries += 1
+        return await list_page(*a, **k)
+
+    server.storage.list_page = counted
+
+    transport = httpx.ASGITransport(app=server.app)
+    print(f"{'mode':<14}{'req/s':>10}{'bytes/resp':>12}{'queries/resp':>14}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode, conditional, revalidate in (("plain", False, False),
+                                              ("cached+br", True, False),
+                                              ("etag/304", True, True)):
+            server.CONDITIONAL_GET = conditional
+            queries = 0
+            count, rps, wire = await poll(client, args.limit, args.duration, revalidate)
+            print(f"{mode:<14}{rps:>10.1f}{wire:>12.0f}{queries / count:>14.3f}")
+
+    await server.storage.close()
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
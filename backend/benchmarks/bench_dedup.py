@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Duplicate-check benchmark: Bloom filter pre-check vs always querying Mongo
+Seeds memberships, warms the filters and times checks for fresh and existing values
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from dedup import DuplicateGuard, DuplicateSubmission  # noqa: E402
+from storage import MongoStorage  # noqa: E402
+
+
+def identity(i: int):
+    return {"email": f"member{i}@example.com", "phone": f"9{i:09d}"}
+
+
+async def seed(db, total: int, batch: int = 10_000):
+    now = datetime.utcnow()
+    for offset in range(0, total, batch):
+        await db.memberships.insert_many([
+            {"id": str(uuid.uuid4()), "membershipNumber": f"BENCH{i}", "created_at": now, **identity(i)}
+            for i in range(offset, min(offset + batch, total))
+        ], ordered=False)
+
+
+async def time_checks(guard: DuplicateGuard, storage, values) -> float:
+    """Mean microseconds per check"""
+    t0 = time.perf_counter()
+    for v in values:
+        try:
+            await guard.check(storage, "memberships", v)
+        except DuplicateSubmission:
+            pass
+    return (time.perf_counter() - t0) / len(values) * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--existing", type=int, default=100_000, help="memberships to seed")
+    parser.add_argument("--checks", type=int, default=5_000)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ['DB_NAME']}_bench"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    storage = MongoStorage(db)
+    await storage.ensure_schema()
+    await seed(db, args.existing)
+
+    guard = DuplicateGuard(("memberships",), capacity=args.existing * 2)
+    t0 = time.perf_counter()
+    await guard.warm(storage)
+    print(f"warm-up: {args.existing} documents in {time.perf_counter() - t0:.2f}s")
+
+    fresh = [identity(args.existing + i) for i in range(args.checks)]
+    known = [identity(i) for i in range(args.checks)]
+
+    print(f"{'values':<10}{'mode':<8}{'us/check':>10}{'db calls':>10}")
+    for label, values in (("fresh", fresh), ("existing", known)):
+        for mode, ready in (("bloom", True), ("mongo", False)):
+            guard.ready, guard.db_checks = ready, 0
+            us = await time_checks(guard, storage, values)
+            print(f"{label:<10}{mode:<8}{us:>10.1f}{guard.db_checks:>10}")
+
+    await client.drop_database(db_name)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Bulk import benchmark
+Streams generated NDJSON/CSV uploads of increasing size through
+POST /api/volunteers/import on the embedded SQLite backend and reports rows/s
+and the process's peak RSS, which should stay flat as the upload grows
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from storage import SQLiteStorage  # noqa: E402
+
+HEADER = "name,email,phone,skills,availability\n"
+
+
+def row(i: int, fmt: str) -> str:
+    # Every 50th row has a bad phone so the error path is exercised too
+    phone = "12345" if i % 50 == 0 else f"9{i:09d}"
+    if fmt == "csv":
+        return f"Volunteer {i},vol{i}@example.com,{phone},\"Canvassing, data entry\",Weekends\n"
+    return (f'{{"name": "Volunteer {i}", "email": "vol{i}@example.com", "phone": "{phone}", '
+            f'"skills": "Canvassing, data entry", "availability": "Weekends"}}\n')
+
+
+async def upload(start: int, rows: int, fmt: str, chunk_bytes: int = 64 * 1024):
+    """Generated on the fly so the upload itself never sits in memory"""
+    buffer = HEADER if fmt == "csv" else ""
+    for i in range(start, start + rows):
+        buffer += row(i, fmt)
+        if len(buffer) >= chunk_bytes:
+            yield buffer.encode()
+            buffer = ""
+    if buffer:
+        yield buffer.encode()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    server.client = None
+    server.db = None
+    server.storage = SQLiteStorage(os.path.join(scratch.name, "import.sqlite3"))
+    await server.storage.ensure_schema()
+    # Filters are never warmed on a fresh database; treat them as complete
+    server.duplicate_guard.ready = True
+
+    transport = httpx.ASGITransport(app=server.app)
+    print(f"{'rows':>9}{'inserted':>10}{'failed':>8}{'rows/s':>10}{'peak RSS MiB':>14}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = 0
+        for size in args.sizes:
+            t0 = time.perf_counter()
+            response = await client.post(
+                "/api/volunteers/import", params={"format": args.format}, content=upload(start, size, args.format)
+            )
+            elapsed = time.perf_counter() - t0
+            # ru_maxrss is in KiB on Linux; a high-water mark, so growth shows up immediately
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            report = response.json()
+            print(f"{size:>9}{report['inserted']:>10}{report['failed']:>8}"
+                  f"{size / elapsed:>10.0f}{peak:>14.1f}")
+            start += size
+
+    await server.storage.close()
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
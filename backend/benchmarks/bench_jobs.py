@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Acknowledgement job queue benchmark
+Posts donations with ACK_EMAILS off and on against a local SMTP sink that takes
+--smtp-delay seconds per message and rejects --fail-rate of them, and reports
+request latency next to what sending inline would have cost, then how fast the
+job workers drain the queue, the peak number of SMTP sessions, retries and
+dead letters (in-memory Mongo stand-in; set JOB_CONCURRENCY in the environment)
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import server  # noqa: E402
+from mailer import donation_receipt  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+from storage import MongoStorage  # noqa: E402
+
+
+async def post_donations(client: httpx.AsyncClient, count: int, concurrency: int, offset: int) -> List[float]:
+    latencies: List[float] = []
+    pending = iter(range(offset, offset + count))
+
+    async def user():
+        for i in pending:
+            t0 = time.perf_counter()
+            response = await client.post("/api/donations", json={
+                "name": "Bench Donor", "email": f"donor{i}@example.com", "phone": "9876543210", "amount": "500",
+            })
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies
+
+
+def summary(latencies: List[float]) -> str:
+    latencies = sorted(latencies)
+    return f"p50 {statistics.median(latencies):8.2f} ms   p99 {latencies[int(len(latencies) * 0.99) - 1]:8.2f} ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent HTTP clients")
+    parser.add_argument("--smtp-delay", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    sink = SMTPSink(args.smtp_delay, args.fail_rate, quiet=True)
+    smtp = await sink.start(port=0)
+    server.mail_sender.port = smtp.sockets[0].getsockname()[1]
+    server.client = AsyncMongoMockClient()
+    server.db = server.client["bench"]
+    server.storage = MongoStorage(server.db)
+    queue = server.job_queue
+    # Fast retries so the run finishes; the schedule shape is the same
+    queue.base_delay, queue.max_delay, queue.poll_interval = 0.05, 1.0, 0.05
+
+    payload = {"id": "bench", "name": "Bench Donor", "email": "donor@example.com",
+               "amount": "500", "amount_paise": 50000, "created_at": "2026-01-01T00:00:00"}
+    sink.fail_rate, inline = 0.0, []
+    for _ in range(10):
+        t0 = time.perf_counter()
+        await server.mail_sender.send(donation_receipt(payload))
+        inline.append((time.perf_counter() - t0) * 1000)
+    sink.fail_rate, sink.messages = args.fail_rate, []
+
+    transport = httpx.ASGITransport(app=server.app)
+    # Starts the job workers with the lifespan
+    server.ACK_EMAILS = True
+    async with server.app.router.lifespan_context(server.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            server.ACK_EMAILS = False
+            without = await post_donations(client, args.donations, args.concurrency, 0)
+            server.ACK_EMAILS = True
+            started = time.perf_counter()
+            queued = await post_donations(client, args.donations, args.concurrency, args.donations)
+            while await server.db.jobs.count_documents({}):
+                await asyncio.sleep(0.05)
+            drained = time.perf_counter() - started
+
+    print(f"POST /api/donations, ACK_EMAILS off   {summary(without)}")
+    print(f"POST /api/donations, queued email     {summary(queued)}")
+    print(f"one inline SMTP send (no failures)    {summary(inline)}")
+    metrics = queue.metrics()
+    dead = await server.db.jobs_dead.count_documents({})
+    print(f"queue drained in {drained:.2f}s: {len(sink.messages)} sent, {metrics['retried']} retries, "
+          f"{dead} dead letters, peak {sink.peak_sessions} SMTP sessions (JOB_CONCURRENCY {server.JOB_CONCURRENCY})")
+    smtp.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
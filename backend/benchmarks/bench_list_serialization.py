@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+List serialization benchmark: model path vs raw fast path
+Drives GET /api/donations in-process and reports requests per second for each path
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+import server  # noqa: E402
+from storage import MongoStorage  # noqa: E402
+
+
+async def seed(db, total: int):
+    await db.donations.drop()
+    start = datetime.utcnow() - timedelta(seconds=total)
+    await db.donations.insert_many([
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Bench Donor",
+            "email": "bench@example.com",
+            "phone": "9876543210",
+            "amount": str(100 + i),
+            "message": "Jai Hind" if i % 2 else None,
+            "created_at": start + timedelta(seconds=i),
+            "status": "pending",
+        }
+        for i in range(total)
+    ])
+
+
+async def rps(client: httpx.AsyncClient, limit: int, duration: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        response = await client.get("/api/donations", params={"limit": limit})
+        response.raise_for_status()
+        count += 1
+    return count / duration
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per path")
+    args = parser.parse_args()
+
+    server.client = server.connect_mongo()
+    server.db = server.client[f"{os.environ['DB_NAME']}_bench"]
+    server.storage = MongoStorage(server.db)
+    # Compare the plain list paths, not the ETag/hot-page path
+    server.CONDITIONAL_GET = False
+    await seed(server.db, args.limit * 2)
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        server.LIST_FAST_PATH = False
+        model_body = (await client.get("/api/donations", params={"limit": args.limit})).content
+        model_rps = await rps(client, args.limit, args.duration)
+
+        server.LIST_FAST_PATH = True
+        fast_body = (await client.get("/api/donations", params={"limit": args.limit})).content
+        fast_rps = await rps(client, args.limit, args.duration)
+
+    print(f"byte-identical: {model_body == fast_body}")
+    print(f"{'path':<8}{'req/s':>10}")
+    print(f"{'model':<8}{model_rps:>10.1f}")
+    print(f"{'fast':<8}{fast_rps:>10.1f}")
+    print(f"speedup: {fast_rps / model_rps:.2f}x")
+
+    await server.db.donations.drop()
+    server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Dashboard freshness benchmark: N admin dashboards polling GET /api/donations vs
+N dashboards on GET /api/live that refetch the first page when told to.
+A writer posts a donation every --write-interval seconds; for each mode the
+script reports HTTP requests/s, list queries against storage and how long a
+dashboard took to notice a new donation. Serves the app with uvicorn on a local
+port (in-memory Mongo stand-in by default, --sqlite for the embedded backend).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from storage import MongoStorage, SQLiteStorage  # noqa: E402
+
+
+class Counters:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.last_write = 0.0
+        self.latencies: List[float] = []
+
+
+async def writer(client: httpx.AsyncClient, counters: Counters, interval: float, stop: asyncio.Event):
+    i = 0
+    while not stop.is_set():
+        counters.last_write = time.perf_counter()
+        await client.post("/api/donations", json={
+            "name": "Bench Donor", "email": f"bench{i}@example.com", "phone": "9876543210", "amount": "500",
+        })
+        i += 1
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def fetch_page(client: httpx.AsyncClient, counters: Counters, etag):
+    headers = {"If-None-Match": etag} if etag else {}
+    response = await client.get("/api/donations", params={"limit": 20}, headers=headers)
+    counters.requests += 1
+    return response.headers.get("etag", etag), response.status_code == 200
+
+
+async def polling_dashboard(client, counters: Counters, interval: float, stop: asyncio.Event):
+    etag, _ = await fetch_page(client, counters, None)
+    seen = counters.last_write
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        etag, changed = await fetch_page(client, counters, etag)
+        if changed and counters.last_write > seen:
+            seen = counters.last_write
+            counters.latencies.append(time.perf_counter() - seen)
+
+
+async def live_dashboard(client, counters: Counters, stop: asyncio.Event):
+    etag, _ = await fetch_page(client, counters, None)
+    async with client.stream("GET", "/api/live", params={"types": "donations"}) as response:
+        counters.requests += 1
+        async for line in response.aiter_lines():
+            if stop.is_set():
+                return
+            if line == "event: donations":
+                counters.latencies.append(time.perf_counter() - counters.last_write)
+                etag, _ = await fetch_page(client, counters, etag)
+
+
+async def run_mode(base_url: str, mode: str, args) -> Counters:
+    counters = Counters()
+    list_page = server.storage.list_page
+
+    async def counted(*a, **k):
+        counters.queries += 1
+        return await list_page(*a, **k)
+
+    server.storage.list_page = counted
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.dashboards + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        if mode == "live":
+            dashboards = [live_dashboard(client, counters, stop) for _ in range(args.dashboards)]
+        else:
+            dashboards = [polling_dashboard(client, counters, args.poll_interval, stop)
+                          for _ in range(args.dashboards)]
+        tasks = [asyncio.create_task(d) for d in dashboards]
+        await asyncio.sleep(1)
+        counters.requests = counters.queries = 0
+        write_task = asyncio.create_task(writer(client, counters, args.write_interval, stop))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await write_task
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    server.storage.list_page = list_page
+    return counters
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dashboards", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--write-interval", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per mode")
+    parser.add_argument("--sqlite", action="store_true")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    scratch = tempfile.TemporaryDirectory()
+    if args.sqlite:
+        server.client, server.db = None, None
+        server.storage = SQLiteStorage(os.path.join(scratch.name, "bench.sqlite3"))
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        server.client = AsyncMongoMockClient()
+        server.db = server.client["bench"]
+        server.storage = MongoStorage(server.db)
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning",
+                            timeout_graceful_shutdown=1)
+    uvicorn_server = uvicorn.Server(config)
+    serve_task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.05)
+
+    print(f"{args.dashboards} dashboards, a donation every {args.write_interval}s, "
+          f"polling every {args.poll_interval}s")
+    print(f"{'mode':<10}{'req/s':>9}{'queries/s':>11}{'notice p50 ms':>15}{'notice max ms':>15}")
+    for mode in ("polling", "live"):
+        counters = await run_mode(f"http://127.0.0.1:{port}", mode, args)
+        latencies = [ms * 1000 for ms in counters.latencies] or [0.0]
+        print(f"{mode:<10}{counters.requests / args.duration:>9.1f}{counters.queries / args.duration:>11.1f}"
+              f"{statistics.median(latencies):>15.1f}{max(latencies):>15.1f}")
+
+    uvicorn_server.should_exit = True
+    await serve_task
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
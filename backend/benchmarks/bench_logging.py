@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Logging pipeline benchmark
+Runs request-shaped coroutines that each log one INFO line (the submission
+handlers' "New ... created" message) against a sink that stalls for
+--sink-delay ms every --stall-every writes, like a pipe to a busy log shipper.
+Compares a synchronous StreamHandler (the old logging.basicConfig) with the
+queued pipeline, with and without INFO sampling, and reports the time spent in
+the log call, event loop lag while logging, and records written/dropped.
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from logs import TEXT_FORMAT, LogPipeline  # noqa: E402
+
+
+class StallingSink(io.TextIOBase):
+    def __init__(self, delay: float, every: int):
+        self.delay = delay
+        self.every = every
+        self.writes = 0
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        self.lines += text.count("\n")
+        if self.every and self.writes % self.every == 0:
+            time.sleep(self.delay)
+        return len(text)
+
+
+async def lag_probe(stop: asyncio.Event, lags: list, interval: float = 0.001):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - t0 - interval) * 1000)
+
+
+async def run(logger: logging.Logger, requests: int, concurrency: int):
+    calls: list = []
+    lags: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(lag_probe(stop, lags))
+    pending = iter(range(requests))
+
+    async def worker():
+        for i in pending:
+            t0 = time.perf_counter()
+            logger.info("New donation created: %s for amount: ₹%s", f"donation-{i}", "500")
+            calls.append((time.perf_counter() - t0) * 1e6)
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return calls, lags, elapsed
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sink-delay", type=float, default=5.0, help="ms per stall")
+    parser.add_argument("--stall-every", type=int, default=200, help="writes between stalls")
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    delay = args.sink_delay / 1000
+    print(f"{'handler':<28}{'call p50 us':>12}{'call p99 us':>12}{'call max ms':>12}"
+          f"{'lag max ms':>11}{'total s':>9}{'written':>9}{'dropped':>9}")
+    for label, sample in (("sync StreamHandler", None), ("queued", {}), ("queued, INFO=0.1", {logging.INFO: 0.1})):
+        sink = StallingSink(delay, args.stall_every)
+        logger = logging.getLogger(f"bench.{label}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        pipeline = None
+        if sample is None:
+            handler = logging.StreamHandler(sink)
+            handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        else:
+            pipeline = LogPipeline(queue_size=args.queue_size, sample_rates=sample, stream=sink)
+            pipeline.listener.start()
+            handler = pipeline.handler
+        logger.addHandler(handler)
+        calls, lags, elapsed = asyncio.run(run(logger, args.requests, args.concurrency))
+        dropped = 0
+        if pipeline is not None:
+            pipeline.close()
+            dropped = pipeline.metrics()["dropped"]
+        print(f"{label:<28}{statistics.median(calls):>12.1f}{percentile(calls, 0.99):>12.1f}"
+              f"{max(calls) / 1000:>12.2f}{max(lags):>11.2f}{elapsed:>9.2f}{sink.lines:>9}{dropped:>9}")
+
+
+if __name__ == "__main__":
+    main()
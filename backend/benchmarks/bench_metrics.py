@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead benchmark
+Times a trivial FastAPI route with and without MetricsMiddleware, and the cost of
+one Mongo command event pair through CommandTimer
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from fastapi import FastAPI
+from pymongo import monitoring
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from metrics import CommandTimer, MetricsMiddleware, MetricsRegistry  # noqa: E402
+
+
+def build_app(with_metrics: bool):
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    """Mean microseconds per request, calling the ASGI app directly"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/ping", "raw_path": b"/api/ping", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm-up
+        await app(dict(scope), receive, send)
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - t0) / requests * 1e6
+
+
+def listener_cost(events: int) -> float:
+    """Mean microseconds per started/succeeded pair"""
+    timer = CommandTimer(MetricsRegistry())
+    address = ("localhost", 27017)
+    started = [monitoring.CommandStartedEvent({"find": "donations"}, "bench", i, address, i)
+               for i in range(events)]
+    succeeded = [monitoring.CommandSucceededEvent(timedelta(microseconds=800), {"ok": 1}, "find", i, address, i)
+                 for i in range(events)]
+    t0 = time.perf_counter()
+    for s, d in zip(started, succeeded):
+        timer.started(s)
+        timer.succeeded(d)
+    return (time.perf_counter() - t0) / events * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    bare = await drive(build_app(False), args.requests)
+    instrumented = await drive(build_app(True), args.requests)
+    print(f"{'app':<14}{'us/request':>12}")
+    print(f"{'bare':<14}{bare:>12.1f}")
+    print(f"{'instrumented':<14}{instrumented:>12.1f}")
+    print(f"middleware overhead: {instrumented - bare:.1f} us/request "
+          f"({(instrumented - bare) / bare * 100:.1f}%)")
+    print(f"CommandTimer: {listener_cost(args.requests):.2f} us per Mongo command")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Submission model validation benchmark
+Compares the previous models (v1-style @validator methods, plain EmailStr, the
+stored model rebuilt field by field and validated again, then .dict()) with the
+current ones (shared Annotated Phone/Email types, Donation.build and
+document(), TypeAdapter list validation). Reports validations per second for:
+- DonationCreate from a request body
+- the whole create path: input model, stored model, document to insert
+- a 50-document list page read back from storage
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, Field, validator
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from rollups import to_paise  # noqa: E402
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+class LegacyDonationCreate(BaseModel):
+    name: str = Field(..., min_length=2, max_length=100)
+    email: EmailStr
+    phone: str = Field(..., min_length=10, max_length=15)
+    amount: str = Field(..., min_length=1)
+    message: Optional[str] = Field(None, max_length=1000)
+
+    @validator('phone')
+    def validate_phone(cls, v):
+        cleaned = ''.join(filter(str.isdigit, v))
+        if len(cleaned) != 10 or not cleaned.startswith(('6', '7', '8', '9')):
+            raise ValueError('Phone number must be a valid 10-digit Indian mobile number')
+        return cleaned
+
+    @validator('amount')
+    def validate_amount(cls, v):
+        to_paise(v)
+        return v
+
+
+class LegacyDonation(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str = Field(..., min_length=2, max_length=100)
+    email: EmailStr
+    phone: str = Field(..., min_length=10, max_length=15)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    status: str = Field(default="pending")
+    amount: str
+    amount_paise: Optional[int] = None
+    message: Optional[str] = None
+
+
+def legacy_create(body):
+    data = LegacyDonationCreate(**body)
+    donation = LegacyDonation(
+        name=data.name,
+        email=data.email,
+        phone=data.phone,
+        amount=data.amount,
+        amount_paise=to_paise(data.amount),
+        message=data.message,
+    )
+    return donation.dict()
+
+
+def current_create(body):
+    data = server.DonationCreate(**body)
+    return server.Donation.build(data, amount_paise=to_paise(data.amount)).document()
+
+
+def bodies(count: int):
+    return [
+        {
+            "name": f"Donor {i}", "email": f"Donor.{i}@Example.com", "phone": f"98765 {i % 100000:05d}",
+            "amount": "500", "message": "Jai Hind",
+        }
+        for i in range(count)
+    ]
+
+
+def rate(fn, items, rounds: int) -> float:
+    rates = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        rates.append(len(items) / (time.perf_counter() - started))
+    return statistics.median(rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=5000, help="bodies per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--page", type=int, default=50, help="documents per list page")
+    args = parser.parse_args()
+
+    items = bodies(args.count)
+    documents = [current_create(body) for body in items]
+    pages = [documents[i:i + args.page] for i in range(0, len(documents) - args.page + 1, args.page)]
+    assert legacy_create(items[0]).keys() == documents[0].keys()
+
+    cases = [
+        ("DonationCreate", "bodies/s", items,
+         lambda body: LegacyDonationCreate(**body), lambda body: server.DonationCreate(**body)),
+        ("create path", "bodies/s", items, legacy_create, current_create),
+        (f"list page of {args.page}", "pages/s", pages,
+         lambda page: [LegacyDonation(**d) for d in page], server.DONATION_LIST.validate_python),
+    ]
+    print(f"{'case':<20}{'unit':>10}{'before':>12}{'after':>12}{'speedup':>9}")
+    for label, unit, inputs, before, after in cases:
+        old = rate(before, inputs, args.rounds)
+        new = rate(after, inputs, args.rounds)
+        print(f"{label:<20}{unit:>10}{old:>12.0f}{new:>12.0f}{new / old:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pagination benchmark: skip/limit vs keyset cursor
+Seeds a scratch collection and times page 1 and a deep page with both strategies
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from pagination import SORT_ORDER, encode_cursor, fetch_page  # noqa: E402
+
+
+async def seed(collection, total: int, batch: int = 10_000):
+    """Insert ``total`` donation-shaped documents spaced one second apart"""
+    await collection.drop()
+    start = datetime.utcnow() - timedelta(seconds=total)
+    for offset in range(0, total, batch):
+        docs = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": "Bench Donor",
+                "email": "bench@example.com",
+                "phone": "9876543210",
+                "amount": "100",
+                "created_at": start + timedelta(seconds=i),
+                "status": "pending",
+            }
+            for i in range(offset, min(offset + batch, total))
+        ]
+        await collection.insert_many(docs, ordered=False)
+    await collection.create_index(SORT_ORDER)
+
+
+async def time_call(fn, repeat: int) -> float:
+    """Median latency of ``fn()`` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=10_000, help="deep page number to compare")
+    parser.add_argument("--limit", type=int, default=10, help="page size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the previously seeded collection")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    collection = client[f"{os.environ['DB_NAME']}_bench"]["pagination"]
+    total = args.page * args.limit
+
+    if not args.no_seed:
+        print(f"Seeding {total} documents...")
+        await seed(collection, total)
+
+    # Cursor pointing at the last document of the page before the deep one
+    deep_skip = (args.page - 1) * args.limit
+    anchor = await collection.find().sort(SORT_ORDER).skip(deep_skip - 1).limit(1).to_list(length=1)
+    deep_cursor = encode_cursor(anchor[0]["created_at"], anchor[0]["id"])
+
+    results = {
+        ("skip", 1): await time_call(lambda: fetch_page(collection, limit=args.limit), args.repeat),
+        ("skip", args.page): await time_call(
+            lambda: fetch_page(collection, skip=deep_skip, limit=args.limit), args.repeat
+        ),
+        ("cursor", 1): await time_call(lambda: fetch_page(collection, limit=args.limit), args.repeat),
+        ("cursor", args.page): await time_call(
+            lambda: fetch_page(collection, limit=args.limit, cursor=deep_cursor), args.repeat
+        ),
+    }
+
+    print(f"\n{'strategy':<10}{'page':>10}{'median ms':>14}")
+    for (strategy, page), ms in results.items():
+        print(f"{strategy:<10}{page:>10}{ms:>14.2f}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
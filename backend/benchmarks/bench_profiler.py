@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler overhead benchmark
+Serves GET /api/stats and GET /api/donations in-process (embedded SQLite) with
+profiling disabled (the default: no middleware mounted), enabled with a
+threshold nothing reaches (sampling only), and enabled keeping every request,
+in interleaved rounds so drift hits every mode alike. Reports requests/s and
+latency per mode and the change against disabled.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from profiler import ProfilerMiddleware, ProfileStore, SamplingProfiler  # noqa: E402
+from storage import SQLiteStorage  # noqa: E402
+
+
+async def seed(storage, count: int):
+    now = datetime.utcnow()
+    await storage.insert_many("donations", [
+        {
+            "id": str(uuid.uuid4()), "name": f"Donor {i}", "email": f"donor{i}@example.com",
+            "phone": f"9{i:09d}", "created_at": now - timedelta(seconds=i), "status": "pending",
+            "amount": "500", "amount_paise": 50000, "message": "Jai Hind",
+        }
+        for i in range(count)
+    ])
+
+
+async def load(app, path: str, requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    pending = iter(range(requests))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def user():
+            for _ in pending:
+                t0 = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started), latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per mode per round")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    server.CONDITIONAL_GET = False
+    server.storage = SQLiteStorage(f"{scratch.name}/bench.sqlite3")
+    store = ProfileStore(f"{scratch.name}/profiles", max_profiles=100)
+    sampling = SamplingProfiler(store, interval=args.interval_ms / 1000, threshold=3600)
+    keeping = SamplingProfiler(store, interval=args.interval_ms / 1000, threshold=0)
+    modes = {
+        "disabled": server.app,
+        "sampling, none kept": ProfilerMiddleware(server.app, sampling),
+        "sampling, all kept": ProfilerMiddleware(server.app, keeping),
+    }
+
+    async with server.app.router.lifespan_context(server.app):
+        await seed(server.storage, 1000)
+        for path in ("/api/stats", "/api/donations?limit=50"):
+            rates = {mode: [] for mode in modes}
+            latencies = {mode: [] for mode in modes}
+            for _ in range(args.rounds):
+                for mode, app in modes.items():
+                    rate, samples = await load(app, path, args.requests, args.concurrency)
+                    rates[mode].append(rate)
+                    latencies[mode] += samples
+            print(f"\nGET {path}")
+            print(f"{'mode':<22}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'vs disabled':>13}")
+            baseline = statistics.median(rates["disabled"])
+            for mode in modes:
+                rate = statistics.median(rates[mode])
+                ordered = sorted(latencies[mode])
+                print(f"{mode:<22}{rate:>9.0f}{statistics.median(ordered):>9.2f}"
+                      f"{ordered[int(len(ordered) * 0.99) - 1]:>9.2f}{(rate / baseline - 1) * 100:>12.1f}%")
+    print(f"\nprofiles kept: {keeping.kept} (ring buffer holds {store.max_profiles})")
+    await server.storage.close()
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
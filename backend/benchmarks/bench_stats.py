@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Stats benchmark: live count_documents vs materialized counters vs cached counters
+Grows scratch collections step by step and times /api/stats' data path at each size
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from cache import TTLCache  # noqa: E402
+from stats import TOTAL_FIELDS, day_start, read_stats, reconcile_counters  # noqa: E402
+
+
+async def live_counts(db):
+    """What get_stats used to do on every request"""
+    stats = {key: await db[name].count_documents({}) for key, name in TOTAL_FIELDS.items()}
+    stats["recent_activity"] = await db.donations.count_documents(
+        {"created_at": {"$gte": day_start(datetime.utcnow())}}
+    )
+    return stats
+
+
+async def grow(db, per_collection: int, batch: int = 10_000):
+    now = datetime.utcnow()
+    for name in TOTAL_FIELDS.values():
+        for offset in range(0, per_collection, batch):
+            docs = [
+                {"id": str(uuid.uuid4()), "name": "Bench", "created_at": now}
+                for _ in range(min(batch, per_collection - offset))
+            ]
+            await db[name].insert_many(docs, ordered=False)
+
+
+async def time_call(fn, repeat: int) -> float:
+    """Median latency of ``fn()`` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated documents per collection")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ['DB_NAME']}_bench"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    cached = TTLCache(lambda: read_stats(db), ttl=2)
+
+    print(f"{'docs/coll':>12}{'live ms':>12}{'counters ms':>14}{'cached ms':>12}")
+    current = 0
+    for size in (int(s) for s in args.sizes.split(",")):
+        await grow(db, size - current)
+        current = size
+        await reconcile_counters(db)
+        live = await time_call(lambda: live_counts(db), args.repeat)
+        counters = await time_call(lambda: read_stats(db), args.repeat)
+        hot = await time_call(cached.get, args.repeat)
+        print(f"{size:>12}{live:>12.2f}{counters:>14.2f}{hot:>12.3f}")
+
+    await client.drop_database(db_name)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
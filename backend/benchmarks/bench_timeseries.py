@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Donation time-series benchmark: $group over raw donations vs the rollup buckets
+Grows a scratch donations collection step by step (spread over the last 30 days)
+and times a 30-day daily series both ways at each size
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from rollups import read_timeseries, rebuild_rollups, series_bounds  # noqa: E402
+
+
+async def aggregate_series(db, start: datetime):
+    """What a chart would cost without rollups"""
+    return await db.donations.aggregate([
+        {"$match": {"created_at": {"$gte": start}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "count": {"$sum": 1},
+            "sum": {"$sum": "$amount_paise"},
+            "min": {"$min": "$amount_paise"},
+            "max": {"$max": "$amount_paise"},
+        }},
+        {"$sort": {"_id": 1}},
+    ]).to_list(None)
+
+
+async def grow(db, count: int, batch: int = 10_000):
+    now = datetime.utcnow()
+    for offset in range(0, count, batch):
+        docs = []
+        for _ in range(min(batch, count - offset)):
+            paise = random.randint(1, 10_000) * 100
+            docs.append({
+                "id": str(uuid.uuid4()),
+                "amount": str(paise // 100),
+                "amount_paise": paise,
+                "created_at": now - timedelta(seconds=random.randint(0, 30 * 86400)),
+            })
+        await db.donations.insert_many(docs, ordered=False)
+
+
+async def time_call(fn, repeat: int) -> float:
+    """Median latency of ``fn()`` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="comma-separated donation counts")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ['DB_NAME']}_bench"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    await db.donations.create_index("created_at")
+    starts = series_bounds("day", None, None)
+
+    print(f"{'donations':>12}{'$group ms':>12}{'rollups ms':>12}")
+    current = 0
+    for size in (int(s) for s in args.sizes.split(",")):
+        await grow(db, size - current)
+        current = size
+        await rebuild_rollups(db)
+        raw = await time_call(lambda: aggregate_series(db, starts[0]), args.repeat)
+        rolled = await time_call(lambda: read_timeseries(db, "day", starts), args.repeat)
+        print(f"{size:>12}{raw:>12.2f}{rolled:>12.2f}")
+
+    await client.drop_database(db_name)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Worker scaling benchmark for launcher.py
+Starts the launcher with 1, 2, 4, ... workers (embedded SQLite by default, --mongo
+for MONGO_URL), drives one endpoint from several client processes over real
+sockets and reports requests/s and latency per worker count. Throughput can
+only scale up to the number of cores not busy running the clients.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_launcher(workers: int, port: int, env: dict, reuse_port: bool) -> subprocess.Popen:
+    cmd = [sys.executable, "launcher.py", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    if reuse_port:
+        cmd.append("--reuse-port")
+    process = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            # Every worker has to be up, not just the first one to accept
+            if all(httpx.get(f"http://127.0.0.1:{port}/api/", timeout=1).status_code == 200
+                   for _ in range(workers * 2)):
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("launcher did not become ready")
+
+
+async def drive(url: str, concurrency: int, duration: float) -> Tuple[int, int, List[float]]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def user(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+    return len(latencies), errors, latencies
+
+
+def client_process(args) -> Tuple[int, int, List[float]]:
+    return asyncio.run(drive(*args))
+
+
+def measure(url: str, clients: int, concurrency: int, duration: float):
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client_process, [(url, concurrency, duration)] * clients)
+    requests = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    latencies = sorted(ms for r in results for ms in r[2])
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+    return requests / duration, statistics.median(latencies) if latencies else 0.0, p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--path", default="/api/", help="endpoint to drive, e.g. /api/donations?limit=20")
+    parser.add_argument("--clients", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight requests per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per worker count")
+    parser.add_argument("--reuse-port", action="store_true")
+    parser.add_argument("--mongo", action="store_true", help="use MONGO_URL instead of a scratch SQLite file")
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    env = dict(os.environ)
+    if not args.mongo:
+        env.update(STORAGE_BACKEND="sqlite", SQLITE_PATH=os.path.join(scratch.name, "bench.sqlite3"))
+
+    print(f"cores: {os.cpu_count()}  client processes: {args.clients}  path: {args.path}")
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'speedup':>9}")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        port = free_port()
+        launcher = start_launcher(workers, port, env, args.reuse_port)
+        try:
+            rps, p50, p99, errors = measure(f"http://127.0.0.1:{port}{args.path}",
+                                            args.clients, args.concurrency, args.duration)
+        finally:
+            launcher.send_signal(signal.SIGTERM)
+            launcher.wait()
+        baseline = baseline or rps
+        print(f"{workers:>8}{rps:>10.1f}{p50:>9.2f}{p99:>9.2f}{errors:>8}{rps / baseline:>8.2f}x")
+
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
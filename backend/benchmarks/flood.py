@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Bot flood against POST /api/contact, with and without rate limiting
+Runs the API through launcher.py (embedded SQLite) with RATE_LIMIT_ENABLED off and
+then on. In each run, legitimate users (one address each, well under the limit)
+post contact messages first on their own and then while a few addresses flood
+the endpoint with junk. Addresses are set with X-Forwarded-For, which uvicorn
+trusts from 127.0.0.1. Reports legitimate latency per phase and what the flood got back.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_workers import free_port, start_launcher  # noqa: E402
+
+
+def contact(i: int) -> dict:
+    return {"name": f"Visitor {i}", "email": f"visitor{i}@example.com",
+            "subject": "Volunteering query", "message": "How can I help in my district?"}
+
+
+async def legitimate(client: httpx.AsyncClient, user: int, interval: float, stop: asyncio.Event,
+                     latencies: List[float], statuses: Counter):
+    headers = {"X-Forwarded-For": f"10.0.{user // 250}.{user % 250 + 1}"}
+    await asyncio.sleep(random.uniform(0, interval))
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        response = await client.post("/api/contact", json=contact(user), headers=headers)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        statuses[response.status_code] += 1
+        await asyncio.sleep(interval)
+
+
+async def bot(port: int, address: str, stop_at: float, statuses: Counter):
+    """Raw keep-alive HTTP/1.1 so the flood costs the client as little as possible"""
+    body = json.dumps({"name": "x" * 90, "email": "bot@example.com",
+                       "subject": "BUY NOW " * 20, "message": "spam " * 300}).encode()
+    request = (f"POST /api/contact HTTP/1.1\r\nHost: 127.0.0.1\r\nX-Forwarded-For: {address}\r\n"
+               f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.time() < stop_at:
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            statuses[int(head[9:12])] += 1
+    except (OSError, asyncio.IncompleteReadError):
+        statuses["error"] += 1
+    finally:
+        writer.close()
+
+
+def flood_process(port: int, bots: int, addresses: int, stop_at: float, results) -> None:
+    async def flood():
+        statuses: Counter = Counter()
+        await asyncio.gather(*(bot(port, f"203.0.113.{b % addresses + 1}", stop_at, statuses)
+                               for b in range(bots)))
+        results.update(statuses)
+    asyncio.run(flood())
+
+
+async def phase(port: int, args, flood: bool):
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    legit = Counter()
+    flooder, flooded = None, {}
+    if flood:
+        flooded = multiprocessing.Manager().dict()
+        flooder = multiprocessing.Process(target=flood_process, args=(
+            port, args.bots, args.bot_addresses, time.time() + args.duration, flooded))
+        flooder.start()
+    limits = httpx.Limits(max_connections=args.users + 10)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+        tasks = [asyncio.create_task(legitimate(client, u, args.interval, stop, latencies, legit))
+                 for u in range(args.users)]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    if flooder is not None:
+        flooder.join()
+    latencies.sort()
+    return latencies, legit, Counter(dict(flooded))
+
+
+async def run(port: int, args, limited: bool):
+    for flood in (False, True):
+        latencies, legit, flooded = await phase(port, args, flood)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        label = f"{'limited' if limited else 'unlimited':<10}{'flood' if flood else 'quiet':<7}"
+        flood_summary = (f"{sum(flooded.values()) / args.duration:>9.0f}/s "
+                         + " ".join(f"{k}:{v}" for k, v in sorted(flooded.items(), key=str))) if flood else ""
+        print(f"{label}{statistics.median(latencies):>9.2f}{p99:>9.2f}   "
+              f"{' '.join(f'{k}:{v}' for k, v in sorted(legit.items()))}   {flood_summary}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50, help="legitimate users")
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between a user's posts")
+    parser.add_argument("--bots", type=int, default=20, help="concurrent flood connections")
+    parser.add_argument("--bot-addresses", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    print(f"{'':<17}{'p50 ms':>9}{'p99 ms':>9}   legitimate statuses   flood")
+    for limited in (False, True):
+        env = dict(os.environ, STORAGE_BACKEND="sqlite",
+                   SQLITE_PATH=os.path.join(scratch.name, f"flood-{limited}.sqlite3"),
+                   RATE_LIMIT_ENABLED=str(limited).lower())
+        port = free_port()
+        launcher = start_launcher(1, port, env, reuse_port=False)
+        try:
+            asyncio.run(run(port, args, limited))
+        finally:
+            launcher.send_signal(signal.SIGTERM)
+            launcher.wait()
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local load test for the Swadeshi Hind Party API
+Runs server.py in-process against a Mongo stand-in (or a real MONGO_URL, or the
+embedded SQLite backend), drives
+every endpoint at a fixed concurrency and reports RPS, latency percentiles and
+error rates. Results are written as JSON and can be compared against a baseline
+so CI fails when throughput or latency regresses. The stand-in comes from
+requirements-dev.txt.
+
+    python benchmarks/loadtest.py --output results.json
+    python benchmarks/loadtest.py --sqlite --output sqlite.json
+    python benchmarks/loadtest.py --baseline baseline.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from storage import MongoStorage, SQLiteStorage  # noqa: E402
+
+_serial = itertools.count(1)
+
+
+def _person() -> Dict[str, str]:
+    n = next(_serial)
+    return {"name": f"Load Tester {n}", "email": f"load{n}@example.com", "phone": f"9{n:09d}"}
+
+
+def donation_body() -> Dict[str, Any]:
+    return {**_person(), "amount": "500", "message": "Jai Hind"}
+
+
+def membership_body() -> Dict[str, Any]:
+    return {**_person(), "membershipType": "individual", "address": "12 Rajpath, New Delhi 110001"}
+
+
+def volunteer_body() -> Dict[str, Any]:
+    return {**_person(), "skills": "Graphic design, Hindi translation", "availability": "Weekends"}
+
+
+def contact_body() -> Dict[str, Any]:
+    person = _person()
+    return {"name": person["name"], "email": person["email"],
+            "subject": "Local chapter", "message": "How can I join the local chapter?"}
+
+
+# name -> (method, path, body factory); POSTs run first so the reads have data
+SCENARIOS: Dict[str, Tuple[str, str, Optional[Callable[[], Dict[str, Any]]]]] = {
+    "POST /api/donations": ("POST", "/api/donations", donation_body),
+    "POST /api/memberships": ("POST", "/api/memberships", membership_body),
+    "POST /api/volunteers": ("POST", "/api/volunteers", volunteer_body),
+    "POST /api/contact": ("POST", "/api/contact", contact_body),
+    "GET /api/donations": ("GET", "/api/donations?limit=100", None),
+    "GET /api/memberships": ("GET", "/api/memberships?limit=100", None),
+    "GET /api/volunteers": ("GET", "/api/volunteers?limit=100", None),
+    "GET /api/contact": ("GET", "/api/contact?limit=100", None),
+    "GET /api/stats": ("GET", "/api/stats", None),
+    "GET /api/health": ("GET", "/api/health", None),
+    "GET /api/": ("GET", "/api/", None),
+}
+
+
+def use_stand_in() -> None:
+    """Point server.py at an in-memory Mongo stand-in"""
+    from mongomock_motor import AsyncMongoMockClient
+
+    server.client = AsyncMongoMockClient()
+    server.db = server.client["loadtest"]
+    server.storage = MongoStorage(server.db)
+
+
+def use_sqlite(path: str) -> None:
+    """Point server.py at a fresh embedded SQLite database"""
+    server.client = None
+    server.db = None
+    server.storage = SQLiteStorage(path)
+
+
+async def run_scenario(client: httpx.AsyncClient, method: str, path: str,
+                       body: Optional[Callable[[], Dict[str, Any]]],
+                       concurrency: int, duration: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body() if body else None)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = len(latencies)
+    cuts = statistics.quantiles(latencies, n=100) if total >= 2 else [latencies[0] if latencies else 0.0] * 99
+    return {
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "error_rate": round(errors / total, 4) if total else 1.0,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            only: Optional[List[str]] = None) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` beyond ``tolerance`` (fractional)"""
+    regressions = []
+    for name, base in baseline["results"].items():
+        if only and name not in only:
+            continue
+        current = results["results"].get(name)
+        if current is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {current['rps']} < baseline {base['rps']}")
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']} > baseline {base['error_rate']}")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint")
+    parser.add_argument("--mongo", action="store_true", help="use MONGO_URL instead of the in-memory stand-in")
+    parser.add_argument("--sqlite", action="store_true", help="use the embedded SQLite backend")
+    parser.add_argument("--only", action="append", help="run only these scenarios (repeatable)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed fractional regression")
+    args = parser.parse_args()
+
+    # Per-request info logs would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+
+    scratch = tempfile.TemporaryDirectory()
+    if args.mongo:
+        server.client = server.connect_mongo()
+        server.db = server.client[f"{os.environ['DB_NAME']}_loadtest"]
+        server.storage = MongoStorage(server.db)
+        await server.client.drop_database(server.db.name)
+    elif args.sqlite:
+        use_sqlite(os.path.join(scratch.name, "loadtest.sqlite3"))
+    else:
+        use_stand_in()
+    backend = "mongodb" if args.mongo else "sqlite" if args.sqlite else "stand-in"
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "backend": backend,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+        },
+        "results": {},
+    }
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.app.router.lifespan_context(server.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+            print(f"{'endpoint':<26}{'req':>8}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>7}")
+            for name, (method, path, body) in SCENARIOS.items():
+                if args.only and name not in args.only:
+                    continue
+                r = await run_scenario(client, method, path, body, args.concurrency, args.duration)
+                results["results"][name] = r
+                print(f"{name:<26}{r['requests']:>8}{r['rps']:>10.1f}{r['p50_ms']:>9.2f}"
+                      f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['error_rate'] * 100:>7.2f}")
+
+    if args.mongo:
+        await server.client.drop_database(server.db.name)
+        server.client.close()
+    scratch.cleanup()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance, args.only)
+        for line in regressions:
+            print(f"❌ REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Local SMTP stand-in for the acknowledgement job queue
+Accepts mail on --port (1025, the SMTP_PORT default) and prints one line per
+message instead of delivering it. --delay slows every DATA reply and
+--fail-rate answers that share of messages with a transient 451, to exercise
+the queue's concurrency limit, retries and dead-letter handling.
+
+    python benchmarks/smtp_sink.py --fail-rate 0.3
+    ACK_EMAILS=true python server.py
+"""
+
+import argparse
+import asyncio
+import random
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from typing import List
+
+
+class SMTPSink:
+    def __init__(self, delay: float = 0.0, fail_rate: float = 0.0, quiet: bool = False):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.quiet = quiet
+        self.messages: List[bytes] = []
+        self.rejected = 0
+        self.sessions = 0
+        self.peak_sessions = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 1025) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._session, host, port)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.sessions += 1
+        self.peak_sessions = max(self.peak_sessions, self.sessions)
+
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        try:
+            await reply("220 localhost SMTP sink")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                verb = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    await reply("250-localhost")
+                    await reply("250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 localhost")
+                elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    await reply(await self._data(reader))
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    return
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def _data(self, reader: asyncio.StreamReader) -> str:
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b".\r\n", b".\n", b""):
+                break
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            self.rejected += 1
+            return "451 Try again later"
+        body = b"".join(lines)
+        self.messages.append(body)
+        if not self.quiet:
+            message = message_from_bytes(body)
+            print(f"{message['To']}: {make_header(decode_header(message['Subject'] or ''))}")
+        return "250 Queued"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before answering each DATA")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of messages answered with 451")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.delay, args.fail_rate)
+    server = await sink.start(args.host, args.port)
+    print(f"SMTP sink listening on {args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
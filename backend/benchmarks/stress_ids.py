@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+ID allocation concurrency check
+Fires thousands of parallel POST /api/memberships and simulated multi-worker
+allocations, then verifies every membership number / sequence value is distinct
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+import server  # noqa: E402
+from storage import MongoStorage  # noqa: E402
+from sequences import SequenceAllocator  # noqa: E402
+
+
+async def parallel_signups(total: int, concurrency: int) -> bool:
+    transport = httpx.ASGITransport(app=server.app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def signup(i: int) -> httpx.Response:
+        async with semaphore:
+            return await client.post("/api/memberships", json={
+                "name": f"Member {i}",
+                "email": f"member{i}@example.com",
+                "phone": f"98{i:08d}",
+                "membershipType": "individual",
+                "address": "12 Rajpath, New Delhi",
+            })
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+        t0 = time.perf_counter()
+        responses = await asyncio.gather(*(signup(i) for i in range(total)))
+        elapsed = time.perf_counter() - t0
+
+    failures = [r for r in responses if r.status_code != 200]
+    numbers = [r.json()["membershipNumber"] for r in responses if r.status_code == 200]
+    stored = await server.db.memberships.count_documents({})
+    distinct = len(set(numbers))
+    print(f"POST /api/memberships x{total} in {elapsed:.2f}s: "
+          f"{len(failures)} failed, {distinct} distinct numbers, {stored} stored")
+    return not failures and distinct == total and stored == total
+
+
+async def parallel_workers(workers: int, per_worker: int, block_size: int) -> bool:
+    """Independent allocators stand in for separate uvicorn workers"""
+    allocators = [SequenceAllocator("stress", block_size=block_size) for _ in range(workers)]
+
+    async def drain(allocator: SequenceAllocator):
+        return [await allocator.next(server.storage) for _ in range(per_worker)]
+
+    batches = await asyncio.gather(*(drain(a) for a in allocators))
+    values = [v for batch in batches for v in batch]
+    distinct = len(set(values))
+    print(f"{workers} allocators x {per_worker} values (block {block_size}): "
+          f"{distinct}/{len(values)} distinct")
+    return distinct == len(values)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    db_name = f"{os.environ['DB_NAME']}_bench"
+    server.client = server.connect_mongo()
+    await server.client.drop_database(db_name)
+    server.db = server.client[db_name]
+    server.storage = MongoStorage(server.db)
+    await server.storage.ensure_schema()
+
+    ok = await parallel_signups(args.requests, args.concurrency)
+    ok = await parallel_workers(args.workers, args.requests // args.workers, block_size=50) and ok
+
+    await server.client.drop_database(db_name)
+    server.client.close()
+    print("✅ PASS" if ok else "❌ FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,289 @@
+"""Streaming bulk import of membership and volunteer signups.
+
+The upload is read from the request body as it arrives and parsed into NDJSON
+or CSV rows. Every ``chunk_size`` rows are validated together in one vectorized
+pandas pass — the ``*Create`` model's length limits and allowed values, the
+shared ``Phone`` and ``Email`` rules from fields.py — and the valid rows are written with
+a single unordered ``insert_many``. Only the current chunk and a capped error
+list are held in memory, so uploads of any size run in constant space.
+
+Membership numbers and volunteer IDs come from a dedicated range reserved per
+chunk, so they never collide with numbers handed out by any worker.
+"""
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, Type, get_args, get_origin,
+)
+
+import numpy as np
+import pandas as pd
+from annotated_types import MaxLen, MinLen
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import DuplicateKeyError
+
+from dedup import DuplicateGuard, DuplicateSubmission, duplicate_detail
+from fields import EMAIL_ADAPTER, PHONE_ERROR, PHONE_PATTERN, SIMPLE_EMAIL_PATTERN
+from sequences import SequenceAllocator
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The upload cannot be parsed at all (as opposed to individual bad rows)"""
+
+
+class ChunkValidator:
+    """Vectorized equivalent of validating each row against a ``*Create`` model"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.fields = list(model.model_fields)
+        self._rules: List[Tuple[str, Optional[int], Optional[int], Optional[Tuple[str, ...]]]] = []
+        for name, info in model.model_fields.items():
+            min_len = next((m.min_length for m in info.metadata if isinstance(m, MinLen)), None)
+            max_len = next((m.max_length for m in info.metadata if isinstance(m, MaxLen)), None)
+            choices = get_args(info.annotation) if get_origin(info.annotation) is Literal else None
+            self._rules.append((name, min_len, max_len, choices))
+
+    def validate(self, rows: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, List[List[str]]]:
+        """Normalized rows plus the error messages for each (empty when valid)"""
+        # Object dtype keeps the .str accessor usable on columns no row filled in
+        frame = pd.DataFrame.from_records(rows, columns=self.fields).astype(object)
+        failures: List[Tuple[np.ndarray, str]] = []
+        # Like pydantic, the phone/email rules only run on values that passed the field constraints
+        checked: Dict[str, np.ndarray] = {}
+        for name, min_len, max_len, choices in self._rules:
+            column = frame[name]
+            bad = column.isna().to_numpy()
+            failures.append((bad, f"{name}: field required"))
+            if min_len is not None or max_len is not None:
+                lengths = column.str.len()
+                out_of_range = ~bad & (
+                    (lengths < (min_len or 0)).to_numpy() | (lengths > (max_len or np.inf)).to_numpy()
+                )
+                failures.append((out_of_range, f"{name}: must be between {min_len or 0} and {max_len} characters"))
+                bad = bad | out_of_range
+            if choices is not None:
+                invalid = ~bad & ~column.isin(choices).to_numpy()
+                failures.append((invalid, f"{name}: must be one of {', '.join(choices)}"))
+                bad = bad | invalid
+            checked[name] = ~bad
+
+        if "phone" in frame:
+            digits = frame["phone"].str.replace(r"\D", "", regex=True)
+            bad = ~digits.str.fullmatch(PHONE_PATTERN, na=False).to_numpy().astype(bool)
+            failures.append((checked["phone"] & bad, f"phone: {PHONE_ERROR}"))
+            frame["phone"] = digits
+
+        if "email" in frame:
+            email = frame["email"]
+            simple = email.str.fullmatch(SIMPLE_EMAIL_PATTERN, case=False, na=False).to_numpy().astype(bool)
+            # Email keeps the local part as typed and lowercases the domain
+            normalized = email.str.replace(r"@([^@]+)$", lambda m: "@" + m.group(1).lower(), regex=True)
+            # The few addresses the pattern leaves out go through the model's own validator
+            bad = np.zeros(len(frame), dtype=bool)
+            for i in np.flatnonzero(checked["email"] & ~simple):
+                try:
+                    normalized.iat[i] = EMAIL_ADAPTER.validate_python(email.iat[i])
+                except ValidationError:
+                    bad[i] = True
+            failures.append((bad, "email: value is not a valid email address"))
+            frame["email"] = normalized
+
+        errors: List[List[str]] = [[] for _ in rows]
+        for mask, message in failures:
+            for i in np.flatnonzero(mask):
+                errors[i].append(message)
+        return frame, errors
+
+
+def _cell(value: Any) -> Optional[str]:
+    # JSON numbers (e.g. phone numbers) are accepted as text; anything else is treated as missing
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+async def _lines(body: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    pending = b""
+    async for chunk in body:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+        if len(pending) > MAX_LINE_BYTES:
+            raise ImportFormatError(f"Line longer than {MAX_LINE_BYTES} bytes")
+    if pending:
+        yield pending.decode("utf-8", errors="replace").rstrip("\r")
+
+
+async def ndjson_rows(body: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """(line number, row, parse error) for each non-blank line"""
+    number = 0
+    async for line in _lines(body):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line.lstrip("\ufeff"))
+        except ValueError:
+            yield number, None, "Invalid JSON"
+            continue
+        if not isinstance(value, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, {k: _cell(v) for k, v in value.items()}, None
+
+
+async def csv_rows(body: AsyncIterator[bytes], required: List[str]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """(record number after the header, row, parse error) for each CSV record"""
+    header: Optional[List[str]] = None
+    number = 0
+    record = ""
+    async for line in _lines(body):
+        record = f"{record}\n{line}" if record else line
+        # A quoted field may span lines; wait until every quote is closed
+        if record.count('"') % 2:
+            if len(record) > MAX_LINE_BYTES:
+                raise ImportFormatError(f"Record longer than {MAX_LINE_BYTES} bytes")
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip().lstrip("\ufeff") for h in values]
+            missing = [f for f in required if f not in header]
+            if missing:
+                raise ImportFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+            continue
+        number += 1
+        if len(values) != len(header):
+            yield number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield number, {k: (v if v != "" else None) for k, v in zip(header, values)}, None
+    if record:
+        number += 1
+        yield number, None, "Unterminated quoted field"
+
+
+class BulkImporter:
+    """Imports uploads into one collection; ``number_field`` gets ``number_format`` values from ``sequence``"""
+
+    def __init__(
+        self,
+        collection: str,
+        create_model: Type[BaseModel],
+        stored_model: Type[BaseModel],
+        number_field: str,
+        number_format: str,
+        sequence: SequenceAllocator,
+        guard: DuplicateGuard,
+        on_inserted: Callable[[str, datetime, int], Awaitable[None]],
+    ):
+        self.collection = collection
+        self.validator = ChunkValidator(create_model)
+        # Stored-model field order and defaults, as model.document() would produce
+        self._defaults = [
+            (name, info.default_factory, info.default) for name, info in stored_model.model_fields.items()
+        ]
+        self.number_field = number_field
+        self.number_format = number_format
+        self.sequence = sequence
+        self.guard = guard
+        self.on_inserted = on_inserted
+
+    async def run(
+        self,
+        storage,
+        body: AsyncIterator[bytes],
+        fmt: str,
+        chunk_size: int = 1000,
+        max_errors: int = 1000,
+    ) -> Dict[str, Any]:
+        report: Dict[str, Any] = {"rows": 0, "inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+        def fail(row: int, message: str) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < max_errors:
+                report["errors"].append({"row": row, "error": message})
+            else:
+                report["errors_truncated"] = True
+
+        rows = ndjson_rows(body) if fmt == "ndjson" else csv_rows(body, self.validator.fields)
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        async for number, row, error in rows:
+            report["rows"] += 1
+            if error is not None:
+                fail(number, error)
+                continue
+            chunk.append((number, row))
+            if len(chunk) >= chunk_size:
+                await self._import_chunk(storage, chunk, report, fail)
+                chunk = []
+        if chunk:
+            await self._import_chunk(storage, chunk, report, fail)
+        # Parse errors are reported as they are read, ahead of their chunk's validation errors
+        report["errors"].sort(key=lambda e: e["row"])
+        logger.info(
+            "Bulk import into %s: %s inserted, %s failed", self.collection, report['inserted'], report['failed']
+        )
+        return report
+
+    async def _import_chunk(self, storage, chunk, report, fail) -> None:
+        frame, errors = self.validator.validate([row for _, row in chunk])
+        accepted: List[Tuple[int, Dict[str, Any]]] = []
+        for (number, _), values, messages in zip(chunk, frame.to_dict("records"), errors):
+            if messages:
+                fail(number, "; ".join(messages))
+                continue
+            identity = {"email": values["email"], "phone": values["phone"]}
+            try:
+                await self.guard.check(storage, self.collection, identity)
+            except DuplicateSubmission as e:
+                fail(number, duplicate_detail(e))
+                continue
+            accepted.append((number, values))
+        if not accepted:
+            return
+
+        numbers = await self.sequence.reserve(storage, len(accepted))
+        documents = [self._document(values, n) for (_, values), n in zip(accepted, numbers)]
+        write_errors = await storage.insert_many(self.collection, documents)
+
+        inserted = 0
+        for (number, _), document, error in zip(accepted, documents, write_errors):
+            # A clash on anything but email/phone (e.g. the sequence number) is not the row's fault
+            detail = duplicate_detail(error) if isinstance(error, DuplicateKeyError) else None
+            if error is None:
+                inserted += 1
+                self.guard.add(self.collection, {"email": document["email"], "phone": document["phone"]})
+            elif detail is not None:
+                fail(number, detail)
+            else:
+                # Not the error itself: a rebuilt write error can carry the row's personal details
+                logger.error(
+                    "Bulk import row %s into %s failed: %s (code %s)",
+                    number, self.collection, type(error).__name__, getattr(error, "code", None),
+                )
+                fail(number, "Failed to store row")
+        report["inserted"] += inserted
+        if inserted:
+            await self.on_inserted(self.collection, documents[0]["created_at"], inserted)
+
+    def _document(self, values: Dict[str, Any], number: int) -> Dict[str, Any]:
+        document = {}
+        for name, factory, default in self._defaults:
+            if name == self.number_field:
+                document[name] = self.number_format.format(number)
+            elif name in values:
+                document[name] = values[name]
+            else:
+                document[name] = factory() if factory is not None else default
+        return document
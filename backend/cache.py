@@ -0,0 +1,78 @@
+"""Small in-process caches shared by the API handlers."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Caches the result of one async loader for ``ttl`` seconds.
+
+    Refreshes are single-flight: when the value expires, the first caller
+    starts the loader and every concurrent caller awaits that same task, so a
+    burst of requests after expiry costs one refresh instead of one per request.
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[Any]], ttl: float):
+        self._loader = loader
+        self._ttl = ttl
+        self._value: Any = None
+        self._expires = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def get(self) -> Any:
+        if time.monotonic() < self._expires:
+            return self._value
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # Shield so one cancelled caller does not cancel the shared refresh
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> Any:
+        try:
+            value = await self._loader()
+            self._value = value
+            self._expires = time.monotonic() + self._ttl
+            return value
+        finally:
+            self._inflight = None
+
+    def invalidate(self) -> None:
+        self._expires = 0.0
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry when full"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,124 @@
+"""Conditional GET and compressed hot-page caching for the list and stats endpoints.
+
+Each collection has a change version: the ``versions`` counters bumped next to
+the submission totals in Mongo, or the highest rowid on SQLite. Workers read
+them through a short TTL cache that is dropped whenever they store a
+submission themselves, so the ETag of a list page is derived without a database
+call on most requests, and ``If-None-Match`` hits are answered with a 304
+straight away.
+
+Versions are read from the primary. When list reads are routed to secondaries,
+first pages (the cached ones) are read from the primary as well, and deeper
+pages are served without an ETag rather than tagged with a version their body
+may not reflect yet.
+
+Versions only move when a submission is stored through the API (or archived),
+so a document edited or deleted directly in the database, or a counter update
+that failed, leaves the version unchanged. To bound how long such a change can
+be answered with a 304, list ETags also include a wall-clock window of
+``CONDITIONAL_MAX_AGE`` seconds (``freshness_epoch``), the same on every
+worker.
+
+First pages are the ones dashboards poll, so their encoded body is cached per
+worker, keyed by the version, together with gzip and (when the ``brotli``
+package is installed) brotli encodings produced on first use.
+"""
+import gzip
+import hashlib
+import time
+from typing import Dict, Hashable, Optional
+
+from fastapi import Request, Response
+
+from cache import LRUCache
+from pagination import NEXT_CURSOR_HEADER
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+def make_etag(*parts) -> str:
+    # Weak: the identity, gzip and br bodies are equivalent representations
+    return f'W/"{hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()}"'
+
+
+def freshness_epoch(max_age: float) -> int:
+    """Index of the current ``max_age``-second window; 0 when ``max_age`` is 0 (never roll over)"""
+    return int(time.time() // max_age) if max_age > 0 else 0
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+
+def _accepts(request: Request, coding: str) -> bool:
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class EncodedBody:
+    """A response body plus its compressed variants, built lazily"""
+
+    def __init__(self, body: bytes, next_cursor: Optional[str] = None):
+        self.next_cursor = next_cursor
+        self._variants: Dict[str, bytes] = {"identity": body}
+
+    def _variant(self, coding: str) -> bytes:
+        if coding not in self._variants:
+            body = self._variants["identity"]
+            self._variants[coding] = brotli.compress(body, quality=5) if coding == "br" else gzip.compress(body, 6)
+        return self._variants[coding]
+
+    def response(self, request: Request, etag: Optional[str] = None) -> Response:
+        headers = {"Vary": "Accept-Encoding"}
+        if etag:
+            headers["ETag"] = etag
+        if self.next_cursor:
+            headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        coding = "identity"
+        if len(self._variants["identity"]) >= MIN_COMPRESS_SIZE:
+            if brotli is not None and _accepts(request, "br"):
+                coding = "br"
+            elif _accepts(request, "gzip"):
+                coding = "gzip"
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(self._variant(coding), media_type="application/json", headers=headers)
+
+
+class HotPageCache:
+    def __init__(self, maxsize: int = 64):
+        self._pages = LRUCache(maxsize)
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        return self._pages.get(key)
+
+    def set(self, key: Hashable, body: EncodedBody) -> None:
+        self._pages.set(key, body)
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self._pages.hits + self._pages.misses
+        return {
+            "entries": len(self._pages),
+            "hit_rate": self._pages.hits / lookups if lookups else 0.0,
+            "brotli": brotli is not None,
+        }
@@ -0,0 +1,110 @@
+"""Duplicate email/phone detection for membership and volunteer signups.
+
+Each (collection, field) pair has a per-worker Bloom filter warmed at startup
+from an index-only scan of the field. A value the filter has never seen is
+definitely new and needs no database call; only possible hits are confirmed
+with an indexed lookup. The unique email/phone indexes remain the source of
+truth: they catch what a filter cannot know about, such as a signup accepted
+moments ago by another worker.
+"""
+import logging
+import re
+from typing import Dict, Optional, Tuple
+
+from bloom import BloomFilter
+from indexes import INDEXES
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("email", "phone")
+
+# Field behind each unique index, for errors that carry only the message ("index: email_unique dup key")
+_UNIQUE_INDEX_FIELDS = {
+    index.document["name"]: next(iter(index.document["key"]))
+    for models in INDEXES.values() for index in models if index.document.get("unique")
+}
+_INDEX_NAME = re.compile(r"index: (\w+)")
+_DEFAULT_INDEX_NAME = re.compile(r"(\w+?)_-?1")
+# The key itself: 'dup key: { email: "..." }' from the server, "'keyPattern': {'email': 1}" from mongomock
+_KEY_IN_MESSAGE = re.compile(r"dup key: \{ ?(\w+):|'keyPattern': \{'(\w+)'")
+
+
+class DuplicateSubmission(Exception):
+    def __init__(self, collection: str, field: str):
+        self.collection = collection
+        self.field = field
+        super().__init__(f"This {field} is already registered")
+
+
+def duplicate_field(error: Exception) -> Optional[str]:
+    """Field a DuplicateSubmission or unique-index DuplicateKeyError is about, if known"""
+    if isinstance(error, DuplicateSubmission):
+        return error.field
+    key_pattern = (getattr(error, "details", None) or {}).get("keyPattern")
+    if key_pattern:
+        return next(iter(key_pattern))
+    # Errors rebuilt from a bulk writeError, or from servers that omit keyPattern, still name the
+    # index or the key in the message
+    message = str(error)
+    match = _INDEX_NAME.search(message)
+    if match:
+        name = match.group(1)
+        if name in _UNIQUE_INDEX_FIELDS:
+            return _UNIQUE_INDEX_FIELDS[name]
+        default = _DEFAULT_INDEX_NAME.fullmatch(name)
+        if default:
+            return default.group(1)
+    match = _KEY_IN_MESSAGE.search(message)
+    return (match.group(1) or match.group(2)) if match else None
+
+
+def duplicate_detail(error: Exception) -> Optional[str]:
+    """409 message for a repeated email/phone, or None when the clash is not the submitter's
+    (e.g. two workers handing out the same membership number)"""
+    field = duplicate_field(error)
+    if field not in FIELDS:
+        return None
+    return f"This {field} is already registered"
+
+
+class DuplicateGuard:
+    def __init__(self, collections: Tuple[str, ...], capacity: int = 1_000_000, error_rate: float = 0.01):
+        self._filters: Dict[Tuple[str, str], BloomFilter] = {
+            (name, field): BloomFilter(capacity, error_rate) for name in collections for field in FIELDS
+        }
+        self.ready = False
+        self.lookups = 0
+        self.db_checks = 0
+
+    async def warm(self, storage) -> None:
+        """Load every stored email/phone into the filters"""
+        try:
+            for (name, field), bloom in self._filters.items():
+                async for value in storage.scan_field(name, field):
+                    bloom.add(value)
+            self.ready = True
+            logger.info("Duplicate filters warmed")
+        except Exception as e:
+            logger.error("Failed to warm duplicate filters: %s", e)
+
+    async def check(self, storage, collection: str, values: Dict[str, str]) -> None:
+        """Raise DuplicateSubmission if any of ``values`` is already stored"""
+        for field, value in values.items():
+            self.lookups += 1
+            # Until warm-up finishes the filters are incomplete, so always ask the store
+            if self.ready and value not in self._filters[(collection, field)]:
+                continue
+            self.db_checks += 1
+            if await storage.exists(collection, field, value):
+                raise DuplicateSubmission(collection, field)
+
+    def add(self, collection: str, values: Dict[str, str]) -> None:
+        for field, value in values.items():
+            self._filters[(collection, field)].add(value)
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "lookups": self.lookups,
+            "db_checks": self.db_checks,
+            "skipped_ratio": 1 - self.db_checks / self.lookups if self.lookups else 0.0,
+        }
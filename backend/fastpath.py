@@ -0,0 +1,69 @@
+"""Fast-path encoding for the list endpoints.
+
+The regular path builds a model per document and FastAPI then validates and
+serializes each one again through ``response_model``. Documents written by the
+API already match the public schema, so the fast path fetches only the model's
+fields with a projection, lays them out in model field order (filling the same
+defaults the model would) and encodes the page in a single call. The output is
+byte-identical to FastAPI's ``JSONResponse`` for the same documents.
+"""
+import json
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from pagination import NEXT_CURSOR_HEADER
+
+try:
+    import orjson
+
+    def _dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+except ImportError:  # pragma: no cover - orjson is optional
+    from fastapi.encoders import jsonable_encoder
+
+    def _dumps(content: Any) -> bytes:
+        # Same settings as starlette's JSONResponse.render
+        return json.dumps(
+            jsonable_encoder(content),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class RowEncoder:
+    """Encodes raw documents exactly as ``List[model]`` would be rendered"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.fields = []
+        for name, info in model.model_fields.items():
+            # Factory defaults (id, created_at) are always stored, so only plain defaults matter
+            default = None if info.is_required() or info.default_factory else info.default
+            self.fields.append((name, default))
+        self.projection = {name: 1 for name, _ in self.fields} | {"_id": 0}
+
+    def rows(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{name: doc.get(name, default) for name, default in self.fields} for doc in docs]
+
+    def encode(self, docs: List[Dict[str, Any]]) -> bytes:
+        return _dumps(self.rows(docs))
+
+
+async def fast_list(
+    storage,
+    collection: str,
+    encoder: RowEncoder,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+) -> Response:
+    docs, next_cursor = await storage.list_page(
+        collection, skip=skip, limit=limit, cursor=cursor, projection=encoder.projection,
+        include_archived=include_archived,
+    )
+    headers: Optional[Dict[str, str]] = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(encoder.encode(docs), media_type="application/json", headers=headers)
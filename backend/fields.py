@@ -0,0 +1,59 @@
+"""Field types shared by the submission models and the bulk importer.
+
+Phone numbers and email addresses are normalized by module-level compiled
+patterns, so every model with a ``Phone`` or ``Email`` field runs the same
+code, and bulk_import applies the same patterns a column at a time.
+
+``Email`` checks plain ASCII addresses with one regex: the ones email-validator
+accepts and returns unchanged apart from a lowercased domain. Everything else
+(display names, internationalized or quoted addresses, reserved domains, one
+letter top-level domains) goes through ``EmailStr`` as before, so the accepted
+values and their normalized form do not change.
+"""
+import re
+from typing import Annotated, Any
+
+from pydantic import AfterValidator, EmailStr, Field, TypeAdapter, ValidatorFunctionWrapHandler, WrapValidator
+
+PHONE_ERROR = "Phone number must be a valid 10-digit Indian mobile number"
+# 10 digits with a leading 6-9, checked after everything but digits is stripped
+PHONE_PATTERN = r"[6-9]\d{9}"
+# Dot-atom local part, hostname labels without "--" (IDNA territory) and an alphabetic,
+# non-reserved top-level domain, at most 254 characters in all
+SIMPLE_EMAIL_PATTERN = (
+    r"(?=.{1,254}$)"
+    r"(?!\.)(?!.*\.\.)[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]{1,64}(?<!\.)"
+    r"@(?!.*--)(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+"
+    r"(?!(?:arpa|invalid|local|localhost|onion|test)$)[A-Za-z]{2,63}"
+)
+
+_NON_DIGITS = re.compile(r"\D")
+_MOBILE = re.compile(PHONE_PATTERN)
+_SIMPLE_EMAIL = re.compile(SIMPLE_EMAIL_PATTERN, re.IGNORECASE)
+
+
+def normalize_phone(value: str) -> str:
+    cleaned = _NON_DIGITS.sub("", value)
+    if not _MOBILE.fullmatch(cleaned):
+        raise ValueError(PHONE_ERROR)
+    return cleaned
+
+
+def simple_email(value: str) -> str:
+    """``local@domain`` with the domain lowercased; the caller has matched SIMPLE_EMAIL_PATTERN"""
+    local, _, domain = value.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+def _email(value: Any, handler: ValidatorFunctionWrapHandler) -> str:
+    if isinstance(value, str) and _SIMPLE_EMAIL.fullmatch(value):
+        return simple_email(value)
+    return handler(value)
+
+
+Name = Annotated[str, Field(min_length=2, max_length=100)]
+Phone = Annotated[str, Field(min_length=10, max_length=15), AfterValidator(normalize_phone)]
+Email = Annotated[EmailStr, WrapValidator(_email)]
+
+# For checking single addresses outside a model, e.g. bulk_import's fallback
+EMAIL_ADAPTER = TypeAdapter(Email)
@@ -0,0 +1,221 @@
+"""Idempotency-Key support for the submission POST endpoints.
+
+A request carrying an ``Idempotency-Key`` first claims the key by inserting a
+pending record into ``idempotency_keys`` (unique ``_id``). When the handler
+succeeds the record is completed with the response body; a retry with the same
+key then gets that stored body back without touching the submission
+collection. Completed records are also kept in a bounded per-worker LRU so most
+replays never reach Mongo, while the Mongo record (expired by a TTL index)
+catches retries that land on another worker.
+
+A pending record older than ``pending_lease`` is taken to be left behind by a
+worker that died mid-request and is claimed again, so a crash does not lock
+the key until the TTL expires. Each claim carries a token, so a request that
+outlives its lease cannot complete or release the claim that replaced it.
+
+Without a database (the SQLite backend) claims and completed responses are
+kept per worker only: concurrent retries reaching the same worker get a 409,
+but retries spread over several workers can each be processed.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# A record can vanish (TTL) between a failed insert and the read; claim again this often
+CLAIM_ATTEMPTS = 3
+
+
+def _fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+class IdempotencyClaim:
+    """Outcome of claiming a key: either a response to replay or a claim to settle"""
+
+    def __init__(self, store: "IdempotencyStore", db=None, record_id: Optional[str] = None,
+                 fingerprint: Optional[str] = None, token: Optional[str] = None,
+                 replay: Optional[JSONResponse] = None):
+        self._store = store
+        self._db = db
+        self._record_id = record_id
+        self._fingerprint = fingerprint
+        self._token = token
+        self._settled = record_id is None
+        self.replay = replay
+
+    async def complete(self, body: Any, status_code: int = 200) -> None:
+        if self._settled:
+            return
+        self._settled = True
+        await self._store._complete(
+            self._db, self._record_id, self._token, self._fingerprint, jsonable_encoder(body), status_code
+        )
+
+    async def release(self) -> None:
+        """Drop an unfinished claim so the client can retry. No-op once completed"""
+        if self._settled:
+            return
+        self._settled = True
+        await self._store._release(self._db, self._record_id, self._token)
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int = 10_000, ttl: float = 86_400, pending_lease: float = 60):
+        self.ttl = ttl
+        self.pending_lease = timedelta(seconds=pending_lease)
+        self._local = LRUCache(max_entries)
+        # Keys claimed by this worker's in-flight requests, when there is no database
+        self._pending: Set[str] = set()
+        self.requests = 0
+        self.local_hits = 0
+        self.store_hits = 0
+        self.conflicts = 0
+        self.reclaimed = 0
+
+    async def ensure_indexes(self, db) -> None:
+        try:
+            await db.idempotency_keys.create_index(
+                "created_at", name="created_at_ttl", expireAfterSeconds=int(self.ttl)
+            )
+        except PyMongoError as e:
+            logger.error("Failed to ensure idempotency TTL index: %s", e)
+
+    async def claim(self, db, scope: str, key: Optional[str], payload: BaseModel) -> IdempotencyClaim:
+        if key is None:
+            return IdempotencyClaim(self)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+
+        self.requests += 1
+        record_id = f"{scope}:{key}"
+        fingerprint = _fingerprint(payload)
+
+        cached = self._local.get(record_id)
+        if cached is not None:
+            if cached["expires"] > time.monotonic():
+                self.local_hits += 1
+                return IdempotencyClaim(self, replay=self._replay(cached, fingerprint))
+            self._local.pop(record_id)
+
+        if db is None:
+            if record_id in self._pending:
+                raise self._conflict()
+            self._pending.add(record_id)
+            return IdempotencyClaim(self, None, record_id, fingerprint)
+
+        for _ in range(CLAIM_ATTEMPTS):
+            token = uuid.uuid4().hex
+            now = datetime.utcnow()
+            try:
+                try:
+                    await db.idempotency_keys.insert_one({
+                        "_id": record_id,
+                        "fingerprint": fingerprint,
+                        "token": token,
+                        "state": "pending",
+                        "created_at": now,
+                    })
+                    return IdempotencyClaim(self, db, record_id, fingerprint, token)
+                except DuplicateKeyError:
+                    pass
+                record = await db.idempotency_keys.find_one({"_id": record_id})
+                if record is not None and record["state"] == "pending" and \
+                        record["created_at"] <= now - self.pending_lease:
+                    # Abandoned by a worker that died mid-request; take it over unless another retry just did
+                    taken = await db.idempotency_keys.find_one_and_update(
+                        {"_id": record_id, "state": "pending", "created_at": record["created_at"]},
+                        {"$set": {"fingerprint": fingerprint, "token": token, "created_at": now}},
+                    )
+                    if taken is not None:
+                        self.reclaimed += 1
+                        return IdempotencyClaim(self, db, record_id, fingerprint, token)
+                    continue
+            except PyMongoError as e:
+                # Availability over strict dedup: serve the request unprotected
+                logger.error("Idempotency store unavailable: %s", e)
+                return IdempotencyClaim(self)
+            if record is None:
+                # Expired between the insert and the read
+                continue
+            if record["state"] != "completed":
+                raise self._conflict()
+            self.store_hits += 1
+            entry = self._remember(record_id, record)
+            return IdempotencyClaim(self, replay=self._replay(entry, fingerprint))
+        raise self._conflict()
+
+    def _conflict(self) -> HTTPException:
+        self.conflicts += 1
+        return HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+
+    def _remember(self, record_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        age = (datetime.utcnow() - record["created_at"]).total_seconds()
+        entry = {
+            "fingerprint": record["fingerprint"],
+            "status_code": record["status_code"],
+            "body": record["body"],
+            "expires": time.monotonic() + max(self.ttl - age, 0),
+        }
+        self._local.set(record_id, entry)
+        return entry
+
+    def _replay(self, entry: Dict[str, Any], fingerprint: str) -> JSONResponse:
+        if entry["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used with a different request body"
+            )
+        return JSONResponse(entry["body"], status_code=entry["status_code"], headers={REPLAYED_HEADER: "true"})
+
+    async def _complete(self, db, record_id: str, token: Optional[str], fingerprint: str, body: Any,
+                        status_code: int) -> None:
+        record = {"state": "completed", "status_code": status_code, "body": body}
+        self._pending.discard(record_id)
+        if db is not None:
+            try:
+                await db.idempotency_keys.update_one({"_id": record_id, "token": token}, {"$set": record})
+            except PyMongoError as e:
+                logger.error("Failed to store idempotent response %s: %s", record_id, e)
+        self._local.set(record_id, {
+            "fingerprint": fingerprint,
+            "status_code": status_code,
+            "body": body,
+            "expires": time.monotonic() + self.ttl,
+        })
+
+    async def _release(self, db, record_id: str, token: Optional[str]) -> None:
+        self._pending.discard(record_id)
+        if db is None:
+            return
+        try:
+            await db.idempotency_keys.delete_one({"_id": record_id, "token": token, "state": "pending"})
+        except PyMongoError as e:
+            logger.error("Failed to release idempotency key %s: %s", record_id, e)
+
+    def metrics(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.store_hits
+        return {
+            "requests": self.requests,
+            "local_hits": self.local_hits,
+            "store_hits": self.store_hits,
+            "conflicts": self.conflicts,
+            "reclaimed": self.reclaimed,
+            "hit_rate": hits / self.requests if self.requests else 0.0,
+            "local_entries": len(self._local),
+            "local_evictions": self._local.evictions,
+        }
@@ -0,0 +1,132 @@
+"""Index declarations and query-plan inspection for the submission collections.
+
+``INDEXES`` is the single source of truth for what each collection needs.
+``ensure_indexes`` is run in the background at startup; ``create_indexes`` is a
+no-op for indexes that already exist, so restarting workers is cheap.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+from pagination import SORT_ORDER
+from search import SEARCH_FIELDS
+from stats import TOTALS_ID, day_key
+
+logger = logging.getLogger(__name__)
+
+# Backs the newest-first list queries, cursor pagination and created_at range counts
+_CREATED_AT = IndexModel(SORT_ORDER, name="created_at_desc_id_desc")
+
+
+def _unique_when_set(field: str) -> IndexModel:
+    # Older documents may have no number at all; only enforce uniqueness on real values
+    return IndexModel(
+        [(field, ASCENDING)],
+        name=f"{field}_unique",
+        unique=True,
+        partialFilterExpression={field: {"$type": "string"}},
+    )
+
+
+def _text(collection: str) -> IndexModel:
+    # Mongo allows one text index per collection, so all searched fields share it
+    weights = SEARCH_FIELDS[collection]
+    return IndexModel([(f, TEXT) for f in weights], name="search_text", weights=weights)
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "donations": [
+        _CREATED_AT,
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("phone", ASCENDING)], name="phone"),
+    ],
+    # One registration per email/phone; enforced here, pre-checked by dedup.DuplicateGuard
+    "memberships": [
+        _CREATED_AT,
+        _unique_when_set("email"),
+        _unique_when_set("phone"),
+        _unique_when_set("membershipNumber"),
+    ],
+    "volunteers": [
+        _CREATED_AT,
+        _unique_when_set("email"),
+        _unique_when_set("phone"),
+        _unique_when_set("volunteerId"),
+        _text("volunteers"),
+    ],
+    "contacts": [
+        _CREATED_AT,
+        IndexModel([("email", ASCENDING)], name="email"),
+        _text("contacts"),
+    ],
+}
+
+
+async def ensure_indexes(db) -> None:
+    """Create any missing index from INDEXES.
+
+    Each index is created on its own so one failure (for example a unique
+    index blocked by existing duplicates) does not stop the rest.
+    """
+    for name, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[name].create_indexes([model])
+            except PyMongoError as e:
+                logger.error("Failed to ensure index %s on %s: %s", model.document['name'], name, e)
+        logger.info("Indexes ensured on %s", name)
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a winning plan tree into its stages, outermost first"""
+    stages = []
+    while plan:
+        stages.append({k: plan[k] for k in ("stage", "indexName") if k in plan})
+        if "inputStage" in plan:
+            plan = plan["inputStage"]
+        elif plan.get("inputStages"):
+            plan = plan["inputStages"][0]
+        else:
+            plan = None
+    return stages
+
+
+def _summarize(explain: Dict[str, Any]) -> Dict[str, Any]:
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # Aggregations nest the planner output under their first stage
+        planner = explain["stages"][0]["$cursor"]["queryPlanner"]
+    winning = planner["winningPlan"]
+    # Slot-based engine wraps the classic tree in "queryPlan"
+    stages = _plan_stages(winning.get("queryPlan", winning))
+    return {
+        "stages": stages,
+        "indexes": [s["indexName"] for s in stages if "indexName" in s],
+        "collection_scan": any(s.get("stage") == "COLLSCAN" for s in stages),
+    }
+
+
+async def _explain(coro) -> Dict[str, Any]:
+    try:
+        return _summarize(await coro)
+    except (PyMongoError, KeyError, IndexError) as e:
+        return {"error": str(e)}
+
+
+async def explain_queries(db, limit: int = 100) -> Dict[str, Any]:
+    """Winning plans for the list queries and the stats counter lookups the API runs"""
+    plans: Dict[str, Any] = {}
+    for name in INDEXES:
+        plans[f"list.{name}"] = await _explain(
+            db[name].find({}).sort(SORT_ORDER).limit(limit).explain()
+        )
+
+    # The stats route reads the counters documents by _id (see stats.read_stats)
+    plans["stats.totals"] = await _explain(db.counters.find({"_id": TOTALS_ID}).limit(1).explain())
+    plans["stats.recent_activity"] = await _explain(
+        db.daily_activity.find({"_id": day_key(datetime.utcnow())}).limit(1).explain()
+    )
+    return plans
@@ -0,0 +1,94 @@
+"""Write-behind batched ingestion for the submission endpoints.
+
+Handlers hand their document to ``BatchWriter.insert`` and wait on a future.
+A single flusher task drains the bounded queue, groups documents by
+collection and writes each group with one unordered ``insert_many``,
+flushing when ``max_batch`` documents are waiting or ``max_delay`` seconds
+have passed since the first one arrived, whichever comes first.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_Item = Tuple[str, Dict[str, Any], asyncio.Future]
+
+
+class IngestQueueFull(Exception):
+    """Raised when the writer cannot accept another document right now"""
+
+
+class BatchWriter:
+    def __init__(self, storage, max_queue: int = 10_000, max_batch: int = 500, max_delay: float = 0.01):
+        self._storage = storage
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def insert(self, collection: str, document: Dict[str, Any]) -> None:
+        """Queue ``document`` and return once its batch has been acknowledged"""
+        if self._closing:
+            raise IngestQueueFull("Writer is shutting down")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((collection, document, future))
+        except asyncio.QueueFull:
+            raise IngestQueueFull("Ingestion queue is full")
+        await future
+
+    async def close(self) -> None:
+        """Stop accepting documents and flush everything already queued"""
+        self._closing = True
+        await self._queue.join()
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[_Item] = [await self._queue.get()]
+            deadline = loop.time() + self._max_delay
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        groups: Dict[str, List[_Item]] = defaultdict(list)
+        for item in batch:
+            groups[item[0]].append(item)
+        await asyncio.gather(*(self._write(name, items) for name, items in groups.items()))
+
+    async def _write(self, collection: str, items: List[_Item]) -> None:
+        try:
+            errors = await self._storage.insert_many(collection, [doc for _, doc, _ in items])
+        except Exception as e:
+            logger.error("Batch insert into %s failed: %s", collection, e)
+            errors = [e] * len(items)
+
+        for error, (_, _, future) in zip(errors, items):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
@@ -0,0 +1,195 @@
+"""Durable background jobs, kept off the request path.
+
+Handlers ``enqueue`` a job (one insert into the ``jobs`` collection) and return.
+Every worker process runs a ``JobQueue`` loop that claims due jobs in batches,
+each claim an atomic ``find_one_and_update`` that leases the job to this
+worker for ``lease`` seconds, and runs them with at most ``concurrency`` in
+flight. A finished job is deleted; a failed one is rescheduled with
+exponential backoff and jitter, and after ``max_attempts`` it is moved to
+``jobs_dead`` with its last error. A job whose worker died is claimed again
+once its lease runs out, so delivery is at-least-once.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Seconds before retry ``attempt`` (1-based): exponential, capped, with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class JobQueue:
+    def __init__(
+        self,
+        handlers: Dict[str, Handler],
+        batch_size: int = 20,
+        concurrency: int = 10,
+        max_attempts: int = 8,
+        base_delay: float = 5.0,
+        max_delay: float = 3600.0,
+        lease: float = 60.0,
+        poll_interval: float = 1.0,
+    ):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._db = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.enqueued = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.dead = 0
+
+    async def ensure_indexes(self, db) -> None:
+        try:
+            await db.jobs.create_index([("available_at", ASCENDING)], name="available_at")
+            await db.jobs_dead.create_index([("failed_at", ASCENDING)], name="failed_at")
+        except PyMongoError as e:
+            logger.error("Failed to ensure job queue indexes: %s", e)
+
+    async def enqueue(self, db, kind: str, payload: Dict[str, Any]) -> None:
+        """Store a job for any worker to run.
+
+        Like the submission counters, a failure is logged rather than failing
+        the request that triggered it.
+        """
+        now = datetime.utcnow()
+        try:
+            await db.jobs.insert_one({
+                "_id": str(uuid.uuid4()),
+                "kind": kind,
+                "payload": payload,
+                "attempts": 0,
+                "created_at": now,
+                "available_at": now,
+            })
+            self.enqueued += 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+        except PyMongoError as e:
+            logger.error("Failed to enqueue %s job: %s", kind, e)
+
+    def start(self, db) -> None:
+        self._db = db
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stop claiming and give running jobs ``timeout`` seconds to finish; the rest are re-claimed later"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._running:
+            await asyncio.wait(self._running, timeout=timeout)
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "running": len(self._running),
+            "enqueued": self.enqueued,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            wanted = min(self.concurrency - len(self._running), self.batch_size)
+            jobs = []
+            if wanted > 0:
+                try:
+                    jobs = await self._claim(wanted)
+                except PyMongoError as e:
+                    logger.error("Failed to claim jobs: %s", e)
+            for job in jobs:
+                task = asyncio.create_task(self._execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._job_done)
+            if wanted > 0 and len(jobs) == wanted:
+                # A full batch: there may be more due right away
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _job_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        # A slot opened up
+        self._wakeup.set()
+
+    async def _claim(self, count: int):
+        now = datetime.utcnow()
+        lease = str(uuid.uuid4())
+        claims = await asyncio.gather(*(
+            self._db.jobs.find_one_and_update(
+                {"available_at": {"$lte": now}},
+                {
+                    "$set": {"lease": lease, "available_at": now + timedelta(seconds=self.lease)},
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("available_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            for _ in range(count)
+        ))
+        return [job for job in claims if job is not None]
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        owned = {"_id": job["_id"], "lease": job["lease"]}
+        try:
+            handler = self.handlers[job["kind"]]
+            # Finish inside the lease, or another worker may run the job too
+            await asyncio.wait_for(handler(job["payload"]), self.lease)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            await self._fail(job, owned, error)
+            return
+        try:
+            await self._db.jobs.delete_one(owned)
+            self.succeeded += 1
+        except PyMongoError as e:
+            logger.error("Failed to complete job %s: %s", job['_id'], e)
+
+    async def _fail(self, job: Dict[str, Any], owned: Dict[str, Any], error: str) -> None:
+        try:
+            if job["attempts"] >= self.max_attempts:
+                dead = {k: v for k, v in job.items() if k not in ("lease", "available_at")}
+                await self._db.jobs_dead.replace_one(
+                    {"_id": job["_id"]}, dead | {"failed_at": datetime.utcnow(), "last_error": error}, upsert=True
+                )
+                await self._db.jobs.delete_one(owned)
+                self.dead += 1
+                logger.error("Job %s (%s) dead after %s attempts: %s", job['_id'], job['kind'], job['attempts'], error)
+                return
+            delay = backoff(job["attempts"], self.base_delay, self.max_delay)
+            await self._db.jobs.update_one(owned, {
+                "$set": {"available_at": datetime.utcnow() + timedelta(seconds=delay), "last_error": error},
+                "$unset": {"lease": ""},
+            })
+            self.retried += 1
+            logger.warning(
+                "Job %s (%s) attempt %s failed, retrying in %.1fs: %s",
+                job['_id'], job['kind'], job['attempts'], delay, error,
+            )
+        except PyMongoError as e:
+            # The lease expires and the job is claimed again
+            logger.error("Failed to reschedule job %s: %s", job['_id'], e)
@@ -0,0 +1,224 @@
+"""Production launcher: N uvicorn workers (uvloop + httptools) under one master.
+
+    python launcher.py --workers 4
+    python launcher.py --workers 4 --reuse-port
+
+The master imports ``server`` once before forking (``--preload``, the default),
+so workers share its code pages copy-on-write instead of each importing it.
+Nothing connects at import time; every worker opens its own database client in
+the app lifespan.
+
+By default the master binds the socket and all workers accept on it. With
+``--reuse-port`` each worker binds its own ``SO_REUSEPORT`` socket and the
+kernel spreads connections across them. Connections still queued on a socket
+whose worker exits are reset, so keep the shared socket when restarts must not
+drop anything.
+
+Signals to the master:
+
+- ``SIGTERM`` / ``SIGINT``: workers stop accepting, finish in-flight requests
+  (for up to ``--graceful-timeout`` seconds), run the lifespan shutdown and exit.
+- ``SIGHUP``: rolling restart. Workers are replaced one at a time, and each old
+  worker is drained only once its replacement has finished starting. Preloaded
+  replacements run the code the master imported; use ``--no-preload`` to pick
+  up a new release this way.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import typer
+import uvicorn
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("launcher")
+
+# Workers are forked so they inherit the preloaded app and the listening socket
+_fork = multiprocessing.get_context("fork")
+BACKLOG = 2048
+
+
+def bind_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that tells the master once its lifespan startup is done"""
+
+    def __init__(self, config: uvicorn.Config, ready):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.ready.set()
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        # Long-lived responses (e.g. /api/live) never finish on their own; end them before draining
+        for hook in getattr(self.config.app.state, "drain_hooks", ()):
+            await hook()
+        await super().shutdown(sockets=sockets)
+
+
+def run_worker(options: Dict[str, Any], sock: Optional[socket.socket], bind: Tuple[str, int], ready) -> None:
+    # Drop the master's handlers; uvicorn installs its own for SIGTERM/SIGINT
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    if sock is None:
+        sock = bind_socket(*bind, reuse_port=True)
+    from server import app, log_pipeline  # already in sys.modules when preloaded
+
+    try:
+        WorkerServer(uvicorn.Config(app, **options), ready).run(sockets=[sock])
+    finally:
+        # Forked workers exit without running atexit hooks, so write out queued logs here
+        log_pipeline.close()
+
+
+class Master:
+    def __init__(self, workers: int, options: Dict[str, Any], bind: Tuple[str, int],
+                 reuse_port: bool, graceful_timeout: float, startup_timeout: float):
+        self.workers = workers
+        self.options = options
+        self.bind = bind
+        self.sock = None if reuse_port else bind_socket(*bind, reuse_port=False)
+        self.graceful_timeout = graceful_timeout
+        self.startup_timeout = startup_timeout
+        self.processes: Dict[Any, Any] = {}  # process -> ready event
+        self.signals: List[int] = []
+
+    def spawn(self):
+        ready = _fork.Event()
+        process = _fork.Process(target=run_worker, args=(self.options, self.sock, self.bind, ready))
+        process.start()
+        self.processes[process] = ready
+        logger.info("Started worker %s", process.pid)
+        return process
+
+    def wait_ready(self, process) -> bool:
+        deadline = time.monotonic() + self.startup_timeout
+        while not self.processes[process].wait(0.1):
+            if not process.is_alive() or time.monotonic() > deadline:
+                return False
+        return True
+
+    def stop(self, processes) -> None:
+        """SIGTERM, then SIGKILL whatever is still running after the graceful timeout"""
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        # uvicorn enforces the graceful timeout itself; the margin covers the lifespan shutdown
+        deadline = time.monotonic() + self.graceful_timeout + 10
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("Worker %s did not drain in time, killing it", process.pid)
+                process.kill()
+                process.join()
+            self.processes.pop(process, None)
+            logger.info("Stopped worker %s", process.pid)
+
+    def rolling_restart(self) -> None:
+        logger.info("Rolling restart")
+        for old in list(self.processes):
+            new = self.spawn()
+            if not self.wait_ready(new):
+                logger.error("Replacement worker %s failed to start, keeping the remaining workers", new.pid)
+                self.stop([new])
+                return
+            self.stop([old])
+        logger.info("Rolling restart complete")
+
+    def reap(self) -> bool:
+        """Replace workers that died; False if one died before it ever became ready"""
+        for process, ready in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            del self.processes[process]
+            if not ready.is_set():
+                logger.error("Worker %s exited during startup (code %s)", process.pid, process.exitcode)
+                return False
+            logger.warning("Worker %s exited unexpectedly (code %s), replacing it", process.pid, process.exitcode)
+            self.spawn()
+        return True
+
+    def run(self) -> int:
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, lambda sig, frame: self.signals.append(sig))
+        for _ in range(self.workers):
+            self.spawn()
+        host, port = self.bind
+        logger.info("Serving on http://%s:%s with %s workers (master %s)", host, port, self.workers, os.getpid())
+
+        code = 0
+        while True:
+            wait([p.sentinel for p in self.processes], timeout=0.5)
+            if self.signals:
+                sig = self.signals.pop(0)
+                if sig == signal.SIGHUP:
+                    self.rolling_restart()
+                    continue
+                logger.info("Received %s, draining workers", signal.Signals(sig).name)
+                break
+            if not self.reap():
+                code = 1
+                break
+
+        self.stop(list(self.processes))
+        if self.sock is not None:
+            self.sock.close()
+        return code
+
+
+cli = typer.Typer(add_completion=False)
+
+
+@cli.command()
+def serve(
+    host: str = typer.Option("0.0.0.0", envvar="HOST"),
+    port: int = typer.Option(8001, envvar="PORT"),
+    workers: int = typer.Option(os.cpu_count() or 1, envvar="WEB_CONCURRENCY", min=1),
+    reuse_port: bool = typer.Option(False, help="Give each worker its own SO_REUSEPORT socket"),
+    preload: bool = typer.Option(True, help="Import the app once in the master before forking"),
+    loop: str = typer.Option("uvloop", help="uvicorn event loop: uvloop, asyncio or auto"),
+    http: str = typer.Option("httptools", help="uvicorn HTTP parser: httptools, h11 or auto"),
+    graceful_timeout: float = typer.Option(30.0, help="Seconds a worker may spend finishing in-flight requests"),
+    startup_timeout: float = typer.Option(60.0, help="Seconds a replacement worker may take to become ready"),
+    access_log: bool = typer.Option(False),
+    log_level: str = typer.Option("info"),
+):
+    """Run the API with several worker processes"""
+    if preload:
+        import server  # noqa: F401
+
+    options = {
+        "loop": loop,
+        "http": http,
+        "lifespan": "on",
+        "timeout_graceful_shutdown": graceful_timeout,
+        "access_log": access_log,
+        "log_level": log_level,
+        # uvicorn's loggers propagate to the root logger, i.e. the app's log queue
+        "log_config": None,
+    }
+    master = Master(workers, options, (host, port), reuse_port, graceful_timeout, startup_timeout)
+    raise typer.Exit(master.run())
+
+
+if __name__ == "__main__":
+    cli()
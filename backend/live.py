@@ -0,0 +1,178 @@
+"""Live submission feed for the admin dashboard (``GET /api/live``, Server-Sent Events).
+
+Each worker has one source of events and fans it out to every connected
+client. On a replica set that source is a single change stream over the four
+submission collections, so every worker hears about every insert. Without one
+(standalone Mongo, SQLite) the submissions this worker stores are published on
+an in-process bus instead, and a client only hears about its own worker's.
+
+Events only say that a collection has new documents (``count`` and the newest
+``created_at``); the dashboard then refetches the first page, which the
+conditional-GET cache serves without a query. Inserts are coalesced per
+collection for ``coalesce`` seconds, so a bulk import is one event rather than
+thousands. Each client has a bounded buffer, and a client that falls that far
+behind is sent ``event: dropped`` and disconnected; ``EventSource`` reconnects.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+LIVE_COLLECTIONS = ("donations", "memberships", "volunteers", "contacts")
+# Client reconnect delay sent in the stream, in milliseconds
+RECONNECT_MS = 3000
+# Seconds before reopening a change stream after a transient error
+RETRY_DELAY = 1.0
+# ChangeStreamHistoryLost: the resume token has fallen off the oplog
+HISTORY_LOST = 286
+
+
+def sse(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class Subscriber:
+    def __init__(self, collections: Set[str], buffer: int):
+        self.collections = collections
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        self.dropped = False
+
+
+class LiveFeed:
+    def __init__(self, buffer: int = 64, coalesce: float = 0.25, heartbeat: float = 15.0):
+        self.buffer = buffer
+        self.coalesce = coalesce
+        self.heartbeat = heartbeat
+        # True unless a change stream is the source
+        self.local = True
+        self._subscribers: Set[Subscriber] = set()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self.published = 0
+        self.dropped = 0
+
+    def start(self, db=None) -> None:
+        """Start fanning out; follow a change stream on ``db`` when it supports one"""
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._flush_forever())]
+        if db is not None:
+            self._tasks.append(asyncio.create_task(self._watch(db)))
+
+    async def close(self) -> None:
+        """End every client stream and stop the source; safe to call twice"""
+        for subscriber in list(self._subscribers):
+            self._end(subscriber)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def publish_local(self, collection: str, created_at: datetime, count: int = 1) -> None:
+        """A submission this worker stored; ignored while a change stream reports them all"""
+        if self.local:
+            self._note(collection, created_at, count)
+
+    async def stream(self, collections: Iterable[str]) -> AsyncIterator[bytes]:
+        """SSE body for one client; ends when the client disconnects, lags or the feed closes"""
+        subscriber = Subscriber(set(collections), self.buffer)
+        self._subscribers.add(subscriber)
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n".encode()
+            yield sse("ready", {"source": "local" if self.local else "change_stream"})
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from timing the connection out
+                    yield b": ping\n\n"
+                    continue
+                if message is None:
+                    if subscriber.dropped:
+                        yield sse("dropped", {"buffer": self.buffer})
+                    return
+                yield message
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "source": "local" if self.local else "change_stream",
+            "clients": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+    def _note(self, collection: str, created_at: Optional[datetime], count: int) -> None:
+        if not self._subscribers or self._wakeup is None:
+            return
+        entry = self._pending.setdefault(collection, {"count": 0, "created_at": None})
+        entry["count"] += count
+        if created_at is not None and (entry["created_at"] is None or created_at > entry["created_at"]):
+            entry["created_at"] = created_at
+        self._wakeup.set()
+
+    def _end(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        # Make room for the sentinel; whatever was buffered is superseded by the refetch
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.coalesce)
+            self._wakeup.clear()
+            pending, self._pending = self._pending, {}
+            for collection, entry in pending.items():
+                created_at = entry["created_at"]
+                message = sse(collection, {
+                    "count": entry["count"],
+                    "created_at": created_at.isoformat() if created_at is not None else None,
+                })
+                for subscriber in list(self._subscribers):
+                    if collection not in subscriber.collections:
+                        continue
+                    try:
+                        subscriber.queue.put_nowait(message)
+                        self.published += 1
+                    except asyncio.QueueFull:
+                        subscriber.dropped = True
+                        self.dropped += 1
+                        self._end(subscriber)
+
+    async def _watch(self, db) -> None:
+        pipeline = [
+            {"$match": {"operationType": "insert", "ns.coll": {"$in": list(LIVE_COLLECTIONS)}}},
+            {"$project": {"ns.coll": 1, "fullDocument.created_at": 1}},
+        ]
+        resume_after = None
+        while True:
+            try:
+                async with db.watch(pipeline, resume_after=resume_after) as changes:
+                    self.local = False
+                    async for change in changes:
+                        resume_after = changes.resume_token
+                        self._note(change["ns"]["coll"], change["fullDocument"].get("created_at"), 1)
+            except OperationFailure as e:
+                if e.code == HISTORY_LOST:
+                    resume_after = None
+                    continue
+                # Standalone server or no permission: change streams will not work here
+                self.local = True
+                logger.warning("Live feed using the in-process bus, change stream unavailable: %s", e)
+                return
+            except PyMongoError as e:
+                # Publish locally until the stream is back; overlapping events only cost a refetch
+                self.local = True
+                logger.error("Live feed change stream failed, reopening: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
+            except Exception as e:
+                self.local = True
+                logger.warning("Live feed using the in-process bus, change stream unavailable: %s", e)
+                return
@@ -0,0 +1,222 @@
+"""Non-blocking, structured logging for the API workers.
+
+Log calls on the event loop only put the record on a bounded in-memory queue;
+a ``QueueListener`` thread encodes each record as one JSON line (or the classic
+text line) and writes it. When the queue is full the record is dropped and
+counted instead of blocking the request that logged it.
+
+Per-level sampling (e.g. keep 10% of INFO) is decided before anything is
+formatted or queued, so sampled-out records cost a ``random()`` call. Use
+%-style arguments (``logger.info("x %s", y)``) rather than f-strings so that
+work is skipped for them too.
+
+``RequestLogMiddleware`` gives every HTTP request an ID (the incoming
+``X-Request-ID`` or a fresh one), attaches it to each record logged while the
+request is handled, returns it in the response and logs one access line with
+the route template, status and latency.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# ID of the request being handled by the current task, if any
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Client-supplied IDs are echoed back and written to logs, so keep them short and plain
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through ``extra=``. uvicorn adds
+# color_message, an ANSI-coloured copy of the message
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "color_message",
+}
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """``"DEBUG=0,INFO=0.1"`` -> {10: 0.0, 20: 0.1}; levels not listed are kept in full"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in sample rates: {name}")
+        rates[level] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Samples by level, queues without blocking and counts what it drops"""
+
+    def __init__(self, maxsize: int, sample_rates: Optional[Dict[int, float]] = None):
+        super().__init__(queue.Queue(maxsize))
+        self.sample_rates = sample_rates or {}
+        self.dropped = 0
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord):
+        rate = self.sample_rates.get(record.levelno, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        return super().filter(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Runs on the logging thread: capture what is only valid here and leave
+        # JSON encoding and the write to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        current = request_id.get()
+        if current is not None and not hasattr(record, "request_id"):
+            record.request_id = current
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    def __init__(self, level: int = logging.INFO, fmt: str = "json", queue_size: int = 10_000,
+                 sample_rates: Optional[Dict[int, float]] = None, stream=None):
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        self.handler = BoundedQueueHandler(queue_size, sample_rates)
+        self.listener = _Listener(self.handler.queue, output, respect_handler_level=True)
+        self.level = level
+
+    def install(self) -> "LogPipeline":
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        atexit.register(self.close)
+        # Forked workers do not inherit the listener thread; give each its own queue and thread
+        os.register_at_fork(after_in_child=self._restart)
+        return self
+
+    def _restart(self) -> None:
+        fresh = queue.Queue(self.handler.queue.maxsize)
+        self.handler.queue = self.listener.queue = fresh
+        self.listener._thread = None
+        self.handler.dropped = self.handler.sampled_out = 0
+        self.listener.start()
+
+    def close(self) -> None:
+        """Write out everything queued and stop the listener thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "capacity": self.handler.queue.maxsize,
+            "dropped": self.handler.dropped,
+            "sampled_out": self.handler.sampled_out,
+        }
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", queue_size: int = 10_000,
+                  sample_rates: str = "") -> LogPipeline:
+    """Route the root logger through a new ``LogPipeline``, replacing its handlers"""
+    return LogPipeline(
+        level=logging.getLevelName(level.upper()),
+        fmt=fmt,
+        queue_size=queue_size,
+        sample_rates=parse_sample_rates(sample_rates),
+    ).install()
+
+
+class RequestLogMiddleware:
+    """ASGI middleware assigning request IDs and logging one access line per request"""
+
+    def __init__(self, app, logger: logging.Logger, access_log: bool = True):
+        self.app = app
+        self.logger = logger
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        rid = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(rid)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", rid.encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if self.access_log:
+                # Server errors are kept whatever the INFO sample rate is
+                level = logging.WARNING if status >= 500 else logging.INFO
+                if self.logger.isEnabledFor(level):
+                    route = getattr(scope.get("route"), "path", None)
+                    self.logger.log(level, "%s %s %s", scope["method"], scope["path"], status, extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    })
+            request_id.reset(token)
@@ -0,0 +1,105 @@
+"""Thank-you emails and donation receipts, sent by ``jobs.JobQueue`` workers.
+
+Messages are built from the job payload alone, so a retry sends the same email
+however the stored submission has changed since. Sending uses the standard
+library ``smtplib`` on a thread pool sized to the queue's concurrency limit,
+which therefore also bounds how many SMTP connections a worker holds open.
+"""
+import asyncio
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from typing import Any, Dict, Optional
+
+ORGANIZATION = "Swadeshi Hind Party"
+
+
+def _format_rupees(paise: Optional[int], typed: str) -> str:
+    if paise is None:
+        return typed
+    rupees, rest = divmod(paise, 100)
+    return f"₹{rupees:,}.{rest:02d}"
+
+
+def donation_receipt(payload: Dict[str, Any]) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = f"Receipt for your donation to {ORGANIZATION}"
+    message["To"] = payload["email"]
+    message.set_content(
+        f"Dear {payload['name']},\n\n"
+        f"Thank you for your donation to {ORGANIZATION}.\n\n"
+        f"Receipt number: {payload['id']}\n"
+        f"Amount: {_format_rupees(payload.get('amount_paise'), payload['amount'])}\n"
+        f"Date: {payload['created_at']} UTC\n\n"
+        f"Please keep this email for your records.\n\nJai Hind,\n{ORGANIZATION}\n"
+    )
+    return message
+
+
+def membership_welcome(payload: Dict[str, Any]) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = f"Welcome to {ORGANIZATION}"
+    message["To"] = payload["email"]
+    message.set_content(
+        f"Dear {payload['name']},\n\n"
+        f"Thank you for applying for {payload['membershipType']} membership of {ORGANIZATION}.\n\n"
+        f"Membership number: {payload['membershipNumber']}\n\n"
+        f"We will be in touch once your application has been reviewed.\n\nJai Hind,\n{ORGANIZATION}\n"
+    )
+    return message
+
+
+def volunteer_thanks(payload: Dict[str, Any]) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = f"Thank you for volunteering with {ORGANIZATION}"
+    message["To"] = payload["email"]
+    message.set_content(
+        f"Dear {payload['name']},\n\n"
+        f"Thank you for offering your time to {ORGANIZATION}.\n\n"
+        f"Volunteer ID: {payload['volunteerId']}\n\n"
+        f"A coordinator will contact you about upcoming activities.\n\nJai Hind,\n{ORGANIZATION}\n"
+    )
+    return message
+
+
+# Job kind -> message builder
+ACKNOWLEDGEMENTS = {
+    "donation_receipt": donation_receipt,
+    "membership_welcome": membership_welcome,
+    "volunteer_thanks": volunteer_thanks,
+}
+
+
+class SMTPSender:
+    def __init__(self, host: str, port: int, sender: str, username: Optional[str] = None,
+                 password: Optional[str] = None, starttls: bool = False, timeout: float = 10.0,
+                 max_connections: int = 10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="smtp")
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+    async def send(self, message: EmailMessage) -> None:
+        if "From" not in message:
+            message["From"] = self.sender
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._send, message)
+
+    def handlers(self):
+        """``JobQueue`` handlers, one per acknowledgement kind"""
+        def handler(build):
+            async def run(payload: Dict[str, Any]) -> None:
+                await self.send(build(payload))
+            return run
+        return {kind: handler(build) for kind, build in ACKNOWLEDGEMENTS.items()}
@@ -0,0 +1,231 @@
+"""Request and MongoDB telemetry exposed in Prometheus text format.
+
+``MetricsMiddleware`` records a count and a latency histogram per route
+template; ``CommandTimer`` and ``PoolTimer`` are PyMongo listeners that record
+per-command latency for each collection and the time spent waiting to check a
+connection out of the pool. Recording is a dict lookup, a bisect and a few
+integer adds, cheap enough to leave on in production.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+from pymongo import monitoring
+
+# Seconds; tuned for an API whose healthy requests finish in a few milliseconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: object) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.commands: Dict[Tuple[str, str], Histogram] = {}
+        self.command_failures: Dict[Tuple[str, str], int] = {}
+        self.pool_wait = Histogram()
+        self.pool_wait_failures = 0
+        self._gauges: List[Tuple[str, str, Callable[[], float]]] = []
+        # Mongo events arrive on Motor's executor threads
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.request_latency.get((method, route))
+        if histogram is None:
+            histogram = self.request_latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_command(self, command: str, collection: str, seconds: float, failed: bool = False) -> None:
+        key = (command, collection)
+        with self._lock:
+            histogram = self.commands.get(key)
+            if histogram is None:
+                histogram = self.commands[key] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.command_failures[key] = self.command_failures.get(key, 0) + 1
+
+    def observe_pool_wait(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self.pool_wait_failures += 1
+            else:
+                self.pool_wait.observe(seconds)
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Register a value read at scrape time"""
+        self._gauges.append((name, help_text, read))
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        lines += ["# HELP http_requests_total HTTP requests by route and status",
+                  "# TYPE http_requests_total counter"]
+        for (method, route, status), n in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+        lines += ["# HELP http_request_duration_seconds HTTP request latency by route",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), h in sorted(self.request_latency.items()):
+            lines += _histogram_lines("http_request_duration_seconds", h, method=method, route=route)
+
+        with self._lock:
+            lines += ["# HELP mongodb_command_duration_seconds MongoDB command latency by collection",
+                      "# TYPE mongodb_command_duration_seconds histogram"]
+            for (command, collection), h in sorted(self.commands.items()):
+                lines += _histogram_lines("mongodb_command_duration_seconds", h,
+                                          command=command, collection=collection)
+
+            lines += ["# HELP mongodb_command_failures_total Failed MongoDB commands",
+                      "# TYPE mongodb_command_failures_total counter"]
+            for (command, collection), n in sorted(self.command_failures.items()):
+                lines.append(f"mongodb_command_failures_total{_labels(command=command, collection=collection)} {n}")
+
+            lines += ["# HELP mongodb_pool_checkout_wait_seconds Time waiting for a pooled connection",
+                      "# TYPE mongodb_pool_checkout_wait_seconds histogram"]
+            lines += _histogram_lines("mongodb_pool_checkout_wait_seconds", self.pool_wait)
+            lines += ["# HELP mongodb_pool_checkout_failures_total Failed connection checkouts",
+                      "# TYPE mongodb_pool_checkout_failures_total counter",
+                      f"mongodb_pool_checkout_failures_total {self.pool_wait_failures}"]
+
+        for name, help_text, read in self._gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, h: Histogram, **labels: str) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(h.buckets, h.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {h.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {h.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {h.count}")
+    return lines
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template"""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # FastAPI stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.registry.observe_request(scope["method"], path, status, time.perf_counter() - start)
+
+
+class CommandTimer(monitoring.CommandListener):
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._pending: Dict[Tuple[int, object], Tuple[str, str]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        else:
+            target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else ""
+        self._pending[(event.request_id, event.connection_id)] = (event.command_name, collection)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        name, collection = self._pending.pop((event.request_id, event.connection_id), (event.command_name, ""))
+        self.registry.observe_command(name, collection, event.duration_micros / 1e6, failed=failed)
+
+
+class PoolTimer(monitoring.ConnectionPoolListener):
+    """Measures check-out wait; start and end events fire on the same thread"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.start = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        start = getattr(self._local, "start", None)
+        if start is not None:
+            self.registry.observe_pool_wait(time.perf_counter() - start)
+            self._local.start = None
+
+    def connection_check_out_failed(self, event) -> None:
+        self._local.start = None
+        self.registry.observe_pool_wait(0.0, failed=True)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
+
+    def connection_checked_in(self, event) -> None:
+        pass
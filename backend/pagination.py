@@ -0,0 +1,78 @@
+"""Keyset (cursor) pagination helpers for the list endpoints.
+
+A cursor is an opaque, URL-safe token wrapping the ``(created_at, id)`` pair of
+the last document on a page. The next page is fetched with a range predicate on
+that pair instead of ``skip``, so page 10,000 costs the same as page 1 as long
+as the ``(created_at, id)`` index exists.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Newest first, with ``id`` as a tie-breaker so the order is total and stable
+SORT_ORDER = [("created_at", -1), ("id", -1)]
+
+# Response header carrying the cursor for the following page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a cursor we did not issue"""
+
+
+def encode_cursor(created_at: datetime, doc_id: str) -> str:
+    payload = json.dumps({"t": created_at.isoformat(), "id": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), str(payload["id"])
+    except Exception as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def cursor_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Mongo filter selecting documents strictly after ``cursor`` in SORT_ORDER"""
+    if not cursor:
+        return {}
+    created_at, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": doc_id}},
+        ]
+    }
+
+
+async def fetch_page(
+    collection,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page of ``collection`` and the cursor for the page after it.
+
+    ``skip`` is still honoured for backward compatibility and is applied after
+    the cursor position. One extra document is read to tell whether another
+    page exists, so the last page returns ``None`` instead of a dangling cursor.
+    A ``projection`` must keep ``created_at`` and ``id`` for the cursor.
+    """
+    query = cursor_filter(cursor)
+    find = collection.find(query, projection).sort(SORT_ORDER)
+    if skip:
+        find = find.skip(skip)
+    if limit <= 0:
+        # Mongo treats limit 0 as "no limit"; keep that behaviour
+        return await find.to_list(length=None), None
+
+    docs = await find.limit(limit + 1).to_list(length=None)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    last = docs[-1]
+    return docs, encode_cursor(last["created_at"], last["id"])
@@ -0,0 +1,269 @@
+"""Opt-in sampling profiler that keeps flamegraph profiles of slow requests.
+
+``ProfilerMiddleware`` registers each request's task with a ``SamplingProfiler``.
+While any request is in flight, a sampler thread wakes every ``interval``
+seconds and records one stack per tracked request:
+
+- if the request's task is running on the event loop, the loop thread's stack
+  from the task's coroutine down (``sys._current_frames``);
+- otherwise the chain of coroutines it is suspended in, ending in
+  ``[awaiting]``, so time spent waiting on MongoDB or SQLite shows up as well.
+
+A thread is used rather than ``SIGPROF``: signals only reach the main thread
+and interrupt blocking system calls, while the sampler works whichever thread
+runs the loop. Requests that finish within ``threshold`` are discarded; slower
+ones are written as a JSON file (metadata plus stack counts) to a directory
+holding at most ``max_profiles`` files, oldest removed first, shared by all
+workers. The admin endpoints list them and download them in the collapsed
+stack format read by flamegraph.pl and speedscope.
+
+With profiling disabled the middleware is not mounted at all, so requests pay
+nothing for it.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    # Private: the loop-to-running-task map that asyncio.current_task(loop) reads
+    from asyncio.tasks import _current_tasks
+except ImportError:  # pragma: no cover - depends on the Python version
+    _current_tasks = None
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID = re.compile(r"^\d+-\d+-[0-9a-f]{32}$")
+
+
+def _running_task(loop):
+    """Task running on ``loop`` right now, asked from the sampler thread"""
+    if _current_tasks is not None:
+        return _current_tasks.get(loop)
+    return asyncio.current_task(loop)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def _awaiting(coro) -> List[str]:
+    """Labels for a suspended coroutine and everything it is awaiting, outermost first"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            # A future, or an awaitable implemented in C
+            labels.append("[awaiting]")
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return labels
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, thread_id: int, loop, task):
+        self.id = f"{int(time.time() * 1000)}-{os.getpid()}-{uuid.uuid4().hex}"
+        self.method = method
+        self.path = path
+        self.thread_id = thread_id
+        self.loop = loop
+        self.task = task
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.finished = False
+
+
+class ProfileStore:
+    """Ring buffer of profile files in one directory"""
+
+    def __init__(self, directory: str, max_profiles: int = 100):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def _ids(self) -> List[str]:
+        # IDs start with the capture time in ms, so name order is age order
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-5] for n in names if n.endswith(".json") and _PROFILE_ID.match(n[:-5]))
+
+    def write(self, profile_id: str, meta: Dict[str, Any], stacks: Dict[str, int]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = os.path.join(self.directory, f".{profile_id}.tmp")
+        with open(temporary, "w") as f:
+            json.dump({**meta, "stacks": stacks}, f, separators=(",", ":"))
+        os.replace(temporary, self._path(profile_id))
+        for old in self._ids()[:-self.max_profiles]:
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                # Another worker pruned it first
+                pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id)) as f:
+                    data = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+            data.pop("stacks", None)
+            profiles.append(data)
+        return profiles
+
+    def collapsed(self, profile_id: str) -> Optional[str]:
+        """The profile as ``frame;frame;frame count`` lines, or None if there is no such profile"""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id)) as f:
+                stacks = json.load(f)["stacks"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+
+
+class SamplingProfiler:
+    def __init__(self, store: ProfileStore, interval: float = 0.01, threshold: float = 0.5, max_depth: int = 128):
+        self.store = store
+        self.interval = interval
+        self.threshold = threshold
+        self.max_depth = max_depth
+        self._active: Dict[Any, RequestProfile] = {}
+        # Held while the sampler adds to a profile and while end() marks it finished
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self.kept = 0
+        self.discarded = 0
+
+    def _ensure_thread(self) -> None:
+        # Started on first use so each forked worker gets its own sampler
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self) -> None:
+        frames = sys._current_frames()
+        # list() copies the dict in one step under the GIL while the loop thread adds and removes entries
+        for profile in list(self._active.values()):
+            coro = profile.task.get_coro()
+            if _running_task(profile.loop) is profile.task:
+                labels = []
+                frame = frames.get(profile.thread_id)
+                outermost = getattr(coro, "cr_frame", None)
+                while frame is not None:
+                    labels.append(_label(frame))
+                    if frame is outermost:
+                        break
+                    frame = frame.f_back
+                labels.reverse()
+            else:
+                labels = _awaiting(coro)
+            with self._lock:
+                # The request may have ended since the snapshot of _active was taken
+                if profile.finished:
+                    continue
+                profile.stacks[";".join(labels[:self.max_depth])] += 1
+                profile.samples += 1
+
+    def begin(self, method: str, path: str) -> RequestProfile:
+        self._ensure_thread()
+        task = asyncio.current_task()
+        profile = RequestProfile(method, path, threading.get_ident(), asyncio.get_running_loop(), task)
+        self._active[task] = profile
+        self._wake.set()
+        return profile
+
+    def end(self, profile: RequestProfile, status: int, route: Optional[str], duration: float) -> None:
+        # Once finished is set under the lock the sampler no longer touches the profile
+        with self._lock:
+            profile.finished = True
+            self._active.pop(profile.task, None)
+        if duration < self.threshold or not profile.samples:
+            self.discarded += 1
+            return
+        self.kept += 1
+        meta = {
+            "id": profile.id,
+            "method": profile.method,
+            "path": profile.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "samples": profile.samples,
+            "interval_ms": self.interval * 1000,
+            "captured_at": int(profile.id.split("-", 1)[0]) / 1000,
+        }
+        # File I/O off the event loop; a failed write only loses this profile
+        future = profile.loop.run_in_executor(None, self.store.write, profile.id, meta, dict(profile.stacks))
+        future.add_done_callback(self._written)
+
+    @staticmethod
+    def _written(future) -> None:
+        if future.exception() is not None:
+            logger.error("Failed to write profile: %s", future.exception())
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "active": len(self._active),
+            "kept": self.kept,
+            "discarded": self.discarded,
+            "threshold_ms": self.threshold * 1000,
+            "interval_ms": self.interval * 1000,
+        }
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling every HTTP request outside ``exclude`` (path prefixes)"""
+
+    def __init__(self, app, profiler: SamplingProfiler, exclude: Iterable[str] = ()):
+        self.app = app
+        self.profiler = profiler
+        self.exclude = tuple(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile = self.profiler.begin(scope["method"], scope["path"])
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            self.profiler.end(profile, status, route, time.perf_counter() - start)
@@ -0,0 +1,188 @@
+"""Rate limiting and admission control for the submission POST endpoints.
+
+``AdmissionMiddleware`` runs before routing, so a rejected request costs a
+dict lookup: its body is never read, validated or written.
+
+- ``RateLimiter`` keeps one token bucket per (client IP, path) in a bounded
+  LRU, so a flood of spoofed or rotating addresses cannot grow memory without
+  limit; a client over its bucket gets 429 with ``Retry-After``.
+- With shared mode on, each worker still decides locally but every
+  ``sync_interval`` adds what it admitted per key to a fixed-window counter in
+  the ``rate_limits`` collection. Keys whose window total across all workers
+  is over the limit are refused by every worker until the window ends, so a
+  client spreading requests over N workers gets about one sync interval of
+  extra headroom rather than N times the rate.
+- A global cap on in-flight writes answers 503 with ``Retry-After`` when the
+  database is already saturated, instead of queueing more inserts behind it.
+
+Client addresses come from the ASGI scope; behind a proxy, run uvicorn with
+``--proxy-headers`` and ``--forwarded-allow-ips`` so that is the real client.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int, max_keys: int = 100_000, window: float = 10.0):
+        self.rate = rate
+        self.burst = burst
+        # Shared mode: requests allowed per key per window across all workers
+        self.window = window
+        self.window_limit = int(rate * window) + burst
+        # key -> [tokens, last refill, blocked until]
+        self._buckets = LRUCache(max_keys)
+        self._admitted: Dict[str, int] = defaultdict(int)
+        self._touched: Set[str] = set()
+        self.shared = False
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str) -> float:
+        """0 if the request may go ahead, otherwise seconds until it may"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.burst), now, 0.0]
+            self._buckets.set(key, bucket)
+        bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if self.shared:
+            self._touched.add(key)
+        if bucket[2] > now:
+            self.limited += 1
+            return bucket[2] - now
+        if bucket[0] < 1:
+            self.limited += 1
+            return (1 - bucket[0]) / self.rate
+        bucket[0] -= 1
+        self.allowed += 1
+        if self.shared:
+            self._admitted[key] += 1
+        return 0.0
+
+    async def sync(self, db) -> None:
+        """Publish this worker's admissions and block keys that are over the window limit"""
+        admitted, self._admitted = self._admitted, defaultdict(int)
+        touched, self._touched = self._touched, set()
+        if not touched:
+            return
+        wall = time.time()
+        window = int(wall // self.window)
+        window_end = (window + 1) * self.window
+        ids = {key: f"{key}|{window}" for key in touched}
+        expires_at = datetime.utcfromtimestamp(window_end) + timedelta(seconds=self.window)
+        ops = [
+            UpdateOne({"_id": ids[key]}, {"$inc": {"count": count}, "$setOnInsert": {"expires_at": expires_at}},
+                      upsert=True)
+            for key, count in admitted.items()
+        ]
+        if ops:
+            await db.rate_limits.bulk_write(ops, ordered=False)
+        keys = {doc_id: key for key, doc_id in ids.items()}
+        blocked_until = time.monotonic() + (window_end - wall)
+        async for doc in db.rate_limits.find({"_id": {"$in": list(keys)}, "count": {"$gt": self.window_limit}}):
+            bucket = self._buckets.get(keys[doc["_id"]])
+            if bucket is not None:
+                bucket[2] = blocked_until
+
+    async def sync_forever(self, db, interval: float) -> None:
+        self.shared = True
+        try:
+            await db.rate_limits.create_index("expires_at", name="expires_at_ttl", expireAfterSeconds=0)
+        except PyMongoError as e:
+            logger.error("Failed to ensure rate limit TTL index: %s", e)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync(db)
+            except PyMongoError as e:
+                # Keep limiting locally; the next sync carries nothing from this one
+                logger.error("Rate limit sync failed: %s", e)
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "keys": len(self._buckets),
+            "evictions": self._buckets.evictions,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "shared": self.shared,
+        }
+
+
+class AdmissionControl:
+    """Which POST paths are guarded, and the state shared by every request to them"""
+
+    def __init__(self, paths: Iterable[str], limiter: Optional[RateLimiter] = None,
+                 max_inflight: int = 0, retry_after: int = 1):
+        self.paths = frozenset(paths)
+        self.limiter = limiter
+        self.max_inflight = max_inflight
+        self.retry_after = retry_after
+        self.inflight = 0
+        self.shed = 0
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "inflight_writes": self.inflight,
+            "max_inflight_writes": self.max_inflight,
+            "shed": self.shed,
+            **(self.limiter.metrics() if self.limiter is not None else {}),
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an ``AdmissionControl`` before the request reaches routing"""
+
+    def __init__(self, app, control: AdmissionControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        control = self.control
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in control.paths:
+            await self.app(scope, receive, send)
+            return
+
+        if control.limiter is not None:
+            client = scope.get("client")
+            wait = control.limiter.acquire(f"{client[0] if client else '-'}|{scope['path']}")
+            if wait:
+                await _reject(send, 429, "Too many requests, please slow down", math.ceil(wait))
+                return
+
+        if control.max_inflight and control.inflight >= control.max_inflight:
+            control.shed += 1
+            await _reject(send, 503, "Server is busy, please retry shortly", control.retry_after)
+            return
+        control.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            control.inflight -= 1
+
+
+async def _reject(send, status: int, detail: str, retry_after: int) -> None:
+    body = json.dumps({"detail": detail}, separators=(",", ":")).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
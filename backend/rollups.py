@@ -0,0 +1,206 @@
+"""Donation amounts in paise and incremental per-day/per-hour rollups.
+
+``Donation.amount`` is kept as the donor typed it; ``amount_paise`` is the
+same value normalized to an integer number of paise so it can be summed and
+bucketed inside Mongo. Every ``create_donation`` updates one ``day:`` and one
+``hour:`` bucket in ``donation_rollups`` (count and sum via ``$inc``, min and
+max via ``$min``/``$max``). Bucket ids sort lexicographically in time order, so
+a time-series read is a single ``_id`` range scan over at most a few hundred
+small documents however many donations exist.
+
+``migrate_donation_amounts`` backfills ``amount_paise`` on documents written
+before it existed and rebuilds the rollups from them, once per database: the
+first worker to insert the ``migrations`` marker runs it while the others skip.
+"""
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES: Dict[str, Tuple[str, timedelta]] = {
+    "day": ("%Y-%m-%d", timedelta(days=1)),
+    "hour": ("%Y-%m-%dT%H", timedelta(hours=1)),
+}
+# Default look-back when a time-series request has no ``from``
+DEFAULT_SPAN = {"day": timedelta(days=30), "hour": timedelta(hours=48)}
+MAX_BUCKETS = 1000
+MIGRATION_ID = "donation_amount_paise"
+# A worker still "running" the migration after this long is assumed to have died
+MIGRATION_LEASE = timedelta(minutes=10)
+# ₹100 crore: far above any real donation, and sums of amounts stay within Mongo's 64-bit ints
+MAX_PAISE = 100 * 10**7 * 100
+
+# Optional rupee prefix, digits with optional thousands separators, up to two decimals
+_AMOUNT = re.compile(r"(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d{1,2})?)", re.IGNORECASE)
+
+
+def to_paise(amount: str) -> int:
+    """``"₹1,000.50"`` -> ``100050``; raises ValueError for anything else"""
+    match = _AMOUNT.fullmatch(amount.strip())
+    if not match:
+        raise ValueError("Amount must be a number of rupees with at most 2 decimal places")
+    paise = int(Decimal(match.group(1).replace(",", "")) * 100)
+    if paise <= 0:
+        raise ValueError("Amount must be greater than zero")
+    if paise > MAX_PAISE:
+        raise ValueError(f"Amount must be at most ₹{MAX_PAISE // 100:,}")
+    return paise
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_id(moment: datetime, granularity: str) -> str:
+    return f"{granularity}:{moment.strftime(GRANULARITIES[granularity][0])}"
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    # Stored timestamps are naive UTC; query parameters may carry an offset
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+async def record_donation(db, created_at: datetime, paise: Optional[int]) -> None:
+    """Add one donation to its day and hour buckets.
+
+    Like the submission counters, a failure is logged rather than failing the
+    already-stored donation.
+    """
+    if paise is None:
+        return
+    try:
+        await asyncio.gather(*(
+            db.donation_rollups.update_one(
+                {"_id": bucket_id(created_at, granularity)},
+                {"$inc": {"count": 1, "sum": paise}, "$min": {"min": paise}, "$max": {"max": paise}},
+                upsert=True,
+            )
+            for granularity in GRANULARITIES
+        ))
+    except PyMongoError as e:
+        logger.error("Failed to update donation rollups: %s", e)
+
+
+def series_bounds(granularity: str, start: Optional[datetime], end: Optional[datetime]) -> List[datetime]:
+    """Bucket starts covering [start, end); raises ValueError for empty or oversized ranges"""
+    step = GRANULARITIES[granularity][1]
+    end = _naive_utc(end) if end is not None else datetime.utcnow()
+    start = _naive_utc(start) if start is not None else end - DEFAULT_SPAN[granularity]
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+    first = bucket_start(start, granularity)
+    count = -(-(end - first) // step)
+    if count > MAX_BUCKETS:
+        raise ValueError(f"Range spans more than {MAX_BUCKETS} {granularity} buckets")
+    return [first + i * step for i in range(count)]
+
+
+async def read_timeseries(db, granularity: str, starts: List[datetime]) -> List[Dict[str, Any]]:
+    """One entry per bucket start, zero-filled where no donation landed"""
+    ids = [bucket_id(s, granularity) for s in starts]
+    docs = await db.donation_rollups.find({"_id": {"$gte": ids[0], "$lte": ids[-1]}}).to_list(None)
+    by_id = {doc["_id"]: doc for doc in docs}
+    series = []
+    for start, key in zip(starts, ids):
+        doc = by_id.get(key, {})
+        series.append({
+            "start": start,
+            "count": doc.get("count", 0),
+            "sum_paise": doc.get("sum", 0),
+            "min_paise": doc.get("min"),
+            "max_paise": doc.get("max"),
+        })
+    return series
+
+
+async def backfill_amount_paise(db, batch_size: int = 1000) -> Tuple[int, int]:
+    """Set ``amount_paise`` on donations that predate it; unparseable amounts get None"""
+    converted = invalid = 0
+    ops: List[UpdateOne] = []
+    cursor = db.donations.find({"amount_paise": {"$exists": False}}, {"_id": 1, "amount": 1})
+    async for doc in cursor.batch_size(batch_size):
+        try:
+            paise = to_paise(str(doc.get("amount", "")))
+            converted += 1
+        except ValueError:
+            paise = None
+            invalid += 1
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"amount_paise": paise}}))
+        if len(ops) >= batch_size:
+            await db.donations.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await db.donations.bulk_write(ops, ordered=False)
+    return converted, invalid
+
+
+async def rebuild_rollups(db) -> None:
+    """Recompute every bucket from the donations themselves.
+
+    Donations arriving between the aggregation and the write are lost from
+    their bucket, the same trade-off ``stats.reconcile_counters`` makes.
+    """
+    for granularity, (fmt, _) in GRANULARITIES.items():
+        pipeline = [
+            {"$match": {"amount_paise": {"$type": "number"}}},
+            {"$group": {
+                "_id": {"$dateToString": {"format": fmt, "date": "$created_at"}},
+                "count": {"$sum": 1},
+                "sum": {"$sum": "$amount_paise"},
+                "min": {"$min": "$amount_paise"},
+                "max": {"$max": "$amount_paise"},
+            }},
+        ]
+        ops = []
+        async for bucket in db.donations.aggregate(pipeline):
+            key = f"{granularity}:{bucket.pop('_id')}"
+            ops.append(ReplaceOne({"_id": key}, bucket, upsert=True))
+        if ops:
+            await db.donation_rollups.bulk_write(ops, ordered=False)
+
+
+async def _claim_migration(db) -> bool:
+    """Take the migration for this worker: a "running" marker, or one whose owner died"""
+    now = datetime.utcnow()
+    try:
+        await db.migrations.insert_one({"_id": MIGRATION_ID, "state": "running", "started_at": now})
+        return True
+    except DuplicateKeyError:
+        pass
+    # Done (older markers have no state) or running elsewhere, unless that worker's lease ran out
+    taken = await db.migrations.find_one_and_update(
+        {"_id": MIGRATION_ID, "state": "running", "started_at": {"$lte": now - MIGRATION_LEASE}},
+        {"$set": {"started_at": now}},
+    )
+    return taken is not None
+
+
+async def migrate_donation_amounts(db) -> None:
+    """Backfill amounts and seed the rollups the first time a deployment starts.
+
+    Every worker calls this on startup; only the one holding the ``migrations``
+    marker does the work.
+    """
+    try:
+        if not await _claim_migration(db):
+            return
+        converted, invalid = await backfill_amount_paise(db)
+        await rebuild_rollups(db)
+        await db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"state": "done", "completed_at": datetime.utcnow(), "converted": converted, "invalid": invalid}},
+        )
+        logger.info("Donation amounts backfilled: %s converted, %s unparseable", converted, invalid)
+    except PyMongoError as e:
+        logger.error("Donation amount migration failed: %s", e)
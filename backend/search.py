@@ -0,0 +1,116 @@
+"""Full-text search over volunteer skills and contact messages.
+
+Backed by the Mongo text indexes declared in ``indexes.INDEXES``. Results are
+ranked by ``textScore`` with ``id`` as a tie-breaker, and paginated with a
+cursor over that ``(score, id)`` pair like the list endpoints use
+``(created_at, id)``. Encoded pages of hot queries are kept in a per-worker LRU
+per collection, cleared whenever this worker stores a new document in that
+collection; a short TTL bounds staleness from submissions other workers take.
+"""
+import base64
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import LRUCache
+from pagination import InvalidCursor
+
+# Collection -> text-indexed fields and their relevance weights
+SEARCH_FIELDS: Dict[str, Dict[str, int]] = {
+    "volunteers": {"skills": 3, "availability": 1},
+    "contacts": {"subject": 3, "message": 1},
+}
+
+Page = Tuple[List[Dict[str, Any]], Optional[str]]
+
+
+def encode_search_cursor(score: float, doc_id: str) -> str:
+    payload = json.dumps({"s": score, "id": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(payload["s"]), str(payload["id"])
+    except Exception as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def normalize_query(query: str) -> str:
+    # Mongo's text search is case-insensitive, so differently typed queries share a cache entry
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class TextSearch:
+    def __init__(self, cache_size: int = 256, ttl: float = 30.0):
+        self._caches = {name: LRUCache(cache_size) for name in SEARCH_FIELDS}
+        self._ttl = ttl
+        # Bumped on every invalidation so a query that overlapped one is not cached
+        self._generations = {name: 0 for name in SEARCH_FIELDS}
+        self.hits = 0
+        self.misses = 0
+
+    async def page(
+        self, db, collection: str, query: str, limit: int, cursor: Optional[str], encoder
+    ) -> Tuple[bytes, Optional[str]]:
+        """Encoded page of results (via a ``fastpath.RowEncoder``) and the next cursor, cached"""
+        key = (normalize_query(query), limit, cursor)
+        entry = self._caches[collection].get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        generation = self._generations[collection]
+        docs, next_cursor = await self.search(db, collection, key[0], limit, cursor, encoder.projection)
+        page = (encoder.encode(docs), next_cursor)
+        if self._generations[collection] == generation:
+            self._caches[collection].set(key, (time.monotonic() + self._ttl, page))
+        return page
+
+    async def search(
+        self,
+        db,
+        collection: str,
+        query: str,
+        limit: int,
+        cursor: Optional[str],
+        projection: Dict[str, Any],
+    ) -> Page:
+        """One page of matches, most relevant first, and the cursor for the next"""
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"$text": {"$search": query}}},
+            {"$addFields": {"_score": {"$meta": "textScore"}}},
+        ]
+        if cursor:
+            score, doc_id = decode_search_cursor(cursor)
+            pipeline.append({"$match": {"$or": [
+                {"_score": {"$lt": score}},
+                {"_score": score, "id": {"$lt": doc_id}},
+            ]}})
+        pipeline += [
+            {"$sort": {"_score": -1, "id": -1}},
+            {"$limit": limit + 1},
+            {"$project": projection | {"_score": 1}},
+        ]
+        docs = await db[collection].aggregate(pipeline).to_list(length=None)
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, encode_search_cursor(docs[-1]["_score"], docs[-1]["id"])
+
+    def invalidate(self, collection: str) -> None:
+        if collection in self._caches:
+            self._caches[collection].clear()
+            self._generations[collection] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": {name: len(c) for name, c in self._caches.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,38 @@
+"""Block-allocated numeric sequences for membership numbers and volunteer IDs.
+
+Each worker reserves a range of ``block_size`` values with one atomic
+increment in the storage backend (a ``$inc`` on a ``counters`` document in
+Mongo) and then hands values out from memory.
+Ranges never overlap, so numbers stay unique across any number of workers;
+the unique indexes on ``membershipNumber``/``volunteerId`` back that up.
+Values left unused in a worker's block when it exits are simply skipped.
+"""
+import asyncio
+
+
+class SequenceAllocator:
+    def __init__(self, name: str, block_size: int = 1000):
+        self.name = name
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def next(self, storage) -> int:
+        # No await between the check and the increment, so the fast path needs no lock
+        while self._next >= self._end:
+            async with self._lock:
+                if self._next >= self._end:
+                    await self._reserve(storage)
+        value = self._next
+        self._next += 1
+        return value
+
+    async def reserve(self, storage, count: int) -> range:
+        """A run of ``count`` values reserved outright, e.g. for a bulk import"""
+        end = await storage.reserve_block(self.name, count) + 1
+        return range(end - count, end)
+
+    async def _reserve(self, storage) -> None:
+        self._end = await storage.reserve_block(self.name, self.block_size) + 1
+        self._next = self._end - self.block_size
@@ -1,127 +1,503 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from pymongo import ReadPreference
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from typing import List, Optional, Literal
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from archive import ARCHIVE_FIELDS, Archiver, archive_name
+from bulk_import import BulkImporter, ImportFormatError
+from cache import TTLCache
+from conditional import (
+    EncodedBody, HotPageCache, freshness_epoch, make_etag, not_modified, not_modified_response,
+)
+from dedup import DuplicateGuard, DuplicateSubmission, duplicate_detail
+from export import export_response
+from fields import Email, Name, Phone
+from fastpath import RowEncoder, fast_list
+from idempotency import IdempotencyStore
+from indexes import explain_queries
+from ingest import BatchWriter, IngestQueueFull
+from jobs import JobQueue
+from live import LIVE_COLLECTIONS, LiveFeed
+from logs import REQUEST_ID_HEADER, RequestLogMiddleware, setup_logging
+from mailer import SMTPSender
+from metrics import CommandTimer, MetricsMiddleware, MetricsRegistry, PoolTimer
+from pagination import NEXT_CURSOR_HEADER, InvalidCursor, cursor_filter
+from profiler import ProfilerMiddleware, ProfileStore, SamplingProfiler
+from search import TextSearch, decode_search_cursor
+from ratelimit import AdmissionControl, AdmissionMiddleware, RateLimiter
+from rollups import migrate_donation_amounts, read_timeseries, record_donation, series_bounds, to_paise
+from sequences import SequenceAllocator
+from stats import init_counters, live_stats, read_stats, reconcile_forever, record_submission
+from storage import MongoStorage, SQLiteStorage
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Prometheus metrics: per-route latency plus Mongo command and pool timings
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+metrics = MetricsRegistry()
+
+# Storage backend: STORAGE_BACKEND=sqlite runs on an embedded SQLite file instead of MongoDB
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'swadeshi.sqlite3'))
+SQLITE_READERS = int(os.environ.get('SQLITE_READERS', '4'))
+
+def env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+# MongoDB connection pool; unset timeouts keep the driver defaults
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_POOL_TIMEOUTS = {
+    'maxIdleTimeMS': env_int('MONGO_MAX_IDLE_TIME_MS'),
+    'connectTimeoutMS': env_int('MONGO_CONNECT_TIMEOUT_MS'),
+    'socketTimeoutMS': env_int('MONGO_SOCKET_TIMEOUT_MS'),
+    'serverSelectionTimeoutMS': env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+    'waitQueueTimeoutMS': env_int('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+}
+# Connections opened during startup, before the worker reports ready
+MONGO_WARM_CONNECTIONS = int(os.environ.get('MONGO_WARM_CONNECTIONS', str(MONGO_MIN_POOL_SIZE)))
+# Read preference for the list, export and stats reads, e.g. secondaryPreferred on a replica set
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST,
+}
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+
+# Opened by the lifespan unless something (e.g. a benchmark) has already set them
+client: Optional[AsyncIOMotorClient] = None
+db = None
+read_db = None
+storage = None
+
+def connect_mongo() -> AsyncIOMotorClient:
+    options = {k: v for k, v in MONGO_POOL_TIMEOUTS.items() if v is not None}
+    return AsyncIOMotorClient(
+        os.environ['MONGO_URL'],
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        event_listeners=[CommandTimer(metrics), PoolTimer(metrics)] if METRICS_ENABLED else [],
+        **options,
+    )
+
+def open_storage() -> None:
+    global client, db, read_db, storage
+    if STORAGE_BACKEND == 'sqlite':
+        storage = SQLiteStorage(SQLITE_PATH, readers=SQLITE_READERS)
+        return
+    client = connect_mongo()
+    db = client[os.environ['DB_NAME']]
+    read_db = client.get_database(
+        os.environ['DB_NAME'], read_preference=READ_PREFERENCES[MONGO_READ_PREFERENCE]
+    )
+    # Same node as the writes unless a secondary read preference is configured
+    storage = MongoStorage(db, read_db if MONGO_READ_PREFERENCE != 'primary' else None)
+
+# Reads that may be served by replica-set secondaries
+def dashboard_db():
+    return read_db if read_db is not None else db
+
+async def warm_pool() -> None:
+    # Concurrent pings each check out a connection, so the pool is open before traffic arrives
+    try:
+        await asyncio.gather(*(client.admin.command('ping') for _ in range(max(MONGO_WARM_CONNECTIONS, 1))))
+        logger.info("MongoDB pool warmed with %s connections", MONGO_WARM_CONNECTIONS)
+    except PyMongoError as e:
+        logger.error("MongoDB pool warm-up failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    owns_storage = storage is None
+    if owns_storage:
+        open_storage()
+        if client is not None:
+            await warm_pool()
+    ensure_db_indexes()
+    if db is None:
+        # SQLite tables are created with the schema, so requests must wait for it
+        await app.state.index_task
+    warm_duplicate_guard()
+    start_stats_counters()
+    start_batch_writer()
+    start_job_queue()
+    start_rate_limit_sync()
+    start_archiver()
+    live_feed.start(db)
+    # Run by launcher.py before draining, so open live streams do not hold the drain open
+    app.state.drain_hooks = [live_feed.close]
+    yield
+    await drain_background_tasks()
+    if owns_storage:
+        await close_storage()
 
 # Create the main app without a prefix
-app = FastAPI(title="Swadeshi Hind Party API", version="1.0.0")
+app = FastAPI(title="Swadeshi Hind Party API", version="1.0.0", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Admin/debug routes are only mounted when ADMIN_ENDPOINTS=true
+admin_router = APIRouter(prefix="/api/admin")
+ADMIN_ENDPOINTS = os.environ.get('ADMIN_ENDPOINTS', 'false').lower() == 'true'
+
+# /api/stats is served from materialized counters (Mongo) or live counts, cached per worker
+STATS_CACHE_TTL = float(os.environ.get('STATS_CACHE_TTL', '2'))
+# Seconds between background counter reconciliations; 0 disables them
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL', '0'))
+stats_cache = TTLCache(
+    lambda: read_stats(dashboard_db()) if db is not None else live_stats(storage), ttl=STATS_CACHE_TTL
+)
+
+# INGEST_MODE=batched routes submission inserts through a write-behind batch writer
+INGEST_MODE = os.environ.get('INGEST_MODE', 'direct')
+INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', '10000'))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '500'))
+INGEST_MAX_DELAY_MS = float(os.environ.get('INGEST_MAX_DELAY_MS', '10'))
+INGEST_RETRY_AFTER = os.environ.get('INGEST_RETRY_AFTER', '1')
+batch_writer: Optional[BatchWriter] = None
+
+# Submission POSTs: per-IP, per-path token buckets (RATE_LIMIT_RATE requests/s, bursts of
+# RATE_LIMIT_BURST), optionally shared across workers through Mongo, and a cap on in-flight
+# writes (0 = none); both reject before the body is read
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+RATE_LIMIT_SHARED = os.environ.get('RATE_LIMIT_SHARED', 'false').lower() == 'true'
+RATE_LIMIT_SYNC_INTERVAL = float(os.environ.get('RATE_LIMIT_SYNC_INTERVAL', '1'))
+MAX_INFLIGHT_WRITES = int(os.environ.get('MAX_INFLIGHT_WRITES', '0'))
+admission = AdmissionControl(
+    ("/api/donations", "/api/memberships", "/api/volunteers", "/api/contact"),
+    limiter=RateLimiter(
+        rate=float(os.environ.get('RATE_LIMIT_RATE', '0.2')),
+        burst=int(os.environ.get('RATE_LIMIT_BURST', '5')),
+        max_keys=int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000')),
+        window=float(os.environ.get('RATE_LIMIT_WINDOW', '60')),
+    ) if RATE_LIMIT_ENABLED else None,
+    max_inflight=MAX_INFLIGHT_WRITES,
+    retry_after=int(INGEST_RETRY_AFTER),
+)
+
+# LIST_FAST_PATH=true serves list pages from projected raw documents without model round trips
+LIST_FAST_PATH = os.environ.get('LIST_FAST_PATH', 'false').lower() == 'true'
+
+# Idempotency-Key replays: per-worker LRU in front of a Mongo TTL collection (LRU only without Mongo);
+# keys still pending after IDEMPOTENCY_PENDING_LEASE seconds are treated as abandoned
+idempotency_store = IdempotencyStore(
+    max_entries=int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('IDEMPOTENCY_TTL', '86400')),
+    pending_lease=float(os.environ.get('IDEMPOTENCY_PENDING_LEASE', '60')),
+)
+
+# Rejects repeat member/volunteer signups; Bloom filters skip the DB check for new values
+duplicate_guard = DuplicateGuard(
+    ("memberships", "volunteers"),
+    capacity=int(os.environ.get('DEDUP_BLOOM_CAPACITY', '1000000')),
+)
+
+# Documents fetched per cursor batch by the streaming export endpoints
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+
+# Hot search pages are cached per worker and cleared on new submissions; TTL bounds cross-worker staleness
+text_search = TextSearch(
+    cache_size=int(os.environ.get('SEARCH_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('SEARCH_CACHE_TTL', '30')),
+)
+
+# Conditional GET: list/stats ETags from per-collection change versions (re-read at most every
+# VERSION_SYNC_INTERVAL seconds, or right after this worker stores a submission) and a
+# per-worker cache of encoded, compressed first pages
+CONDITIONAL_GET = os.environ.get('CONDITIONAL_GET', 'true').lower() == 'true'
+# Versions only move on API writes, so list ETags also roll over every CONDITIONAL_MAX_AGE seconds
+# to pick up edits made directly in the database (0 = never)
+CONDITIONAL_MAX_AGE = float(os.environ.get('CONDITIONAL_MAX_AGE', '300'))
+VERSION_SYNC_INTERVAL = float(os.environ.get('VERSION_SYNC_INTERVAL', '1'))
+HOT_PAGE_LIMIT = int(os.environ.get('HOT_PAGE_LIMIT', '100'))
+change_versions = TTLCache(lambda: storage.change_versions(), ttl=VERSION_SYNC_INTERVAL)
+hot_pages = HotPageCache(maxsize=int(os.environ.get('HOT_PAGE_CACHE_SIZE', '64')))
+
+# /api/live: per-client event buffer, per-collection coalescing window and keep-alive interval
+live_feed = LiveFeed(
+    buffer=int(os.environ.get('LIVE_BUFFER', '64')),
+    coalesce=float(os.environ.get('LIVE_COALESCE_MS', '250')) / 1000,
+    heartbeat=float(os.environ.get('LIVE_HEARTBEAT', '15')),
+)
+
+# ACK_EMAILS=true queues thank-you emails and donation receipts (Mongo-only) for the job workers
+ACK_EMAILS = os.environ.get('ACK_EMAILS', 'false').lower() == 'true'
+# Jobs run at once per worker, which is also its SMTP connection limit
+JOB_CONCURRENCY = int(os.environ.get('JOB_CONCURRENCY', '10'))
+mail_sender = SMTPSender(
+    host=os.environ.get('SMTP_HOST', 'localhost'),
+    port=int(os.environ.get('SMTP_PORT', '1025')),
+    sender=os.environ.get('MAIL_FROM', 'Swadeshi Hind Party <no-reply@swadeshihindparty.org>'),
+    username=os.environ.get('SMTP_USERNAME') or None,
+    password=os.environ.get('SMTP_PASSWORD') or None,
+    starttls=os.environ.get('SMTP_STARTTLS', 'false').lower() == 'true',
+    timeout=float(os.environ.get('SMTP_TIMEOUT', '10')),
+    max_connections=JOB_CONCURRENCY,
+)
+# Jobs claimed per batch and the retry schedule before a job goes to the dead-letter queue
+job_queue = JobQueue(
+    mail_sender.handlers(),
+    batch_size=int(os.environ.get('JOB_BATCH_SIZE', '20')),
+    concurrency=JOB_CONCURRENCY,
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '8')),
+    base_delay=float(os.environ.get('JOB_RETRY_BASE', '5')),
+    max_delay=float(os.environ.get('JOB_RETRY_MAX', '3600')),
+    lease=float(os.environ.get('JOB_LEASE', '60')),
+    poll_interval=float(os.environ.get('JOB_POLL_INTERVAL', '1')),
+)
+
+# Donations and contact messages older than ARCHIVE_AFTER_DAYS (0 = never) move to compact
+# *_archive collections (Mongo-only): ARCHIVE_BATCH_SIZE at a time, at most ARCHIVE_RATE
+# documents/s, one pass per ARCHIVE_INTERVAL seconds across all workers
+ARCHIVE_AFTER_DAYS = float(os.environ.get('ARCHIVE_AFTER_DAYS', '0'))
+archiver = Archiver(
+    list(ARCHIVE_FIELDS),
+    after=timedelta(days=ARCHIVE_AFTER_DAYS),
+    batch_size=int(os.environ.get('ARCHIVE_BATCH_SIZE', '500')),
+    rate=float(os.environ.get('ARCHIVE_RATE', '1000')),
+    interval=float(os.environ.get('ARCHIVE_INTERVAL', '3600')),
+)
+
+# Bulk imports validate and insert this many rows at a time; the error report is capped
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '1000'))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', '1000'))
+
+# Configure logging: records are queued (at most LOG_QUEUE_SIZE, then dropped and counted) and
+# written as JSON lines (LOG_FORMAT=text for the classic format) by a background thread.
+# LOG_SAMPLE_RATES keeps a share of each level, e.g. "INFO=0.1,DEBUG=0"; ACCESS_LOG adds one
+# line per request with its route and latency
+log_pipeline = setup_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    fmt=os.environ.get('LOG_FORMAT', 'json'),
+    queue_size=int(os.environ.get('LOG_QUEUE_SIZE', '10000')),
+    sample_rates=os.environ.get('LOG_SAMPLE_RATES', ''),
 )
+ACCESS_LOG = os.environ.get('ACCESS_LOG', 'true').lower() == 'true'
 logger = logging.getLogger(__name__)
 
+# PROFILING=true samples request stacks every PROFILE_INTERVAL_MS and keeps a flamegraph profile
+# of each request slower than PROFILE_THRESHOLD_MS, up to PROFILE_MAX_FILES in PROFILE_DIR
+PROFILING = os.environ.get('PROFILING', 'false').lower() == 'true'
+profiler = SamplingProfiler(
+    ProfileStore(
+        os.environ.get('PROFILE_DIR', str(ROOT_DIR / 'profiles')),
+        max_profiles=int(os.environ.get('PROFILE_MAX_FILES', '100')),
+    ),
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', '10')) / 1000,
+    threshold=float(os.environ.get('PROFILE_THRESHOLD_MS', '500')) / 1000,
+)
+
 # Pydantic Models
-class BaseSubmission(BaseModel):
+class StoredModel(BaseModel):
+    @classmethod
+    def build(cls, data: BaseModel, **values) -> "StoredModel":
+        """Stored model from a validated input model plus server-set values, without validating again"""
+        return cls.model_construct(**data.__dict__, **values)
+
+    def document(self) -> dict:
+        # Storage adds _id to what it is given, so hand it a copy rather than __dict__ itself
+        return dict(self.__dict__)
+
+class BaseSubmission(StoredModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    name: str = Field(..., min_length=2, max_length=100)
-    email: EmailStr
+    name: Name
+    email: Email
     phone: str = Field(..., min_length=10, max_length=15)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     status: str = Field(default="pending")
 
 class DonationCreate(BaseModel):
-    name: str = Field(..., min_length=2, max_length=100)
-    email: EmailStr
-    phone: str = Field(..., min_length=10, max_length=15)
+    name: Name
+    email: Email
+    phone: Phone
     amount: str = Field(..., min_length=1)
     message: Optional[str] = Field(None, max_length=1000)
 
-    @validator('phone')
-    def validate_phone(cls, v):
-        # Remove any spaces or special characters
-        cleaned = ''.join(filter(str.isdigit, v))
-        if len(cleaned) != 10 or not cleaned.startswith(('6', '7', '8', '9')):
-            raise ValueError('Phone number must be a valid 10-digit Indian mobile number')
-        return cleaned
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v: str) -> str:
+        to_paise(v)
+        return v
 
 class Donation(BaseSubmission):
     amount: str
+    # Integer paise parsed from amount; None only for legacy amounts that do not parse
+    amount_paise: Optional[int] = None
     message: Optional[str] = None
 
 class MembershipCreate(BaseModel):
-    name: str = Field(..., min_length=2, max_length=100)
-    email: EmailStr
-    phone: str = Field(..., min_length=10, max_length=15)
+    name: Name
+    email: Email
+    phone: Phone
     membershipType: Literal['individual', 'family', 'student']
     address: str = Field(..., min_length=10, max_length=500)
 
-    @validator('phone')
-    def validate_phone(cls, v):
-        cleaned = ''.join(filter(str.isdigit, v))
-        if len(cleaned) != 10 or not cleaned.startswith(('6', '7', '8', '9')):
-            raise ValueError('Phone number must be a valid 10-digit Indian mobile number')
-        return cleaned
-
 class Membership(BaseSubmission):
     membershipType: str
     address: str
     membershipNumber: Optional[str] = None
 
 class VolunteerCreate(BaseModel):
-    name: str = Field(..., min_length=2, max_length=100)
-    email: EmailStr
-    phone: str = Field(..., min_length=10, max_length=15)
+    name: Name
+    email: Email
+    phone: Phone
     skills: str = Field(..., min_length=10, max_length=1000)
     availability: str = Field(..., min_length=5, max_length=200)
 
-    @validator('phone')
-    def validate_phone(cls, v):
-        cleaned = ''.join(filter(str.isdigit, v))
-        if len(cleaned) != 10 or not cleaned.startswith(('6', '7', '8', '9')):
-            raise ValueError('Phone number must be a valid 10-digit Indian mobile number')
-        return cleaned
-
 class Volunteer(BaseSubmission):
     skills: str
     availability: str
     volunteerId: Optional[str] = None
 
 class ContactCreate(BaseModel):
-    name: str = Field(..., min_length=2, max_length=100)
-    email: EmailStr
+    name: Name
+    email: Email
     subject: str = Field(..., min_length=5, max_length=200)
     message: str = Field(..., min_length=10, max_length=2000)
 
-class Contact(BaseModel):
+class Contact(StoredModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
-    email: EmailStr
+    email: Email
     subject: str
     message: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     status: str = Field(default="unread")
 
+# Whole list pages are validated in one call; adapters are built once
+DONATION_LIST = TypeAdapter(List[Donation])
+MEMBERSHIP_LIST = TypeAdapter(List[Membership])
+VOLUNTEER_LIST = TypeAdapter(List[Volunteer])
+CONTACT_LIST = TypeAdapter(List[Contact])
+
+# Fast-path encoders for the list endpoints
+DONATION_ROWS = RowEncoder(Donation)
+MEMBERSHIP_ROWS = RowEncoder(Membership)
+VOLUNTEER_ROWS = RowEncoder(Volunteer)
+CONTACT_ROWS = RowEncoder(Contact)
+
+# Sequence numbers are reserved from storage in blocks and handed out from memory
+ID_BLOCK_SIZE = int(os.environ.get('ID_BLOCK_SIZE', '1000'))
+membership_numbers = SequenceAllocator("membershipNumber", block_size=ID_BLOCK_SIZE)
+volunteer_ids = SequenceAllocator("volunteerId", block_size=ID_BLOCK_SIZE)
+
 # Helper function to generate membership number
-def generate_membership_number() -> str:
-    import time
-    return f"SHP{int(time.time())}"
+async def generate_membership_number() -> str:
+    return f"SHP{await membership_numbers.next(storage):08d}"
 
 # Helper function to generate volunteer ID
-def generate_volunteer_id() -> str:
-    import time
-    return f"VOL{int(time.time())}"
+async def generate_volunteer_id() -> str:
+    return f"VOL{await volunteer_ids.next(storage):08d}"
+
+# Store a new submission, batched when the write-behind writer is running
+async def insert_submission(collection: str, document: dict) -> None:
+    if batch_writer is not None:
+        await batch_writer.insert(collection, document)
+    else:
+        await storage.insert(collection, document)
+
+# Bookkeeping once a submission is stored: materialized counters (Mongo-only;
+# other backends count live in /api/stats), this worker's caches and the live feed
+async def note_submission(collection: str, created_at: datetime, count: int = 1) -> None:
+    text_search.invalidate(collection)
+    if db is not None:
+        await record_submission(db, collection, created_at, count)
+    change_versions.invalidate()
+    live_feed.publish_local(collection, created_at, count)
+
+# Queue the acknowledgement email for a stored submission
+async def acknowledge(kind: str, submission: BaseModel) -> None:
+    if ACK_EMAILS and db is not None:
+        await job_queue.enqueue(db, kind, submission.model_dump(mode="json"))
+
+# Per-day/per-hour donation rollups, Mongo-only like the counters
+async def roll_up_donation(donation: Donation) -> None:
+    if db is not None:
+        await record_donation(db, donation.created_at, donation.amount_paise)
+
+# Bulk importers for offline field-office signups
+membership_import = BulkImporter(
+    "memberships", MembershipCreate, Membership, "membershipNumber", "SHP{:08d}",
+    membership_numbers, duplicate_guard, note_submission,
+)
+volunteer_import = BulkImporter(
+    "volunteers", VolunteerCreate, Volunteer, "volunteerId", "VOL{:08d}",
+    volunteer_ids, duplicate_guard, note_submission,
+)
+
+def ingest_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry shortly",
+        headers={"Retry-After": INGEST_RETRY_AFTER},
+    )
+
+# 409 for a repeated email/phone; any other unique clash (a membership number or volunteer ID
+# handed out twice) is a server fault, not the submitter's
+def duplicate_error(error: Exception, failure: str) -> HTTPException:
+    detail = duplicate_detail(error)
+    if detail is None:
+        logger.error("Unexpected unique index clash: %s", error)
+        return HTTPException(status_code=500, detail=failure)
+    return HTTPException(status_code=409, detail=detail)
+
+# List page with an ETag: 304 on a matching If-None-Match, first pages from the hot-page cache.
+# Pages are validated like the response_model would, unless LIST_FAST_PATH is on.
+# Versions come from the primary, so a page read from a lagging secondary could miss a write its
+# version already counts: cached first pages are read from the primary, and other pages read from
+# a secondary go out without an ETag.
+async def conditional_list(request: Request, collection: str, encoder: RowEncoder, adapter: TypeAdapter,
+                           skip: int, limit: int, cursor: Optional[str], include_archived: bool = False) -> Response:
+    hot = not cursor and not skip and 0 < limit <= HOT_PAGE_LIMIT
+    tagged = hot or storage.consistent_reads
+    etag = None
+    if tagged:
+        versions = await change_versions.get()
+        etag = make_etag(
+            collection, versions.get(collection, 0), freshness_epoch(CONDITIONAL_MAX_AGE),
+            skip, limit, cursor, include_archived,
+        )
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+    body = hot_pages.get(etag) if hot else None
+    if body is None:
+        docs, next_cursor = await storage.list_page(
+            collection, skip=skip, limit=limit, cursor=cursor,
+            projection=encoder.projection if LIST_FAST_PATH else None, include_archived=include_archived,
+            primary=hot,
+        )
+        if LIST_FAST_PATH:
+            encoded = encoder.encode(docs)
+        else:
+            encoded = adapter.dump_json(adapter.validate_python(docs))
+        body = EncodedBody(encoded, next_cursor)
+        if hot:
+            hot_pages.set(etag, body)
+    return body.response(request, etag)
+
+# Reject malformed cursors with a 400 before the handler's catch-all turns them into a 500
+def check_cursor(cursor: Optional[str]) -> None:
+    try:
+        cursor_filter(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # API Routes
 @api_router.get("/")
@@ -129,174 +505,506 @@ async def root():
     return {"message": "Swadeshi Hind Party API", "status": "active"}
 
 @api_router.post("/donations", response_model=Donation)
-async def create_donation(donation_data: DonationCreate):
+async def create_donation(
+    donation_data: DonationCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """Create a new donation submission"""
+    claim = await idempotency_store.claim(db, "donations", idempotency_key, donation_data)
+    if claim.replay is not None:
+        return claim.replay
     try:
         # Create donation object
-        donation = Donation(
-            name=donation_data.name,
-            email=donation_data.email,
-            phone=donation_data.phone,
-            amount=donation_data.amount,
-            message=donation_data.message
-        )
+        donation = Donation.build(donation_data, amount_paise=to_paise(donation_data.amount))
         
         # Store in database
-        donation_dict = donation.dict()
-        await db.donations.insert_one(donation_dict)
+        donation_dict = donation.document()
+        await insert_submission("donations", donation_dict)
+        await note_submission("donations", donation.created_at)
+        await roll_up_donation(donation)
+        await acknowledge("donation_receipt", donation)
+        await claim.complete(donation)
         
-        logger.info(f"New donation created: {donation.id} for amount: ₹{donation.amount}")
+        logger.info("New donation created: %s for amount: ₹%s", donation.id, donation.amount)
         return donation
         
+    except IngestQueueFull:
+        raise ingest_busy()
     except Exception as e:
-        logger.error(f"Error creating donation: {str(e)}")
+        logger.error("Error creating donation: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create donation")
+    finally:
+        await claim.release()
 
 @api_router.get("/donations", response_model=List[Donation])
-async def get_donations(skip: int = 0, limit: int = 100):
+async def get_donations(
+    request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    include_archived: bool = False,
+):
     """Get list of donations"""
+    check_cursor(cursor)
     try:
-        donations = await db.donations.find().skip(skip).limit(limit).sort("created_at", -1).to_list(length=None)
-        return [Donation(**donation) for donation in donations]
+        if CONDITIONAL_GET:
+            return await conditional_list(request, "donations", DONATION_ROWS, DONATION_LIST, skip, limit, cursor, include_archived)
+        if LIST_FAST_PATH:
+            return await fast_list(storage, "donations", DONATION_ROWS, skip=skip, limit=limit, cursor=cursor,
+                                   include_archived=include_archived)
+        donations, next_cursor = await storage.list_page(
+            "donations", skip=skip, limit=limit, cursor=cursor, include_archived=include_archived
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return DONATION_LIST.validate_python(donations)
     except Exception as e:
-        logger.error(f"Error fetching donations: {str(e)}")
+        logger.error("Error fetching donations: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch donations")
 
+@api_router.get("/donations/export")
+async def export_donations(
+    fmt: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    created_from: Optional[datetime] = Query(None, alias='from'),
+    created_to: Optional[datetime] = Query(None, alias='to'),
+    include_archived: bool = False,
+):
+    """Stream donations as NDJSON or CSV"""
+    return export_response(
+        storage, "donations", list(Donation.model_fields), fmt, created_from, created_to, EXPORT_BATCH_SIZE,
+        include_archived,
+    )
+
 @api_router.post("/memberships", response_model=Membership)
-async def create_membership(membership_data: MembershipCreate):
+async def create_membership(
+    membership_data: MembershipCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """Create a new membership application"""
+    claim = await idempotency_store.claim(db, "memberships", idempotency_key, membership_data)
+    if claim.replay is not None:
+        return claim.replay
     try:
+        identity = {"email": membership_data.email, "phone": membership_data.phone}
+        await duplicate_guard.check(storage, "memberships", identity)
+
         # Create membership object
-        membership = Membership(
-            name=membership_data.name,
-            email=membership_data.email,
-            phone=membership_data.phone,
-            membershipType=membership_data.membershipType,
-            address=membership_data.address,
-            membershipNumber=generate_membership_number()
-        )
+        membership = Membership.build(membership_data, membershipNumber=await generate_membership_number())
         
         # Store in database
-        membership_dict = membership.dict()
-        await db.memberships.insert_one(membership_dict)
+        membership_dict = membership.document()
+        await insert_submission("memberships", membership_dict)
+        duplicate_guard.add("memberships", identity)
+        await note_submission("memberships", membership.created_at)
+        await acknowledge("membership_welcome", membership)
+        await claim.complete(membership)
         
-        logger.info(f"New membership created: {membership.id} - {membership.membershipType}")
+        logger.info("New membership created: %s - %s", membership.id, membership.membershipType)
         return membership
         
+    except (DuplicateSubmission, DuplicateKeyError) as e:
+        raise duplicate_error(e, "Failed to create membership")
+    except IngestQueueFull:
+        raise ingest_busy()
     except Exception as e:
-        logger.error(f"Error creating membership: {str(e)}")
+        logger.error("Error creating membership: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create membership")
+    finally:
+        await claim.release()
 
 @api_router.get("/memberships", response_model=List[Membership])
-async def get_memberships(skip: int = 0, limit: int = 100):
+async def get_memberships(
+    request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+):
     """Get list of memberships"""
+    check_cursor(cursor)
     try:
-        memberships = await db.memberships.find().skip(skip).limit(limit).sort("created_at", -1).to_list(length=None)
-        return [Membership(**membership) for membership in memberships]
+        if CONDITIONAL_GET:
+            return await conditional_list(request, "memberships", MEMBERSHIP_ROWS, MEMBERSHIP_LIST, skip, limit, cursor)
+        if LIST_FAST_PATH:
+            return await fast_list(storage, "memberships", MEMBERSHIP_ROWS, skip=skip, limit=limit, cursor=cursor)
+        memberships, next_cursor = await storage.list_page("memberships", skip=skip, limit=limit, cursor=cursor)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return MEMBERSHIP_LIST.validate_python(memberships)
     except Exception as e:
-        logger.error(f"Error fetching memberships: {str(e)}")
+        logger.error("Error fetching memberships: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch memberships")
 
+@api_router.get("/memberships/export")
+async def export_memberships(
+    fmt: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    created_from: Optional[datetime] = Query(None, alias='from'),
+    created_to: Optional[datetime] = Query(None, alias='to'),
+):
+    """Stream memberships as NDJSON or CSV"""
+    return export_response(
+        storage, "memberships", list(Membership.model_fields), fmt, created_from, created_to, EXPORT_BATCH_SIZE
+    )
+
+@api_router.post("/memberships/import")
+async def import_memberships(request: Request, fmt: Literal['ndjson', 'csv'] = Query('ndjson', alias='format')):
+    """Bulk-import membership applications from an NDJSON or CSV upload"""
+    try:
+        return await membership_import.run(
+            storage, request.stream(), fmt, chunk_size=IMPORT_CHUNK_SIZE, max_errors=IMPORT_MAX_ERRORS
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error importing memberships: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to import memberships")
+
 @api_router.post("/volunteers", response_model=Volunteer)
-async def create_volunteer(volunteer_data: VolunteerCreate):
+async def create_volunteer(
+    volunteer_data: VolunteerCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """Create a new volunteer application"""
+    claim = await idempotency_store.claim(db, "volunteers", idempotency_key, volunteer_data)
+    if claim.replay is not None:
+        return claim.replay
     try:
+        identity = {"email": volunteer_data.email, "phone": volunteer_data.phone}
+        await duplicate_guard.check(storage, "volunteers", identity)
+
         # Create volunteer object
-        volunteer = Volunteer(
-            name=volunteer_data.name,
-            email=volunteer_data.email,
-            phone=volunteer_data.phone,
-            skills=volunteer_data.skills,
-            availability=volunteer_data.availability,
-            volunteerId=generate_volunteer_id()
-        )
+        volunteer = Volunteer.build(volunteer_data, volunteerId=await generate_volunteer_id())
         
         # Store in database
-        volunteer_dict = volunteer.dict()
-        await db.volunteers.insert_one(volunteer_dict)
+        volunteer_dict = volunteer.document()
+        await insert_submission("volunteers", volunteer_dict)
+        duplicate_guard.add("volunteers", identity)
+        await note_submission("volunteers", volunteer.created_at)
+        await acknowledge("volunteer_thanks", volunteer)
+        await claim.complete(volunteer)
         
-        logger.info(f"New volunteer registered: {volunteer.id}")
+        logger.info("New volunteer registered: %s", volunteer.id)
         return volunteer
         
+    except (DuplicateSubmission, DuplicateKeyError) as e:
+        raise duplicate_error(e, "Failed to create volunteer registration")
+    except IngestQueueFull:
+        raise ingest_busy()
     except Exception as e:
-        logger.error(f"Error creating volunteer: {str(e)}")
+        logger.error("Error creating volunteer: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create volunteer registration")
+    finally:
+        await claim.release()
 
 @api_router.get("/volunteers", response_model=List[Volunteer])
-async def get_volunteers(skip: int = 0, limit: int = 100):
+async def get_volunteers(
+    request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+):
     """Get list of volunteers"""
+    check_cursor(cursor)
     try:
-        volunteers = await db.volunteers.find().skip(skip).limit(limit).sort("created_at", -1).to_list(length=None)
-        return [Volunteer(**volunteer) for volunteer in volunteers]
+        if CONDITIONAL_GET:
+            return await conditional_list(request, "volunteers", VOLUNTEER_ROWS, VOLUNTEER_LIST, skip, limit, cursor)
+        if LIST_FAST_PATH:
+            return await fast_list(storage, "volunteers", VOLUNTEER_ROWS, skip=skip, limit=limit, cursor=cursor)
+        volunteers, next_cursor = await storage.list_page("volunteers", skip=skip, limit=limit, cursor=cursor)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return VOLUNTEER_LIST.validate_python(volunteers)
     except Exception as e:
-        logger.error(f"Error fetching volunteers: {str(e)}")
+        logger.error("Error fetching volunteers: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch volunteers")
 
+@api_router.get("/volunteers/export")
+async def export_volunteers(
+    fmt: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    created_from: Optional[datetime] = Query(None, alias='from'),
+    created_to: Optional[datetime] = Query(None, alias='to'),
+):
+    """Stream volunteers as NDJSON or CSV"""
+    return export_response(
+        storage, "volunteers", list(Volunteer.model_fields), fmt, created_from, created_to, EXPORT_BATCH_SIZE
+    )
+
+@api_router.post("/volunteers/import")
+async def import_volunteers(request: Request, fmt: Literal['ndjson', 'csv'] = Query('ndjson', alias='format')):
+    """Bulk-import volunteer registrations from an NDJSON or CSV upload"""
+    try:
+        return await volunteer_import.run(
+            storage, request.stream(), fmt, chunk_size=IMPORT_CHUNK_SIZE, max_errors=IMPORT_MAX_ERRORS
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error importing volunteers: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to import volunteers")
+
 @api_router.post("/contact", response_model=Contact)
-async def create_contact(contact_data: ContactCreate):
+async def create_contact(
+    contact_data: ContactCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """Create a new contact message"""
+    claim = await idempotency_store.claim(db, "contacts", idempotency_key, contact_data)
+    if claim.replay is not None:
+        return claim.replay
     try:
         # Create contact object
-        contact = Contact(
-            name=contact_data.name,
-            email=contact_data.email,
-            subject=contact_data.subject,
-            message=contact_data.message
-        )
+        contact = Contact.build(contact_data)
         
         # Store in database
-        contact_dict = contact.dict()
-        await db.contacts.insert_one(contact_dict)
+        contact_dict = contact.document()
+        await insert_submission("contacts", contact_dict)
+        await note_submission("contacts", contact.created_at)
+        await claim.complete(contact)
         
-        logger.info(f"New contact message: {contact.id} - {contact.subject}")
+        logger.info("New contact message: %s - %s", contact.id, contact.subject)
         return contact
         
+    except IngestQueueFull:
+        raise ingest_busy()
     except Exception as e:
-        logger.error(f"Error creating contact: {str(e)}")
+        logger.error("Error creating contact: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create contact message")
+    finally:
+        await claim.release()
 
 @api_router.get("/contact", response_model=List[Contact])
-async def get_contacts(skip: int = 0, limit: int = 100):
+async def get_contacts(
+    request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    include_archived: bool = False,
+):
     """Get list of contact messages"""
+    check_cursor(cursor)
     try:
-        contacts = await db.contacts.find().skip(skip).limit(limit).sort("created_at", -1).to_list(length=None)
-        return [Contact(**contact) for contact in contacts]
+        if CONDITIONAL_GET:
+            return await conditional_list(request, "contacts", CONTACT_ROWS, CONTACT_LIST, skip, limit, cursor, include_archived)
+        if LIST_FAST_PATH:
+            return await fast_list(storage, "contacts", CONTACT_ROWS, skip=skip, limit=limit, cursor=cursor,
+                                   include_archived=include_archived)
+        contacts, next_cursor = await storage.list_page(
+            "contacts", skip=skip, limit=limit, cursor=cursor, include_archived=include_archived
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return CONTACT_LIST.validate_python(contacts)
     except Exception as e:
-        logger.error(f"Error fetching contacts: {str(e)}")
+        logger.error("Error fetching contacts: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch contacts")
 
+@api_router.get("/contact/export")
+async def export_contacts(
+    fmt: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    created_from: Optional[datetime] = Query(None, alias='from'),
+    created_to: Optional[datetime] = Query(None, alias='to'),
+    include_archived: bool = False,
+):
+    """Stream contact messages as NDJSON or CSV"""
+    return export_response(
+        storage, "contacts", list(Contact.model_fields), fmt, created_from, created_to, EXPORT_BATCH_SIZE,
+        include_archived,
+    )
+
 @api_router.get("/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Get platform statistics"""
     try:
-        stats = {
-            "total_donations": await db.donations.count_documents({}),
-            "total_members": await db.memberships.count_documents({}),
-            "total_volunteers": await db.volunteers.count_documents({}),
-            "total_contacts": await db.contacts.count_documents({}),
-            "recent_activity": await db.donations.count_documents({
-                "created_at": {"$gte": datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)}
-            })
-        }
-        return stats
+        stats = await stats_cache.get()
+        if not CONDITIONAL_GET:
+            return stats
+        etag = make_etag(sorted(stats.items()))
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        return JSONResponse(stats, headers={"ETag": etag})
     except Exception as e:
-        logger.error(f"Error fetching stats: {str(e)}")
+        logger.error("Error fetching stats: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch statistics")
 
+@api_router.get("/stats/donations/timeseries")
+async def get_donation_timeseries(
+    granularity: Literal['day', 'hour'] = 'day',
+    created_from: Optional[datetime] = Query(None, alias='from'),
+    created_to: Optional[datetime] = Query(None, alias='to'),
+):
+    """Donation count, sum, min and max (in paise) per day or hour, read from the rollups"""
+    if db is None:
+        raise HTTPException(status_code=404, detail="Donation time series are only available on the mongo backend")
+    try:
+        starts = series_bounds(granularity, created_from, created_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        buckets = await read_timeseries(dashboard_db(), granularity, starts)
+        return {"granularity": granularity, "buckets": buckets}
+    except Exception as e:
+        logger.error("Error fetching donation time series: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to fetch donation time series")
+
+@api_router.get("/search")
+async def search_submissions(
+    q: str = Query(..., min_length=2, max_length=200),
+    collection: Literal['volunteers', 'contacts'] = Query(..., alias='type'),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """Full-text search over volunteer skills/availability or contact subjects/messages, most relevant first"""
+    if db is None:
+        raise HTTPException(status_code=404, detail="Search is only available on the mongo backend")
+    if cursor:
+        try:
+            decode_search_cursor(cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        encoder = VOLUNTEER_ROWS if collection == "volunteers" else CONTACT_ROWS
+        body, next_cursor = await text_search.page(db, collection, q, limit, cursor, encoder)
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return Response(body, media_type="application/json", headers=headers)
+    except Exception as e:
+        logger.error("Error searching %s: %s", collection, e)
+        raise HTTPException(status_code=500, detail="Failed to search")
+
+@api_router.get("/live")
+async def live_submissions(types: Optional[str] = Query(None, description="Comma-separated collections; all by default")):
+    """Server-Sent Events feed announcing new donations, memberships, volunteers and contacts"""
+    collections = [t.strip() for t in types.split(",")] if types else list(LIVE_COLLECTIONS)
+    unknown = sorted(set(collections) - set(LIVE_COLLECTIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}")
+    return StreamingResponse(
+        live_feed.stream(collections),
+        media_type="text/event-stream",
+        # Stop nginx-style proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # Health check endpoint
 @api_router.get("/health")
 async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        await client.admin.command('ping')
+        await storage.ping()
         return {"status": "healthy", "database": "connected", "timestamp": datetime.utcnow()}
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
+# Query plan inspection endpoint
+@admin_router.get("/query-plans")
+async def get_query_plans():
+    """Winning explain() plan for each list and stats query"""
+    if db is None:
+        raise HTTPException(status_code=404, detail="Query plans are only available on the mongo backend")
+    try:
+        return await explain_queries(db)
+    except Exception as e:
+        logger.error("Error explaining queries: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to explain queries")
+
+@admin_router.get("/dedup")
+async def get_dedup_metrics():
+    """Share of duplicate checks answered by the Bloom filters on this worker"""
+    return duplicate_guard.metrics()
+
+@admin_router.get("/search")
+async def get_search_metrics():
+    """Search cache hit rate and size for this worker"""
+    return text_search.metrics()
+
+@admin_router.get("/hot-pages")
+async def get_hot_page_metrics():
+    """Hot first-page cache size and hit rate for this worker"""
+    return hot_pages.metrics()
+
+@admin_router.get("/live")
+async def get_live_metrics():
+    """Live feed source, connected clients and dropped slow clients for this worker"""
+    return live_feed.metrics()
+
+@admin_router.get("/jobs")
+async def get_job_metrics():
+    """Job queue depth, dead letters and this worker's job outcomes"""
+    if db is None:
+        raise HTTPException(status_code=404, detail="The job queue is only available on the mongo backend")
+    try:
+        queued, dead = await asyncio.gather(db.jobs.count_documents({}), db.jobs_dead.count_documents({}))
+        return {"queued": queued, "dead_letters": dead, "worker": job_queue.metrics()}
+    except Exception as e:
+        logger.error("Error fetching job metrics: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to fetch job metrics")
+
+@admin_router.get("/archive")
+async def get_archive_metrics():
+    """Hot and archived document counts per collection, and this worker's archive passes"""
+    if db is None:
+        raise HTTPException(status_code=404, detail="Archiving is only available on the mongo backend")
+    try:
+        counts = {}
+        for name in ARCHIVE_FIELDS:
+            hot, archived = await asyncio.gather(
+                db[name].estimated_document_count(), db[archive_name(name)].estimated_document_count()
+            )
+            counts[name] = {"hot": hot, "archived": archived}
+        return {"collections": counts, "worker": archiver.metrics()}
+    except Exception as e:
+        logger.error("Error fetching archive metrics: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to fetch archive metrics")
+
+@admin_router.get("/admission")
+async def get_admission_metrics():
+    """Rate limiter and in-flight write cap counters for this worker"""
+    return admission.metrics()
+
+@admin_router.get("/logging")
+async def get_logging_metrics():
+    """Log queue depth, dropped records and sampled-out records for this worker"""
+    return log_pipeline.metrics()
+
+@admin_router.get("/profiles")
+async def list_profiles():
+    """Profiles of slow requests kept by the sampling profiler, newest first"""
+    if not PROFILING:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    profiles = await asyncio.to_thread(profiler.store.list)
+    return {"profiles": profiles, "worker": profiler.metrics()}
+
+@admin_router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """One profile in collapsed stack format, for flamegraph.pl or speedscope"""
+    if not PROFILING:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    collapsed = await asyncio.to_thread(profiler.store.collapsed, profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        collapsed, headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed"'}
+    )
+
+@admin_router.get("/idempotency")
+async def get_idempotency_metrics():
+    """Idempotency-Key replay hit rate for this worker"""
+    return idempotency_store.metrics()
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+metrics.gauge("idempotency_hit_rate", "Share of keyed POSTs answered by a replay",
+              lambda: idempotency_store.metrics()["hit_rate"])
+metrics.gauge("dedup_bloom_skip_ratio", "Share of duplicate checks answered without Mongo",
+              lambda: duplicate_guard.metrics()["skipped_ratio"])
+metrics.gauge("inflight_writes", "Submission POSTs past admission control and not yet answered",
+              lambda: admission.inflight)
+metrics.gauge("log_queue_depth", "Log records waiting for the writer thread",
+              lambda: log_pipeline.metrics()["queued"])
+metrics.gauge("log_records_dropped", "Log records dropped because the log queue was full",
+              lambda: log_pipeline.metrics()["dropped"])
+metrics.gauge("ingest_queue_depth", "Submissions waiting in the batch writer",
+              lambda: batch_writer.depth() if batch_writer is not None else 0)
+
 # Include the router in the main app
 app.include_router(api_router)
+if ADMIN_ENDPOINTS:
+    app.include_router(admin_router)
+
+# Inside CORS so browsers can read the 429/503 responses
+if admission.limiter is not None or admission.max_inflight:
+    app.add_middleware(AdmissionMiddleware, control=admission)
 
 app.add_middleware(
     CORSMiddleware,
@@ -304,11 +1012,86 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REQUEST_ID_HEADER],
 )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Live streams are slow by design and profiles of the profile endpoints are noise
+if PROFILING:
+    app.add_middleware(ProfilerMiddleware, profiler=profiler, exclude=("/api/live", "/api/admin/profiles"))
+
+# Outermost, so request IDs and latency cover every other middleware and rejected requests too
+app.add_middleware(RequestLogMiddleware, logger=logging.getLogger("access"), access_log=ACCESS_LOG)
+
+def ensure_db_indexes():
+    # Build in the background so the worker starts serving immediately
+    app.state.index_task = asyncio.create_task(storage.ensure_schema())
+    if db is not None:
+        app.state.idempotency_index_task = asyncio.create_task(idempotency_store.ensure_indexes(db))
+        app.state.jobs_index_task = asyncio.create_task(job_queue.ensure_indexes(db))
+        app.state.archive_index_task = asyncio.create_task(archiver.ensure_indexes(db))
+
+def warm_duplicate_guard():
+    async def warm():
+        # The covered scans need the email/phone indexes (or tables) in place
+        await app.state.index_task
+        await duplicate_guard.warm(storage)
+    app.state.dedup_task = asyncio.create_task(warm())
+
+def start_stats_counters():
+    if db is None:
+        return
+    app.state.counters_task = asyncio.create_task(init_counters(db))
+    app.state.amounts_task = asyncio.create_task(migrate_donation_amounts(db))
+    if STATS_RECONCILE_INTERVAL > 0:
+        app.state.reconcile_task = asyncio.create_task(
+            reconcile_forever(db, STATS_RECONCILE_INTERVAL)
+        )
+
+def start_batch_writer():
+    global batch_writer
+    if INGEST_MODE == "batched":
+        batch_writer = BatchWriter(
+            storage,
+            max_queue=INGEST_QUEUE_SIZE,
+            max_batch=INGEST_BATCH_SIZE,
+            max_delay=INGEST_MAX_DELAY_MS / 1000,
+        )
+        batch_writer.start()
+
+def start_rate_limit_sync():
+    if RATE_LIMIT_SHARED and admission.limiter is not None and db is not None:
+        app.state.rate_limit_task = asyncio.create_task(
+            admission.limiter.sync_forever(db, RATE_LIMIT_SYNC_INTERVAL)
+        )
+
+def start_job_queue():
+    if ACK_EMAILS and db is not None:
+        job_queue.start(db)
+
+def start_archiver():
+    if ARCHIVE_AFTER_DAYS > 0 and db is not None:
+        app.state.archive_task = asyncio.create_task(archiver.run_forever(db))
+
+async def drain_background_tasks():
+    await live_feed.close()
+    # Unfinished jobs are claimed again by another worker once their lease expires
+    await job_queue.close()
+    # Drain queued submissions before the client goes away
+    if batch_writer is not None:
+        await batch_writer.close()
+    # An archive batch cut short is finished by the next pass
+    for name in ("reconcile_task", "rate_limit_task", "archive_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+
+async def close_storage():
+    await storage.close()
+    if client is not None:
+        client.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,122 @@
+"""Materialized submission counters backing /api/stats.
+
+Totals live in a single ``counters`` document and per-day activity in
+``daily_activity`` buckets keyed by UTC date. Every create handler bumps both
+with ``$inc``, so reading the stats is two point lookups no matter how large
+the collections grow. ``reconcile_counters`` rebuilds them from real counts to
+correct any drift (failed increments, manual deletes, pre-existing data).
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+TOTALS_ID = "totals"
+
+# Stats response key -> collection it counts
+TOTAL_FIELDS: Dict[str, str] = {
+    "total_donations": "donations",
+    "total_members": "memberships",
+    "total_volunteers": "volunteers",
+    "total_contacts": "contacts",
+}
+
+
+def day_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d")
+
+
+def day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def record_submission(db, collection: str, created_at: datetime, count: int = 1) -> None:
+    """Count ``count`` new documents in ``collection``.
+
+    The document is already stored by the time this runs, so a failure here is
+    logged rather than failing the request; reconciliation repairs the drift.
+    """
+    try:
+        await asyncio.gather(
+            # versions only ever grows (reconciliation leaves it alone); it backs list ETags
+            db.counters.update_one(
+                {"_id": TOTALS_ID}, {"$inc": {collection: count, f"versions.{collection}": count}}, upsert=True
+            ),
+            db.daily_activity.update_one(
+                {"_id": day_key(created_at)}, {"$inc": {collection: count}}, upsert=True
+            ),
+        )
+    except PyMongoError as e:
+        logger.error("Failed to update counters for %s: %s", collection, e)
+
+
+async def read_stats(db) -> Dict[str, int]:
+    totals, today = await asyncio.gather(
+        db.counters.find_one({"_id": TOTALS_ID}),
+        db.daily_activity.find_one({"_id": day_key(datetime.utcnow())}),
+    )
+    totals = totals or {}
+    stats = {key: totals.get(name, 0) for key, name in TOTAL_FIELDS.items()}
+    stats["recent_activity"] = (today or {}).get("donations", 0)
+    return stats
+
+
+async def live_stats(storage) -> Dict[str, int]:
+    """Stats straight from the storage backend, for engines without counters"""
+    names = list(TOTAL_FIELDS.values())
+    totals = await asyncio.gather(*(storage.count(name) for name in names))
+    stats = dict(zip(TOTAL_FIELDS, totals))
+    stats["recent_activity"] = await storage.count_range("donations", day_start(datetime.utcnow()))
+    return stats
+
+
+async def reconcile_counters(db) -> None:
+    """Overwrite the counters with real counts.
+
+    Increments landing between the count and the write are lost until the next
+    run, which is acceptable for dashboard figures.
+    """
+    now = datetime.utcnow()
+    today = {"created_at": {"$gte": day_start(now)}}
+    names = list(TOTAL_FIELDS.values())
+    # Archived documents (archive.py) still count towards the totals
+    totals = await asyncio.gather(*(
+        asyncio.gather(db[name].count_documents({}), db[f"{name}_archive"].count_documents({}))
+        for name in names
+    ))
+    totals = [hot + archived for hot, archived in totals]
+    daily = await asyncio.gather(*(db[name].count_documents(today) for name in names))
+    await asyncio.gather(
+        db.counters.update_one(
+            {"_id": TOTALS_ID}, {"$set": {**dict(zip(names, totals)), "seeded": True}}, upsert=True
+        ),
+        db.daily_activity.update_one({"_id": day_key(now)}, {"$set": dict(zip(names, daily))}, upsert=True),
+    )
+    logger.info("Counters reconciled: %s", dict(zip(names, totals)))
+
+
+async def init_counters(db) -> None:
+    """Seed the counters from real counts the first time a deployment starts.
+
+    Requests are already being served while this runs, and their ``$inc``
+    upserts can create the totals document first, so it is the ``seeded``
+    marker set by a reconciliation that shows the counts are real.
+    """
+    try:
+        if await db.counters.find_one({"_id": TOTALS_ID, "seeded": True}) is None:
+            await reconcile_counters(db)
+    except PyMongoError as e:
+        logger.error("Failed to initialise counters: %s", e)
+
+
+async def reconcile_forever(db, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_counters(db)
+        except PyMongoError as e:
+            logger.error("Counter reconciliation failed: %s", e)
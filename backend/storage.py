@@ -0,0 +1,474 @@
+"""Pluggable storage backends for the submission collections.
+
+``Storage`` is the narrow interface the request path needs: insert, paginated
+list, count and created_at range count, plus the lookups used by duplicate
+detection, ID sequences, streaming export and health checks.
+``MongoStorage`` wraps the Motor database; ``SQLiteStorage`` is an embedded
+engine for small single-node deployments, tests and benchmarks that should run
+without a MongoDB server. Only Mongo has an archive tier (see archive.py); asked
+to include it, list pages and exports on SQLite read the one table.
+"""
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from archive import ARCHIVE_FIELDS, merged_page, merged_stream
+from indexes import ensure_indexes
+from pagination import SORT_ORDER, decode_cursor, encode_cursor, fetch_page
+from stats import TOTALS_ID
+
+Page = Tuple[List[Dict[str, Any]], Optional[str]]
+
+
+class Storage(ABC):
+    name: str
+    # Whether list_page reads see every write change_versions counts (False when reads go to secondaries)
+    consistent_reads: bool = True
+
+    @abstractmethod
+    async def insert(self, collection: str, document: Dict[str, Any]) -> None:
+        """Store one document; raises DuplicateKeyError on a unique clash"""
+
+    @abstractmethod
+    async def insert_many(self, collection: str, documents: List[Dict[str, Any]]) -> List[Optional[Exception]]:
+        """Store documents independently; returns one error (or None) per document"""
+
+    @abstractmethod
+    async def list_page(self, collection: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                        projection: Optional[Dict[str, Any]] = None, include_archived: bool = False,
+                        primary: bool = False) -> Page:
+        """Newest-first page plus the cursor for the next one (see pagination.fetch_page).
+
+        ``primary`` reads from the node change_versions reads from, even when reads are routed elsewhere.
+        """
+
+    @abstractmethod
+    async def count(self, collection: str) -> int:
+        ...
+
+    @abstractmethod
+    async def count_range(self, collection: str, start: Optional[datetime], end: Optional[datetime] = None) -> int:
+        """Documents with ``start <= created_at < end``"""
+
+    @abstractmethod
+    async def exists(self, collection: str, field: str, value: str) -> bool:
+        ...
+
+    @abstractmethod
+    def scan_field(self, collection: str, field: str) -> AsyncIterator[str]:
+        """Every stored value of an indexed field"""
+
+    @abstractmethod
+    def stream(self, collection: str, fields: List[str], start: Optional[datetime],
+               end: Optional[datetime], batch_size: int,
+               include_archived: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Documents in list order restricted to a created_at range, fetched in batches"""
+
+    @abstractmethod
+    async def reserve_block(self, sequence: str, size: int) -> int:
+        """Atomically advance ``sequence`` by ``size`` and return its new value"""
+
+    @abstractmethod
+    async def ping(self) -> None:
+        ...
+
+    @abstractmethod
+    async def ensure_schema(self) -> None:
+        ...
+
+    @abstractmethod
+    async def change_versions(self) -> Dict[str, int]:
+        """Per-collection numbers that grow whenever a document is added or archived"""
+
+    async def close(self) -> None:
+        pass
+
+
+def created_at_range(start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lt"] = end
+    return {"created_at": bounds} if bounds else {}
+
+
+class MongoStorage(Storage):
+    name = "mongo"
+
+    def __init__(self, db, read_db=None):
+        self.db = db
+        # Handle for list/export/count reads, possibly routed to secondaries
+        self.read_db = read_db if read_db is not None else db
+        self.consistent_reads = self.read_db is db
+
+    async def insert(self, collection, document):
+        await self.db[collection].insert_one(document)
+
+    async def insert_many(self, collection, documents):
+        errors: List[Optional[Exception]] = [None] * len(documents)
+        try:
+            await self.db[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported indexes was written
+            for error in e.details.get("writeErrors", []):
+                message = error.get("errmsg", "write failed")
+                if error.get("code") == 11000:
+                    # Keep what names the clashing key; "op" is the whole rejected document
+                    details = {k: error[k] for k in ("code", "errmsg", "keyPattern", "keyValue") if k in error}
+                    errors[error["index"]] = DuplicateKeyError(message, 11000, details)
+                else:
+                    errors[error["index"]] = RuntimeError(message)
+        return errors
+
+    async def list_page(self, collection, skip=0, limit=100, cursor=None, projection=None, include_archived=False,
+                        primary=False):
+        source = self.db if primary else self.read_db
+        if include_archived and collection in ARCHIVE_FIELDS:
+            return await merged_page(source, collection, skip=skip, limit=limit, cursor=cursor, projection=projection)
+        return await fetch_page(source[collection], skip=skip, limit=limit, cursor=cursor, projection=projection)
+
+    async def count(self, collection):
+        return await self.read_db[collection].count_documents({})
+
+    async def count_range(self, collection, start, end=None):
+        return await self.read_db[collection].count_documents(created_at_range(start, end))
+
+    async def exists(self, collection, field, value):
+        return await self.db[collection].find_one({field: value}, {"_id": 1}) is not None
+
+    async def scan_field(self, collection, field):
+        projection = {field: 1, "_id": 0}
+        try:
+            # Covered by the single-field index: no documents are fetched
+            cursor = self.db[collection].find({}, projection).hint([(field, 1)]).batch_size(10_000)
+            async for doc in cursor:
+                if doc.get(field):
+                    yield doc[field]
+        except OperationFailure:
+            # Index missing (e.g. blocked by legacy duplicates): fall back to a scan
+            async for doc in self.db[collection].find({}, projection).batch_size(10_000):
+                if doc.get(field):
+                    yield doc[field]
+
+    async def stream(self, collection, fields, start, end, batch_size, include_archived=False):
+        if include_archived and collection in ARCHIVE_FIELDS:
+            async for doc in merged_stream(self.read_db, collection, fields, start, end, batch_size):
+                yield doc
+            return
+        projection = {f: 1 for f in fields} | {"_id": 0}
+        cursor = self.read_db[collection].find(created_at_range(start, end), projection).sort(SORT_ORDER)
+        async for doc in cursor.batch_size(batch_size):
+            yield doc
+
+    async def reserve_block(self, sequence, size):
+        doc = await self.db.counters.find_one_and_update(
+            {"_id": f"seq_{sequence}"},
+            {"$inc": {"value": size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["value"]
+
+    async def ping(self):
+        await self.db.command("ping")
+
+    async def ensure_schema(self):
+        await ensure_indexes(self.db)
+
+    async def change_versions(self):
+        # Bumped by stats.record_submission alongside the totals. Read from the primary like the
+        # other counters: a lagging secondary would hand a client a stale ETag after its own write
+        doc = await self.db.counters.find_one({"_id": TOTALS_ID}, {"versions": 1})
+        return (doc or {}).get("versions", {})
+
+
+# Columns lifted out of the JSON document so they can be indexed; True = unique
+SQLITE_COLUMNS: Dict[str, Dict[str, bool]] = {
+    "donations": {"email": False, "phone": False},
+    "memberships": {"email": True, "phone": True, "membershipNumber": True},
+    "volunteers": {"email": True, "phone": True, "volunteerId": True},
+    "contacts": {"email": False},
+}
+
+_UNIQUE_FAILED = re.compile(r"UNIQUE constraint failed: \w+\.(\w+)")
+
+
+def _sortable(moment: datetime) -> str:
+    # Fixed-width so lexical order in SQLite matches chronological order
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _encode_doc(document: Dict[str, Any]) -> str:
+    return json.dumps(
+        {k: v for k, v in document.items() if k != "_id"},
+        default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v),
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def _decode_doc(raw: str) -> Dict[str, Any]:
+    doc = json.loads(raw)
+    doc["created_at"] = datetime.fromisoformat(doc["created_at"])
+    return doc
+
+
+def _duplicate(error: sqlite3.IntegrityError) -> Exception:
+    match = _UNIQUE_FAILED.search(str(error))
+    if not match:
+        return error
+    return DuplicateKeyError(str(error), 11000, {"keyPattern": {match.group(1): 1}})
+
+
+class SQLiteStorage(Storage):
+    """Embedded SQLite in WAL mode.
+
+    Each collection is a table holding the JSON document plus indexed columns
+    for ``id``, ``created_at`` and the lookup fields in SQLITE_COLUMNS. SQLite
+    calls block, so they run on thread pools: one writer thread (SQLite has a
+    single writer anyway) and a few readers, each with its own connection.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-write")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="sqlite-read")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each connection is only used by its own thread; close() runs elsewhere at shutdown
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._readers, fn, *args)
+
+    async def _write(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer, fn, *args)
+
+    @staticmethod
+    def _check(collection: str, field: Optional[str] = None) -> None:
+        # Table and column names are interpolated into SQL, so only allow known ones
+        if collection not in SQLITE_COLUMNS or (field is not None and field not in SQLITE_COLUMNS[collection]):
+            raise ValueError(f"Unknown collection/field {collection}.{field}")
+
+    def _row(self, collection: str, document: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        columns = list(SQLITE_COLUMNS[collection])
+        sql = (f"INSERT INTO {collection} (id, created_at, {', '.join(columns)}, doc) "
+               f"VALUES (?, ?, {', '.join('?' * len(columns))}, ?)")
+        values = [document["id"], _sortable(document["created_at"])]
+        values += [document.get(c) for c in columns]
+        values.append(_encode_doc(document))
+        return sql, values
+
+    def _ensure_schema_sync(self) -> None:
+        conn = self._connection()
+        for table, columns in SQLITE_COLUMNS.items():
+            extra = "".join(f", {c} TEXT" for c in columns)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                         f"(id TEXT PRIMARY KEY, created_at TEXT NOT NULL{extra}, doc TEXT NOT NULL)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at DESC, id DESC)")
+            for column, unique in columns.items():
+                kind = "UNIQUE INDEX" if unique else "INDEX"
+                conn.execute(f"CREATE {kind} IF NOT EXISTS {table}_{column} ON {table} ({column})")
+        conn.execute("CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    async def ensure_schema(self):
+        await self._write(self._ensure_schema_sync)
+
+    async def insert(self, collection, document):
+        self._check(collection)
+        sql, values = self._row(collection, document)
+
+        def run():
+            try:
+                self._connection().execute(sql, values)
+            except sqlite3.IntegrityError as e:
+                raise _duplicate(e) from e
+
+        await self._write(run)
+
+    async def insert_many(self, collection, documents):
+        self._check(collection)
+        rows = [self._row(collection, doc) for doc in documents]
+
+        def run():
+            conn = self._connection()
+            errors: List[Optional[Exception]] = []
+            # One transaction for the batch; each row in a savepoint so a clash only drops that row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, values in rows:
+                    conn.execute("SAVEPOINT row")
+                    try:
+                        conn.execute(sql, values)
+                        conn.execute("RELEASE row")
+                        errors.append(None)
+                    except sqlite3.IntegrityError as e:
+                        conn.execute("ROLLBACK TO row")
+                        conn.execute("RELEASE row")
+                        errors.append(_duplicate(e))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return errors
+
+        return await self._write(run)
+
+    async def list_page(self, collection, skip=0, limit=100, cursor=None, projection=None, include_archived=False,
+                        primary=False):
+        # Nothing is archived on SQLite, so the hot table is every document
+        self._check(collection)
+        where, params = "", []
+        if cursor:
+            created_at, doc_id = decode_cursor(cursor)
+            where, params = "WHERE (created_at, id) < (?, ?)", [_sortable(created_at), doc_id]
+        sql = f"SELECT doc FROM {collection} {where} ORDER BY created_at DESC, id DESC"
+        if limit > 0:
+            # One extra row tells whether another page exists
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit + 1, skip]
+        elif skip:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(skip)
+
+        def run():
+            return [_decode_doc(raw) for (raw,) in self._connection().execute(sql, params)]
+
+        docs = await self._read(run)
+        if limit <= 0 or len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1]["created_at"], docs[-1]["id"])
+
+    async def count(self, collection):
+        self._check(collection)
+        return await self._read(
+            lambda: self._connection().execute(f"SELECT COUNT(*) FROM {collection}").fetchone()[0]
+        )
+
+    async def count_range(self, collection, start, end=None):
+        self._check(collection)
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(_sortable(start))
+        if end is not None:
+            clauses.append("created_at < ?")
+            params.append(_sortable(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await self._read(
+            lambda: self._connection().execute(f"SELECT COUNT(*) FROM {collection} {where}", params).fetchone()[0]
+        )
+
+    async def exists(self, collection, field, value):
+        self._check(collection, field)
+        return await self._read(
+            lambda: self._connection().execute(
+                f"SELECT 1 FROM {collection} WHERE {field} = ? LIMIT 1", (value,)
+            ).fetchone() is not None
+        )
+
+    async def scan_field(self, collection, field):
+        self._check(collection, field)
+        last_rowid = 0
+        while True:
+            rows = await self._read(lambda: self._connection().execute(
+                f"SELECT rowid, {field} FROM {collection} WHERE rowid > ? ORDER BY rowid LIMIT 10000",
+                (last_rowid,),
+            ).fetchall())
+            if not rows:
+                return
+            for _, value in rows:
+                if value:
+                    yield value
+            last_rowid = rows[-1][0]
+
+    async def stream(self, collection, fields, start, end, batch_size, include_archived=False):
+        self._check(collection)
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(_sortable(start))
+        if end is not None:
+            clauses.append("created_at < ?")
+            params.append(_sortable(end))
+        after: Optional[Tuple[str, str]] = None
+        while True:
+            page_clauses, page_params = list(clauses), list(params)
+            if after:
+                page_clauses.append("(created_at, id) < (?, ?)")
+                page_params += list(after)
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+            sql = (f"SELECT created_at, id, doc FROM {collection} {where} "
+                   f"ORDER BY created_at DESC, id DESC LIMIT ?")
+            rows = await self._read(
+                lambda: self._connection().execute(sql, page_params + [batch_size]).fetchall()
+            )
+            for _, _, raw in rows:
+                yield _decode_doc(raw)
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][0], rows[-1][1])
+
+    async def reserve_block(self, sequence, size):
+        def run():
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front, so other processes on the file serialize here
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO sequences (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (sequence, size),
+                )
+                value = conn.execute("SELECT value FROM sequences WHERE name = ?", (sequence,)).fetchone()[0]
+                conn.execute("COMMIT")
+                return value
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return await self._write(run)
+
+    async def change_versions(self):
+        def run():
+            # Rowids only grow on insert, and MAX(rowid) is a single b-tree seek
+            conn = self._connection()
+            return {t: conn.execute(f"SELECT MAX(rowid) FROM {t}").fetchone()[0] or 0 for t in SQLITE_COLUMNS}
+
+        return await self._read(run)
+
+    async def ping(self):
+        await self._read(lambda: self._connection().execute("SELECT 1").fetchone())
+
+    async def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
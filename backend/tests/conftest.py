@@ -0,0 +1,113 @@
+"""Shared fixtures: the API served in-process over httpx's ASGI transport.
+
+``mongo_api`` runs on a fresh in-memory Mongo stand-in (mongomock-motor, from
+requirements-dev.txt) and ``sqlite_api`` on a fresh embedded SQLite file;
+``api`` runs a test once on each. Per-worker state held by server.py (caches,
+sequence blocks, Bloom filters, idempotency LRU) is replaced for every test so
+nothing leaks between them.
+"""
+import os
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("ACCESS_LOG", "false")
+
+import server  # noqa: E402
+from conditional import HotPageCache  # noqa: E402
+from dedup import DuplicateGuard  # noqa: E402
+from idempotency import IdempotencyStore  # noqa: E402
+from search import TextSearch  # noqa: E402
+from sequences import SequenceAllocator  # noqa: E402
+from storage import MongoStorage, SQLiteStorage  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def fresh_worker_state(monkeypatch, block_size: int = 1000) -> None:
+    monkeypatch.setattr(server, "idempotency_store", IdempotencyStore())
+    monkeypatch.setattr(server, "duplicate_guard", DuplicateGuard(("memberships", "volunteers"), capacity=10_000))
+    monkeypatch.setattr(server, "membership_numbers", SequenceAllocator("membershipNumber", block_size=block_size))
+    monkeypatch.setattr(server, "volunteer_ids", SequenceAllocator("volunteerId", block_size=block_size))
+    monkeypatch.setattr(server, "hot_pages", HotPageCache())
+    monkeypatch.setattr(server, "text_search", TextSearch())
+    server.stats_cache.invalidate()
+    server.change_versions.invalidate()
+
+
+@asynccontextmanager
+async def serve(monkeypatch, backend: str, tmp_path, app=None):
+    if backend == "mongo":
+        from mongomock_motor import AsyncMongoMockClient
+
+        client = AsyncMongoMockClient()
+        monkeypatch.setattr(server, "client", client)
+        monkeypatch.setattr(server, "db", client["test"])
+        monkeypatch.setattr(server, "read_db", None)
+        monkeypatch.setattr(server, "storage", MongoStorage(client["test"]))
+    else:
+        monkeypatch.setattr(server, "client", None)
+        monkeypatch.setattr(server, "db", None)
+        monkeypatch.setattr(server, "read_db", None)
+        monkeypatch.setattr(server, "storage", SQLiteStorage(str(tmp_path / "test.sqlite3")))
+    async with server.app.router.lifespan_context(server.app):
+        # Unique indexes and seeded counters in place before the first request
+        for name in ("index_task", "dedup_task", "counters_task", "amounts_task"):
+            task = getattr(server.app.state, name, None)
+            if task is not None:
+                await task
+        transport = httpx.ASGITransport(app=app or server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            yield http
+    await server.storage.close()
+
+
+@pytest.fixture
+async def mongo_api(monkeypatch, tmp_path):
+    fresh_worker_state(monkeypatch)
+    async with serve(monkeypatch, "mongo", tmp_path) as http:
+        yield http
+
+
+@pytest.fixture
+async def sqlite_api(monkeypatch, tmp_path):
+    fresh_worker_state(monkeypatch)
+    async with serve(monkeypatch, "sqlite", tmp_path) as http:
+        yield http
+
+
+@pytest.fixture(params=["mongo", "sqlite"])
+async def api(request, monkeypatch, tmp_path):
+    fresh_worker_state(monkeypatch)
+    async with serve(monkeypatch, request.param, tmp_path) as http:
+        yield http
+
+
+def donation(i: int = 0, **overrides):
+    return {
+        "name": f"Donor {i}", "email": f"donor{i}@example.com", "phone": f"98{i:08d}",
+        "amount": "500", "message": "Jai Hind", **overrides,
+    }
+
+
+def membership(i: int = 0, **overrides):
+    return {
+        "name": f"Member {i}", "email": f"member{i}@example.com", "phone": f"97{i:08d}",
+        "membershipType": "individual", "address": "12 MG Road, Pune", **overrides,
+    }
+
+
+def volunteer(i: int = 0, **overrides):
+    return {
+        "name": f"Volunteer {i}", "email": f"volunteer{i}@example.com", "phone": f"96{i:08d}",
+        "skills": "teaching and outreach", "availability": "weekends", **overrides,
+    }
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import logging
+import uuid
+from datetime import datetime
+
+import pytest
+
+import server
+from conftest import membership, volunteer
+from fields import PHONE_ERROR
+
+pytestmark = pytest.mark.anyio
+
+FIELDS = ["name", "email", "phone", "membershipType", "address"]
+
+
+def ndjson(*rows) -> str:
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+
+async def import_rows(api, body: str, fmt: str = "ndjson", collection: str = "memberships"):
+    response = await api.post(f"/api/{collection}/import", params={"format": fmt}, content=body.encode())
+    assert response.status_code == 200
+    return response.json()
+
+
+async def stored(api, collection: str = "memberships"):
+    return (await api.get(f"/api/{collection}", params={"limit": 500})).json()
+
+
+async def test_each_bad_row_is_reported_and_the_rest_are_stored(api):
+    report = await import_rows(api, ndjson(
+        membership(1),
+        membership(2, phone="1234567890"),
+        {k: v for k, v in membership(3).items() if k != "address"},
+        membership(4, membershipType="corporate"),
+        membership(5, email="not-an-email"),
+        "{not json",
+        "[1, 2]",
+        membership(8, phone=9876500008, email="Member8@Example.COM"),
+    ))
+    assert (report["rows"], report["inserted"], report["failed"]) == (8, 2, 6)
+    assert report["errors"] == [
+        {"row": 2, "error": f"phone: {PHONE_ERROR}"},
+        {"row": 3, "error": "address: field required"},
+        {"row": 4, "error": "membershipType: must be one of individual, family, student"},
+        {"row": 5, "error": "email: value is not a valid email address"},
+        {"row": 6, "error": "Invalid JSON"},
+        {"row": 7, "error": "Expected a JSON object"},
+    ]
+    members = {m["name"]: m for m in await stored(api)}
+    assert set(members) == {"Member 1", "Member 8"}
+    assert (members["Member 8"]["phone"], members["Member 8"]["email"]) == ("9876500008", "Member8@example.com")
+    assert len({m["membershipNumber"] for m in members.values()}) == 2
+
+
+async def test_duplicates_in_a_chunk_and_against_stored_rows_are_409_messages(api):
+    assert (await api.post("/api/memberships", json=membership(1))).status_code == 200
+    # Stored behind the duplicate filter's back, so only the unique index can catch it
+    await server.storage.insert("memberships", {
+        **membership(2), "id": str(uuid.uuid4()), "created_at": datetime.utcnow(), "status": "pending",
+        "membershipNumber": "SHP99999999",
+    })
+
+    report = await import_rows(api, ndjson(
+        membership(3, email="member1@example.com"),
+        membership(4, phone="9700000002"),
+        membership(5),
+        membership(6, email="member5@example.com"),
+        membership(7),
+    ))
+    assert (report["inserted"], report["failed"]) == (2, 3)
+    assert report["errors"] == [
+        {"row": 1, "error": "This email is already registered"},
+        {"row": 2, "error": "This phone is already registered"},
+        {"row": 4, "error": "This email is already registered"},
+    ]
+    assert len(await stored(api)) == 4
+
+
+async def test_failed_rows_are_logged_without_their_contents(mongo_api, monkeypatch, caplog):
+    async def failing(collection, documents):
+        return [RuntimeError(f"write failed for {d['email']} {d['phone']}") for d in documents]
+
+    monkeypatch.setattr(server.storage, "insert_many", failing)
+    with caplog.at_level(logging.ERROR, logger="bulk_import"):
+        report = await import_rows(mongo_api, ndjson(membership(1)))
+    assert report["errors"] == [{"row": 1, "error": "Failed to store row"}]
+    assert "memberships" in caplog.text and "RuntimeError" in caplog.text
+    assert "member1@example.com" not in caplog.text and "9700000001" not in caplog.text
+
+
+async def test_csv_quoted_fields_may_span_lines(api):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS, lineterminator="\r\n")
+    writer.writeheader()
+    writer.writerow(membership(1, address='Flat 4, "Sunrise"\r\nMG Road\nPune 411001'))
+    writer.writerow(membership(2))
+    report = await import_rows(api, out.getvalue(), fmt="csv")
+    assert (report["inserted"], report["failed"]) == (2, 0)
+    members = {m["name"]: m for m in await stored(api)}
+    assert members["Member 1"]["address"] == 'Flat 4, "Sunrise"\nMG Road\nPune 411001'
+
+
+async def test_csv_row_problems(api):
+    body = (
+        ",".join(FIELDS) + "\n"
+        + ",".join(membership(1, address="12 MG Road Pune").values()) + ",extra\n"
+        + ",".join(membership(2, address="12 MG Road Pune").values()) + "\n"
+        + 'Member 3,member3@example.com,9700000003,individual,"12 MG Road, Pune\n'
+    )
+    report = await import_rows(api, body, fmt="csv")
+    assert report["errors"] == [
+        {"row": 1, "error": "Expected 5 columns, got 6"},
+        {"row": 3, "error": "Unterminated quoted field"},
+    ]
+    assert report["inserted"] == 1
+
+    missing = await api.post("/api/memberships/import", params={"format": "csv"}, content=b"name,email\n")
+    assert missing.status_code == 400
+    assert missing.json()["detail"] == "CSV header is missing columns: phone, membershipType, address"
+
+
+async def test_rows_spread_over_chunks_get_distinct_volunteer_ids(api, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_CHUNK_SIZE", 3)
+    report = await import_rows(api, ndjson(*(volunteer(i) for i in range(10))), collection="volunteers")
+    assert report["inserted"] == 10
+    ids = [v["volunteerId"] for v in await stored(api, "volunteers")]
+    assert len(set(ids)) == 10
@@ -0,0 +1,104 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+import server
+from conftest import donation
+from storage import MongoStorage
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_matching_if_none_match_is_a_304_until_a_new_submission(api):
+    await api.post("/api/donations", json=donation(1))
+    first = await api.get("/api/donations")
+    etag = first.headers["ETag"]
+
+    again = await api.get("/api/donations", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+    await api.post("/api/donations", json=donation(2))
+    changed = await api.get("/api/donations", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+
+
+async def test_stats_etag(api):
+    first = await api.get("/api/stats")
+    assert (await api.get("/api/stats", headers={"If-None-Match": first.headers["ETag"]})).status_code == 304
+
+
+async def test_etag_varies_with_the_page(api):
+    await api.post("/api/donations", json=donation(1))
+    tags = {(await api.get("/api/donations", params=params)).headers["ETag"]
+            for params in ({}, {"limit": 10}, {"skip": 1}, {"include_archived": "true"})}
+    assert len(tags) == 4
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+async def test_conditional_pages_match_the_plain_list_path(api, monkeypatch, fast_path):
+    for i in range(3):
+        await api.post("/api/donations", json=donation(i, message=f"नमस्ते {i}"))
+    monkeypatch.setattr(server, "LIST_FAST_PATH", fast_path)
+    monkeypatch.setattr(server, "CONDITIONAL_GET", False)
+    plain = await api.get("/api/donations")
+    monkeypatch.setattr(server, "CONDITIONAL_GET", True)
+    conditional = await api.get("/api/donations")
+    assert conditional.json() == plain.json()
+
+
+async def test_conditional_pages_are_validated_without_the_fast_path(api, monkeypatch):
+    await server.storage.insert("donations", {
+        "id": str(uuid.uuid4()), "name": "Broken", "email": "not-an-email", "phone": "9876543210",
+        "amount": "500", "created_at": datetime.utcnow(), "status": "pending",
+    })
+    monkeypatch.setattr(server, "LIST_FAST_PATH", False)
+    assert (await api.get("/api/donations")).status_code == 500
+
+
+async def test_direct_database_edits_show_up_once_the_window_rolls_over(api, monkeypatch):
+    monkeypatch.setattr(server, "CONDITIONAL_MAX_AGE", 0.2)
+    await api.post("/api/donations", json=donation(1))
+    etag = (await api.get("/api/donations")).headers["ETag"]
+    # Written behind the API's back: no version bump
+    await server.storage.insert("donations", {
+        **donation(2), "id": str(uuid.uuid4()), "created_at": datetime.utcnow(), "status": "pending",
+        "amount_paise": 50000,
+    })
+    await asyncio.sleep(0.25)
+    refreshed = await api.get("/api/donations", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 2
+
+
+async def test_large_pages_are_compressed_on_request(api):
+    for i in range(20):
+        await api.post("/api/donations", json=donation(i))
+    response = await api.get("/api/donations", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+
+async def test_pages_read_from_a_lagging_secondary_are_never_tagged_stale(mongo_api, monkeypatch):
+    # The secondary has not replicated anything yet; versions and writes go to the primary
+    lagging = server.client["lagging"]
+    monkeypatch.setattr(server, "storage", MongoStorage(server.db, lagging))
+    for i in range(3):
+        await mongo_api.post("/api/donations", json=donation(i))
+
+    first = await mongo_api.get("/api/donations")
+    assert len(first.json()) == 3
+    cached = await mongo_api.get("/api/donations")
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert len(cached.json()) == 3
+
+    deeper = await mongo_api.get("/api/donations", params={"skip": 1})
+    assert deeper.json() == []
+    assert "ETag" not in deeper.headers
+    assert (await mongo_api.get("/api/donations", params={"skip": 1},
+                                headers={"If-None-Match": "*"})).status_code == 200
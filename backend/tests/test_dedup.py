@@ -0,0 +1,91 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import server
+from bloom import BloomFilter
+from conftest import membership, volunteer
+from dedup import DuplicateGuard, DuplicateSubmission, duplicate_detail, duplicate_field
+
+pytestmark = pytest.mark.anyio
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"member{i}@example.com")
+    assert all(f"member{i}@example.com" in bloom for i in range(10_000))
+    false_positives = sum(f"stranger{i}@example.com" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+
+@pytest.mark.parametrize("error, field, detail", [
+    (DuplicateSubmission("memberships", "phone"), "phone", "This phone is already registered"),
+    (DuplicateKeyError("dup", 11000, {"keyPattern": {"email": 1}}), "email", "This email is already registered"),
+    (DuplicateKeyError("E11000 duplicate key error collection: db.memberships index: phone_1 dup key", 11000),
+     "phone", "This phone is already registered"),
+    (DuplicateKeyError("dup", 11000, {"keyPattern": {"membershipNumber": 1}}), "membershipNumber", None),
+    (DuplicateKeyError("dup", 11000, {"keyPattern": {"volunteerId": 1}}), "volunteerId", None),
+    (DuplicateKeyError("E11000 duplicate key error collection: db.volunteers index: email_unique dup key: "
+                       "{ email: \"a@example.com\" }", 11000), "email", "This email is already registered"),
+    (DuplicateKeyError("E11000 duplicate key error collection: db.memberships index: membershipNumber_unique "
+                       "dup key: { membershipNumber: \"SHP00000001\" }", 11000), "membershipNumber", None),
+    (DuplicateKeyError("E11000 duplicate key error dup key: { phone: \"9876543210\" }", 11000),
+     "phone", "This phone is already registered"),
+    (DuplicateKeyError("E11000 Duplicate Key Error, full error: {'keyValue': {'email': 'a@example.com'}, "
+                       "'keyPattern': {'email': 1}}", 11000), "email", "This email is already registered"),
+    (DuplicateKeyError("dup", 11000), None, None),
+])
+def test_duplicate_detail_blames_the_submitter_only_for_email_or_phone(error, field, detail):
+    assert duplicate_field(error) == field
+    assert duplicate_detail(error) == detail
+
+
+async def test_repeat_email_or_phone_is_a_409(api):
+    assert (await api.post("/api/memberships", json=membership(1))).status_code == 200
+
+    same_email = await api.post("/api/memberships", json=membership(2, email="member1@example.com"))
+    assert same_email.status_code == 409
+    assert same_email.json()["detail"] == "This email is already registered"
+
+    same_phone = await api.post("/api/memberships", json=membership(3, phone="9700000001"))
+    assert same_phone.status_code == 409
+    assert same_phone.json()["detail"] == "This phone is already registered"
+
+    # A volunteer is a separate registry
+    assert (await api.post("/api/volunteers", json=volunteer(1, email="member1@example.com"))).status_code == 200
+
+
+async def test_unique_index_catches_what_the_filter_missed(api, monkeypatch):
+    assert (await api.post("/api/volunteers", json=volunteer(1))).status_code == 200
+    # Another worker's filter has never seen the first signup
+    other_worker = DuplicateGuard(("memberships", "volunteers"), capacity=1000)
+    other_worker.ready = True
+    monkeypatch.setattr(server, "duplicate_guard", other_worker)
+    response = await api.post("/api/volunteers", json=volunteer(2, email="volunteer1@example.com"))
+    assert response.status_code == 409
+    assert response.json()["detail"] == "This email is already registered"
+
+
+async def test_sequence_number_clash_is_a_server_error(api, monkeypatch):
+    async def stuck_number():
+        return "SHP00000001"
+
+    monkeypatch.setattr(server, "generate_membership_number", stuck_number)
+    assert (await api.post("/api/memberships", json=membership(1))).status_code == 200
+    response = await api.post("/api/memberships", json=membership(2))
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to create membership"
+
+
+async def test_insert_many_keeps_the_clashing_key_but_not_the_document(mongo_api):
+    await server.db.memberships.insert_one({
+        "id": "1", "email": "a@example.com", "phone": "9876543210", "membershipNumber": "SHP00000001",
+    })
+    errors = await server.storage.insert_many("memberships", [
+        {"id": "2", "email": "b@example.com", "phone": "9876543211", "membershipNumber": "SHP00000002"},
+        {"id": "3", "email": "a@example.com", "phone": "9876543212", "membershipNumber": "SHP00000003"},
+    ])
+    assert errors[0] is None
+    assert isinstance(errors[1], DuplicateKeyError)
+    assert "op" not in errors[1].details
+    assert duplicate_detail(errors[1]) == "This email is already registered"
@@ -0,0 +1,61 @@
+import itertools
+import re
+
+import pytest
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+from conftest import donation
+from fields import EMAIL_ADAPTER, PHONE_ERROR, SIMPLE_EMAIL_PATTERN, normalize_phone
+
+pytestmark = pytest.mark.anyio
+
+EMAIL_STR = TypeAdapter(EmailStr)
+
+LOCAL_PARTS = ["a", "Ravi.Kumar", "ravi+tag", "o'neil", "x_y-z", ".dot", "dot.", "two..dots", "a" * 64, "a" * 65,
+               "back\\slash", "with space", "\"quoted\"", "ünï"]
+DOMAINS = ["example.com", "Example.CO.IN", "mail.example.org", "localhost", "example.test", "example.local",
+           "example", "exa_mple.com", "-bad.com", "bad-.com", "xn--bcher-kva.ch", "a--b.com", "example.c",
+           "example.123", "sub." + "d" * 63 + ".com", "sub." + "d" * 64 + ".com", "exämple.com", "ex.co.", "ex..com"]
+EXTRA = ["", "@", "no-at-sign", "a@b@c.com", "Ravi <ravi@example.com>", " ravi@example.com", "ravi@example.com ",
+         "x@" + ".".join(["d" * 60] * 4) + ".com"]
+
+
+def outcome(adapter, value):
+    try:
+        return adapter.validate_python(value)
+    except ValidationError:
+        return ValidationError
+
+
+@pytest.mark.parametrize("address", [f"{l}@{d}" for l, d in itertools.product(LOCAL_PARTS, DOMAINS)] + EXTRA)
+def test_email_fast_path_matches_email_str(address):
+    assert outcome(EMAIL_ADAPTER, address) == outcome(EMAIL_STR, address)
+
+
+def test_fast_path_only_takes_addresses_email_str_leaves_unchanged_but_the_domain_case():
+    simple = re.compile(SIMPLE_EMAIL_PATTERN, re.IGNORECASE)
+    for local, domain in itertools.product(LOCAL_PARTS, DOMAINS):
+        address = f"{local}@{domain}"
+        if simple.fullmatch(address):
+            assert EMAIL_STR.validate_python(address) == f"{local}@{domain.lower()}"
+
+
+@pytest.mark.parametrize("raw, cleaned", [
+    ("9876543210", "9876543210"), ("98765 43210", "9876543210"), ("98765-43210", "9876543210"),
+    ("(987) 654-3210", "9876543210"),
+])
+def test_phone_normalization(raw, cleaned):
+    assert normalize_phone(raw) == cleaned
+
+
+@pytest.mark.parametrize("raw", ["1234567890", "5876543210", "987654321", "+91 98765 43210", "abcdefghij"])
+def test_phone_rejects(raw):
+    with pytest.raises(ValueError, match=re.escape(PHONE_ERROR)):
+        normalize_phone(raw)
+
+
+async def test_submissions_store_the_normalized_email(api):
+    created = await api.post("/api/donations", json={**donation(1), "email": "Ravi.Kumar@Example.CO.IN"})
+    assert created.json()["email"] == "Ravi.Kumar@example.co.in"
+    rejected = await api.post("/api/donations", json={**donation(2), "email": "ravi@example"})
+    assert rejected.status_code == 422
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+from pydantic import BaseModel
+from pymongo.errors import AutoReconnect
+
+from conftest import donation
+from idempotency import REPLAYED_HEADER, IdempotencyStore
+
+pytestmark = pytest.mark.anyio
+
+
+class Payload(BaseModel):
+    value: str
+
+
+class FlakyKeys:
+    """idempotency_keys whose find_one first runs ``before_find`` (expire the record, fail, ...)"""
+
+    def __init__(self, collection, before_find):
+        self._collection = collection
+        self._before_find = before_find
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def find_one(self, *args, **kwargs):
+        await self._before_find(self._collection)
+        return await self._collection.find_one(*args, **kwargs)
+
+
+class FlakyDB:
+    def __init__(self, db, before_find):
+        self.idempotency_keys = FlakyKeys(db.idempotency_keys, before_find)
+
+
+async def test_retry_replays_the_stored_response(api):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = await api.post("/api/donations", json=donation(1), headers=headers)
+    second = await api.post("/api/donations", json=donation(1), headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.headers[REPLAYED_HEADER] == "true"
+    assert second.json() == first.json()
+    listed = (await api.get("/api/donations")).json()
+    assert [d["id"] for d in listed] == [first.json()["id"]]
+
+
+async def test_reusing_a_key_with_another_body_is_rejected(api):
+    headers = {"Idempotency-Key": "retry-2"}
+    assert (await api.post("/api/donations", json=donation(1), headers=headers)).status_code == 200
+    response = await api.post("/api/donations", json=donation(2), headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("with_db", [True, False])
+async def test_key_in_flight_is_a_conflict_until_released(with_db):
+    db = AsyncMongoMockClient()["idem"] if with_db else None
+    store = IdempotencyStore()
+    claim = await store.claim(db, "donations", "k", Payload(value="a"))
+    with pytest.raises(HTTPException) as raised:
+        await store.claim(db, "donations", "k", Payload(value="a"))
+    assert raised.value.status_code == 409
+    await claim.release()
+    retry = await store.claim(db, "donations", "k", Payload(value="a"))
+    assert retry.replay is None
+    await retry.complete({"ok": True})
+    replay = await store.claim(db, "donations", "k", Payload(value="a"))
+    assert replay.replay is not None
+
+
+async def test_completed_key_replays_on_another_worker():
+    db = AsyncMongoMockClient()["idem"]
+    claim = await IdempotencyStore().claim(db, "donations", "k", Payload(value="a"))
+    await claim.complete({"id": "d1"})
+    other_worker = IdempotencyStore()
+    replay = await other_worker.claim(db, "donations", "k", Payload(value="a"))
+    assert replay.replay.body == b'{"id":"d1"}'
+    assert other_worker.store_hits == 1
+
+
+async def test_abandoned_pending_key_is_claimed_again():
+    db = AsyncMongoMockClient()["idem"]
+    await db.idempotency_keys.insert_one({
+        "_id": "donations:k", "fingerprint": "x", "token": "crashed", "state": "pending",
+        "created_at": datetime.utcnow() - timedelta(seconds=120),
+    })
+    store = IdempotencyStore(pending_lease=60)
+    claim = await store.claim(db, "donations", "k", Payload(value="a"))
+    assert claim.replay is None
+    assert store.reclaimed == 1
+    await claim.complete({"id": "d1"})
+    record = await db.idempotency_keys.find_one({"_id": "donations:k"})
+    assert record["state"] == "completed"
+    assert record["body"] == {"id": "d1"}
+
+
+async def test_recent_pending_key_is_not_taken_over():
+    db = AsyncMongoMockClient()["idem"]
+    first = IdempotencyStore(pending_lease=60)
+    claim = await first.claim(db, "donations", "k", Payload(value="a"))
+    with pytest.raises(HTTPException):
+        await IdempotencyStore(pending_lease=60).claim(db, "donations", "k", Payload(value="a"))
+    await claim.release()
+
+
+async def test_overtaken_claim_cannot_release_its_successor():
+    db = AsyncMongoMockClient()["idem"]
+    slow = await IdempotencyStore().claim(db, "donations", "k", Payload(value="a"))
+    await db.idempotency_keys.update_one(
+        {"_id": "donations:k"}, {"$set": {"created_at": datetime.utcnow() - timedelta(minutes=5)}}
+    )
+    successor = await IdempotencyStore(pending_lease=60).claim(db, "donations", "k", Payload(value="a"))
+    await slow.release()
+    assert await db.idempotency_keys.find_one({"_id": "donations:k"}) is not None
+    await successor.complete({"id": "d2"})
+    assert (await db.idempotency_keys.find_one({"_id": "donations:k"}))["body"] == {"id": "d2"}
+
+
+async def test_record_expiring_before_the_read_is_claimed_again():
+    db = AsyncMongoMockClient()["idem"]
+    await db.idempotency_keys.insert_one({
+        "_id": "donations:k", "fingerprint": "x", "token": "t", "state": "completed",
+        "status_code": 200, "body": {}, "created_at": datetime.utcnow(),
+    })
+
+    async def expire(collection):
+        await collection.delete_one({"_id": "donations:k"})
+
+    claim = await IdempotencyStore().claim(FlakyDB(db, expire), "donations", "k", Payload(value="a"))
+    assert claim.replay is None
+    assert (await db.idempotency_keys.find_one({"_id": "donations:k"}))["state"] == "pending"
+
+
+async def test_store_errors_after_a_duplicate_serve_the_request_unprotected():
+    db = AsyncMongoMockClient()["idem"]
+    await IdempotencyStore().claim(db, "donations", "k", Payload(value="a"))
+
+    async def fail(collection):
+        raise AutoReconnect("primary stepped down")
+
+    claim = await IdempotencyStore().claim(FlakyDB(db, fail), "donations", "k", Payload(value="a"))
+    assert claim.replay is None
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import server
+from conftest import donation, fresh_worker_state, serve
+from ingest import BatchWriter, IngestQueueFull
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingStorage:
+    """Just the insert_many the writer needs, failing the documents listed in ``reject``"""
+
+    def __init__(self, reject=()):
+        self.batches = []
+        self.reject = set(reject)
+
+    async def insert_many(self, collection, documents):
+        self.batches.append((collection, [d["n"] for d in documents]))
+        return [ValueError(f"rejected {d['n']}") if d["n"] in self.reject else None for d in documents]
+
+
+async def test_concurrent_inserts_are_grouped_per_collection():
+    storage = RecordingStorage()
+    writer = BatchWriter(storage, max_batch=100, max_delay=0.05)
+    writer.start()
+    await asyncio.gather(*(
+        writer.insert("donations" if n % 2 else "contacts", {"n": n}) for n in range(40)
+    ))
+    await writer.close()
+    assert sorted(name for name, _ in storage.batches) == ["contacts", "donations"]
+    assert sorted(n for _, numbers in storage.batches for n in numbers) == list(range(40))
+
+
+async def test_batches_are_capped_at_max_batch():
+    storage = RecordingStorage()
+    writer = BatchWriter(storage, max_batch=10, max_delay=0.05)
+    writer.start()
+    await asyncio.gather(*(writer.insert("donations", {"n": n}) for n in range(35)))
+    await writer.close()
+    assert [len(numbers) for _, numbers in storage.batches] == [10, 10, 10, 5]
+
+
+async def test_close_drains_everything_queued_then_refuses_more():
+    storage = RecordingStorage()
+    writer = BatchWriter(storage, max_batch=5, max_delay=0.05)
+    writer.start()
+    pending = [asyncio.ensure_future(writer.insert("donations", {"n": n})) for n in range(12)]
+    await asyncio.sleep(0)
+    await writer.close()
+    assert all(task.done() and task.exception() is None for task in pending)
+    assert sum(len(numbers) for _, numbers in storage.batches) == 12
+    with pytest.raises(IngestQueueFull):
+        await writer.insert("donations", {"n": 99})
+
+
+async def test_full_queue_raises_instead_of_waiting():
+    writer = BatchWriter(RecordingStorage(), max_queue=2)
+    waiting = [asyncio.ensure_future(writer.insert("donations", {"n": n})) for n in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(IngestQueueFull):
+        await writer.insert("donations", {"n": 2})
+    for task in waiting:
+        task.cancel()
+
+
+async def test_row_errors_reach_only_their_own_caller():
+    writer = BatchWriter(RecordingStorage(reject={3}), max_delay=0.05)
+    writer.start()
+    results = await asyncio.gather(
+        *(writer.insert("donations", {"n": n}) for n in range(6)), return_exceptions=True
+    )
+    await writer.close()
+    assert [type(r).__name__ for r in results] == ["NoneType"] * 3 + ["ValueError"] + ["NoneType"] * 2
+
+
+@pytest.mark.parametrize("backend", ["mongo", "sqlite"])
+async def test_batched_mode_stores_every_submission(monkeypatch, tmp_path, backend):
+    fresh_worker_state(monkeypatch)
+    monkeypatch.setattr(server, "INGEST_MODE", "batched")
+    monkeypatch.setattr(server, "batch_writer", None)
+    async with serve(monkeypatch, backend, tmp_path) as api:
+        responses = await asyncio.gather(*(api.post("/api/donations", json=donation(i)) for i in range(30)))
+        assert [r.status_code for r in responses] == [200] * 30
+        listed = (await api.get("/api/donations", params={"limit": 100})).json()
+        assert {d["id"] for d in listed} == {r.json()["id"] for r in responses}
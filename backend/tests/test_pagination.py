@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import donation
+from pagination import NEXT_CURSOR_HEADER, InvalidCursor, cursor_filter, decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+def test_cursor_round_trip():
+    moment = datetime(2024, 1, 26, 9, 30, 15, 123456)
+    cursor = encode_cursor(moment, "abc-123")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (moment, "abc-123")
+
+
+def test_cursor_filter_selects_strictly_after():
+    moment = datetime(2024, 1, 26)
+    assert cursor_filter(None) == {}
+    assert cursor_filter(encode_cursor(moment, "m")) == {
+        "$or": [{"created_at": {"$lt": moment}}, {"created_at": moment, "id": {"$lt": "m"}}]
+    }
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "!!!"])
+def test_foreign_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+async def test_following_cursors_visits_every_document_once(api):
+    for i in range(25):
+        assert (await api.post("/api/donations", json=donation(i))).status_code == 200
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        response = await api.get("/api/donations", params=params)
+        assert response.status_code == 200
+        seen += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert len({d["id"] for d in seen}) == 25
+    keys = [(d["created_at"], d["id"]) for d in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+async def test_malformed_cursor_is_a_400(api):
+    response = await api.get("/api/donations", params={"cursor": "garbage"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
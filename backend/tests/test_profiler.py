@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import profiler
+from profiler import ProfilerMiddleware, ProfileStore, SamplingProfiler
+
+pytestmark = pytest.mark.anyio
+
+
+async def slow_app(scope, receive, send):
+    await asyncio.sleep(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(app, path="/api/donations"):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    await app({"type": "http", "method": "GET", "path": path, "headers": []}, receive, send)
+
+
+async def test_slow_requests_are_kept_and_fast_ones_discarded(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=3)
+    keeping = SamplingProfiler(store, interval=0.005, threshold=0.01)
+    for _ in range(5):
+        await call(ProfilerMiddleware(slow_app, keeping))
+    await asyncio.sleep(0.1)
+    profiles = store.list()
+    assert keeping.kept == 5
+    assert len(profiles) == 3
+    assert profiles[0]["path"] == "/api/donations" and profiles[0]["status"] == 200
+    collapsed = store.collapsed(profiles[0]["id"])
+    assert "test_profiler.py:slow_app" in collapsed
+
+    discarding = SamplingProfiler(store, interval=0.005, threshold=10)
+    await call(ProfilerMiddleware(slow_app, discarding))
+    assert discarding.discarded == 1
+
+
+async def busy_app(scope, receive, send):
+    # Holds the event loop, so samples must come from the loop thread's own stack
+    time.sleep(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.mark.parametrize("private_map", [True, False])
+async def test_running_requests_are_sampled_from_the_loop_thread(tmp_path, monkeypatch, private_map):
+    if not private_map:
+        # As on a Python without asyncio.tasks._current_tasks
+        monkeypatch.setattr(profiler, "_current_tasks", None)
+    store = ProfileStore(str(tmp_path))
+    sampling = SamplingProfiler(store, interval=0.005, threshold=0.01)
+    await call(ProfilerMiddleware(busy_app, sampling))
+    await asyncio.sleep(0.1)
+    collapsed = store.collapsed(store.list()[0]["id"])
+    assert "test_profiler.py:busy_app" in collapsed
+    assert "[awaiting]" not in collapsed
+
+
+async def test_excluded_paths_are_not_profiled(tmp_path):
+    profiler = SamplingProfiler(ProfileStore(str(tmp_path)), interval=0.005, threshold=0)
+    await call(ProfilerMiddleware(slow_app, profiler, exclude=("/api/live",)), path="/api/live")
+    assert profiler.kept == profiler.discarded == 0
+
+
+def test_profile_ids_cannot_escape_the_directory(tmp_path):
+    store = ProfileStore(str(tmp_path / "profiles"))
+    (tmp_path / "secret.json").write_text('{"stacks": {"x": 1}}')
+    assert store.collapsed("../secret") is None
+    assert store.collapsed("1-2-" + "0" * 32) is None
+
+
+async def test_sampler_leaves_finished_profiles_alone(tmp_path):
+    profiler = SamplingProfiler(ProfileStore(str(tmp_path)), interval=0.001, threshold=3600)
+    stop = threading.Event()
+
+    def sample_continuously():
+        while not stop.is_set():
+            profiler.sample()
+
+    sampler = threading.Thread(target=sample_continuously)
+    sampler.start()
+    try:
+        for _ in range(200):
+            profile = profiler.begin("GET", "/api/donations")
+            await asyncio.sleep(0)
+            profiler.end(profile, 200, None, 0.0)
+            counted = profile.samples
+            final = dict(profile.stacks)
+            await asyncio.sleep(0)
+            assert profile.samples == counted
+            assert dict(profile.stacks) == final
+    finally:
+        stop.set()
+        sampler.join()
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import rollups
+from conftest import donation
+from rollups import MIGRATION_ID, MAX_PAISE, migrate_donation_amounts, to_paise
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("amount, paise", [
+    ("500", 50000), ("₹1,000.50", 100050), ("Rs. 2.5", 250), ("INR 10", 1000), ("1000000000", MAX_PAISE),
+])
+def test_to_paise(amount, paise):
+    assert to_paise(amount) == paise
+
+
+@pytest.mark.parametrize("amount", ["", "abc", "0", "1.234", "-5", "1000000000.01", "99999999999999999999"])
+def test_to_paise_rejects(amount):
+    with pytest.raises(ValueError):
+        to_paise(amount)
+
+
+async def test_oversized_amount_is_a_validation_error(api):
+    response = await api.post("/api/donations", json=donation(amount="99999999999999999999"))
+    assert response.status_code == 422
+    assert "at most" in response.json()["detail"][0]["msg"]
+
+
+async def legacy_db():
+    db = AsyncMongoMockClient()["rollups"]
+    await db.donations.insert_many([
+        {"id": str(uuid.uuid4()), "created_at": datetime(2024, 1, 26, 10), "amount": amount}
+        for amount in ("500", "₹1,000", "lots")
+    ])
+    return db
+
+
+async def test_migration_runs_once_across_concurrent_workers(monkeypatch):
+    db = await legacy_db()
+    runs = 0
+    backfill = rollups.backfill_amount_paise
+
+    async def counted(db):
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return await backfill(db)
+
+    monkeypatch.setattr(rollups, "backfill_amount_paise", counted)
+    await asyncio.gather(*(migrate_donation_amounts(db) for _ in range(4)))
+    assert runs == 1
+    marker = await db.migrations.find_one({"_id": MIGRATION_ID})
+    assert (marker["state"], marker["converted"], marker["invalid"]) == ("done", 2, 1)
+    day = await db.donation_rollups.find_one({"_id": "day:2024-01-26"})
+    assert (day["count"], day["sum"]) == (2, 150000)
+
+    await migrate_donation_amounts(db)
+    assert runs == 1
+
+
+async def test_migration_abandoned_by_a_dead_worker_is_taken_over():
+    db = await legacy_db()
+    await db.migrations.insert_one({
+        "_id": MIGRATION_ID, "state": "running", "started_at": datetime.utcnow() - timedelta(hours=1),
+    })
+    await migrate_donation_amounts(db)
+    assert (await db.migrations.find_one({"_id": MIGRATION_ID}))["state"] == "done"
+
+
+async def test_migration_running_elsewhere_is_left_alone():
+    db = await legacy_db()
+    await db.migrations.insert_one({"_id": MIGRATION_ID, "state": "running", "started_at": datetime.utcnow()})
+    await migrate_donation_amounts(db)
+    assert (await db.migrations.find_one({"_id": MIGRATION_ID}))["state"] == "running"
+    assert await db.donations.count_documents({"amount_paise": {"$exists": True}}) == 0
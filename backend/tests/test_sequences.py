@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+import server
+from conftest import fresh_worker_state, membership, serve, volunteer
+from sequences import SequenceAllocator
+
+pytestmark = pytest.mark.anyio
+
+BLOCK_SIZE = 100
+
+
+@pytest.mark.parametrize("backend", ["mongo", "sqlite"])
+async def test_parallel_signups_get_gapless_unique_numbers(monkeypatch, tmp_path, backend):
+    fresh_worker_state(monkeypatch, block_size=BLOCK_SIZE)
+    async with serve(monkeypatch, backend, tmp_path) as api:
+        responses = await asyncio.gather(
+            *(api.post("/api/memberships", json=membership(i)) for i in range(1000)),
+            *(api.post("/api/volunteers", json=volunteer(i)) for i in range(1000)),
+        )
+    assert {r.status_code for r in responses} == {200}
+    members = [r.json()["membershipNumber"] for r in responses[:1000]]
+    volunteers = [r.json()["volunteerId"] for r in responses[1000:]]
+    # One worker uses its blocks in full: 1..1000 with nothing skipped or handed out twice
+    assert sorted(members) == [f"SHP{n:08d}" for n in range(1, 1001)]
+    assert sorted(volunteers) == [f"VOL{n:08d}" for n in range(1, 1001)]
+
+
+@pytest.mark.parametrize("backend", ["mongo", "sqlite"])
+async def test_workers_sharing_a_store_never_overlap(monkeypatch, tmp_path, backend):
+    fresh_worker_state(monkeypatch)
+    async with serve(monkeypatch, backend, tmp_path):
+        workers = [SequenceAllocator("membershipNumber", block_size=BLOCK_SIZE) for _ in range(4)]
+        handed_out = await asyncio.gather(*(
+            asyncio.gather(*(worker.next(server.storage) for _ in range(3 * BLOCK_SIZE)))
+            for worker in workers
+        ))
+        bulk = await workers[0].reserve(server.storage, 250)
+
+    every = [n for values in handed_out for n in values] + list(bulk)
+    assert len(every) == len(set(every))
+    # Each worker drew whole blocks of consecutive numbers from the shared counter
+    for values in handed_out:
+        values = sorted(values)
+        for start in range(0, len(values), BLOCK_SIZE):
+            block = values[start:start + BLOCK_SIZE]
+            assert block == list(range(block[0], block[0] + BLOCK_SIZE))
+            assert block[0] % BLOCK_SIZE == 1
+    assert sorted(every) == list(range(1, 4 * 3 * BLOCK_SIZE + 251))
@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from cache import TTLCache
+from conftest import donation
+from stats import TOTALS_ID, init_counters, read_stats, record_submission
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ttl_cache_refresh_is_single_flight():
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    cache = TTLCache(loader, ttl=60)
+    waiting = [asyncio.ensure_future(cache.get()) for _ in range(50)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiting) == [1] * 50
+    assert await cache.get() == 1
+    cache.invalidate()
+    assert await cache.get() == 2
+    assert calls == 2
+
+
+async def test_cancelled_caller_does_not_cancel_shared_refresh():
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "fresh"
+
+    cache = TTLCache(loader, ttl=60)
+    first = asyncio.ensure_future(cache.get())
+    second = asyncio.ensure_future(cache.get())
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == "fresh"
+
+
+def stored_donation():
+    return {"id": str(uuid.uuid4()), "created_at": datetime.utcnow(), "amount": "500"}
+
+
+async def test_counters_seeded_even_when_a_write_created_the_totals_first():
+    db = AsyncMongoMockClient()["stats"]
+    await db.donations.insert_many([stored_donation() for _ in range(5)])
+    # A request stored during startup bumps the counters before init_counters runs
+    await db.donations.insert_one(stored_donation())
+    await record_submission(db, "donations", datetime.utcnow())
+
+    await init_counters(db)
+
+    assert (await read_stats(db))["total_donations"] == 6
+    assert (await db.counters.find_one({"_id": TOTALS_ID}))["seeded"] is True
+
+
+async def test_seeded_counters_are_not_recounted():
+    db = AsyncMongoMockClient()["stats"]
+    await db.counters.insert_one({"_id": TOTALS_ID, "donations": 42, "seeded": True})
+    await init_counters(db)
+    assert (await read_stats(db))["total_donations"] == 42
+
+
+async def test_stats_count_new_submissions(api):
+    before = (await api.get("/api/stats")).json()
+    for i in range(3):
+        assert (await api.post("/api/donations", json=donation(i))).status_code == 200
+    server.stats_cache.invalidate()
+    after = (await api.get("/api/stats")).json()
+    assert after["total_donations"] == before["total_donations"] + 3
+    assert after["recent_activity"] == before["recent_activity"] + 3
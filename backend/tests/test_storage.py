@@ -0,0 +1,16 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from stats import TOTALS_ID
+from storage import MongoStorage
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_change_versions_come_from_the_primary():
+    client = AsyncMongoMockClient()
+    primary, lagging_secondary = client["primary"], client["secondary"]
+    await primary.counters.insert_one({"_id": TOTALS_ID, "versions": {"donations": 2}})
+    await lagging_secondary.counters.insert_one({"_id": TOTALS_ID, "versions": {"donations": 1}})
+    storage = MongoStorage(primary, lagging_secondary)
+    assert await storage.change_versions() == {"donations": 2}
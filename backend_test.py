@@ -6,12 +6,13 @@ Tests all form submission endpoints and health checks
 
 import requests
 import json
+import os
 import sys
 from datetime import datetime
 from typing import Dict, Any
 
-# Backend URL from environment
-BACKEND_URL = "https://swadeshi-connect.preview.emergentagent.com/api"
+# Backend URL from environment; for local throughput numbers use backend/benchmarks/loadtest.py
+BACKEND_URL = os.environ.get("BACKEND_URL", "https://swadeshi-connect.preview.emergentagent.com/api")
 
 class BackendTester:
     def __init__(self):